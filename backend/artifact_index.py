@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Per-mission index over generated artifacts
+Markdown artifacts under idea_missions/<id>/artifacts/ are chunked and indexed
+both lexically (SQLite FTS5, BM25) and by embedding. Files are re-indexed only
+when their content changes, so agents can retrieve the few relevant passages
+of a mission's earlier outputs instead of whole files.
+"""
+
+import os
+import re
+import sys
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mission_store import is_valid_mission_id
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MISSIONS_DIR = os.path.join(BACKEND_DIR, "data", "idea_missions")
+ARTIFACT_INDEX_PATH = os.path.join(BACKEND_DIR, "data", "artifact_index.sqlite3")
+ARTIFACT_EXTENSIONS = (".md",)
+CHUNK_SIZE = 600
+CHUNK_OVERLAP = 100
+# Reciprocal rank fusion constant; larger values flatten the influence of top ranks
+RRF_K = 60
+# Missions whose embedding matrices are kept in memory, least recently searched evicted first
+MAX_CACHED_MISSIONS = 32
+
+
+def artifact_path(missions_dir: str, mission_id: str, relative_path: str) -> str:
+    """
+    Path of a mission artifact from its manifest path (e.g. artifacts/plan.md)
+
+    Raises:
+        ValueError: If the mission ID is not a slug or the path, symlinks resolved,
+            is not a file path inside the mission's artifacts/ directory
+    """
+    if not is_valid_mission_id(mission_id):
+        raise ValueError(f"Invalid mission ID: {mission_id!r}")
+    if not relative_path or os.path.isabs(relative_path):
+        raise ValueError(f"Artifact path must be relative to the mission directory: {relative_path!r}")
+    path = os.path.normpath(os.path.join(missions_dir, mission_id, relative_path))
+    artifacts_dir = os.path.realpath(os.path.join(missions_dir, mission_id, "artifacts"))
+    resolved = os.path.realpath(path)
+    if resolved == artifacts_dir or os.path.commonpath([artifacts_dir, resolved]) != artifacts_dir:
+        raise ValueError(f"Artifact path is outside the mission's artifacts directory: {relative_path!r}")
+    return path
+
+
+def _fts_query(query: str) -> str:
+    """OR of the quoted query terms, so user text cannot inject FTS5 syntax"""
+    return " OR ".join(f'"{term}"' for term in re.findall(r"\w+", query.lower()))
+
+
+def _mission_key(mission_id: str) -> str:
+    """Single FTS token for a mission; the mission ID itself would be split at underscores"""
+    return "m" + hashlib.sha1(mission_id.encode("utf-8")).hexdigest()[:16]
+
+
+class ArtifactIndex:
+    """Hybrid lexical and vector passage index, partitioned by mission"""
+
+    def __init__(self, path: str = ARTIFACT_INDEX_PATH, missions_dir: str = MISSIONS_DIR,
+                 embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 max_cached_missions: int = MAX_CACHED_MISSIONS):
+        """
+        Args:
+            path: SQLite database file
+            missions_dir: Directory with one subdirectory per mission
+            embedding_function: Embeds passages and queries; lexical search only when None
+            max_cached_missions: Missions whose embedding matrices are kept in memory
+        """
+        self.path = path
+        self.missions_dir = missions_dir
+        self.embedding_function = embedding_function
+        self.max_cached_missions = max_cached_missions
+        self._lock = threading.Lock()
+        self._vectors: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifact_files ("
+                "mission_id TEXT NOT NULL, path TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "mtime REAL NOT NULL, size INTEGER NOT NULL, PRIMARY KEY (mission_id, path))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifact_chunks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, mission_id TEXT NOT NULL, path TEXT NOT NULL, "
+                "chunk_id INTEGER NOT NULL, section TEXT, text TEXT NOT NULL, embedding BLOB)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS chunks_by_file ON artifact_chunks (mission_id, path)")
+            fts = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'artifact_fts'").fetchone()
+            if fts and "UNINDEXED" in fts[0]:
+                # Earlier layout filtered missions after MATCH had scanned every mission's postings
+                conn.execute("DROP TABLE artifact_fts")
+                fts = None
+            # mission_key is indexed, so MATCH only walks the postings of the searched mission
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS artifact_fts USING fts5(text, mission_key)")
+            if fts is None:
+                conn.executemany(
+                    "INSERT INTO artifact_fts (rowid, text, mission_key) VALUES (?, ?, ?)",
+                    [(chunk_id, text, _mission_key(mission_id)) for chunk_id, mission_id, text in
+                     conn.execute("SELECT id, mission_id, text FROM artifact_chunks").fetchall()]
+                )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _artifacts_dir(self, mission_id: str) -> str:
+        if not is_valid_mission_id(mission_id):
+            raise ValueError(f"Invalid mission ID: {mission_id!r}")
+        return os.path.join(self.missions_dir, mission_id, "artifacts")
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        if self.embedding_function is None or not texts:
+            return None
+        try:
+            vectors = np.asarray(self.embedding_function(texts), dtype=np.float32)
+        except Exception as e:
+            # Lexical search keeps working when the embedding model is unavailable
+            logger.warning(f"⚠️  Artifact embedding failed, using lexical search only: {e}")
+            return None
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _delete_file(self, conn, mission_id: str, relative_path: str):
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM artifact_chunks WHERE mission_id = ? AND path = ?", (mission_id, relative_path)
+        )]
+        conn.executemany("DELETE FROM artifact_fts WHERE rowid = ?", [(chunk_id,) for chunk_id in ids])
+        conn.execute("DELETE FROM artifact_chunks WHERE mission_id = ? AND path = ?", (mission_id, relative_path))
+        conn.execute("DELETE FROM artifact_files WHERE mission_id = ? AND path = ?", (mission_id, relative_path))
+
+    def index_file(self, mission_id: str, file_path: str) -> bool:
+        """
+        Index one artifact file, skipping it when its content is unchanged
+
+        Args:
+            mission_id: Mission the artifact belongs to
+            file_path: Path of the artifact file
+
+        Returns:
+            True if the file was (re-)indexed
+        """
+        relative_path = os.path.relpath(file_path, os.path.join(self.missions_dir, mission_id))
+        stat = os.stat(file_path)
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT content_hash FROM artifact_files WHERE mission_id = ? AND path = ?",
+                (mission_id, relative_path)
+            ).fetchone()
+        if row and row[0] == content_hash:
+            with self._connect() as conn:
+                conn.execute("UPDATE artifact_files SET mtime = ?, size = ? WHERE mission_id = ? AND path = ?",
+                             (stat.st_mtime, stat.st_size, mission_id, relative_path))
+            return False
+
+        # The loader pulls in chromadb and langchain, so it is imported on first use
+        from load_to_chromadb import chunk_markdown_document
+        chunks = [chunk for chunk in chunk_markdown_document(content, CHUNK_SIZE, CHUNK_OVERLAP)
+                  if chunk["content"].strip()]
+        # Embedding happens outside the lock so searches are not blocked by it
+        vectors = self._embed([chunk["content"] for chunk in chunks])
+
+        with self._lock, self._connect() as conn:
+            self._delete_file(conn, mission_id, relative_path)
+            for i, chunk in enumerate(chunks):
+                headers = chunk["metadata"]["headers"]
+                chunk_row = conn.execute(
+                    "INSERT INTO artifact_chunks (mission_id, path, chunk_id, section, text, embedding) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (mission_id, relative_path, i, headers[0] if headers else None, chunk["content"],
+                     vectors[i].tobytes() if vectors is not None else None)
+                ).lastrowid
+                conn.execute("INSERT INTO artifact_fts (rowid, text, mission_key) VALUES (?, ?, ?)",
+                             (chunk_row, chunk["content"], _mission_key(mission_id)))
+            conn.execute(
+                "INSERT INTO artifact_files (mission_id, path, content_hash, mtime, size) VALUES (?, ?, ?, ?, ?)",
+                (mission_id, relative_path, content_hash, stat.st_mtime, stat.st_size)
+            )
+            self._vectors.pop(mission_id, None)
+        return True
+
+    def sync_mission(self, mission_id: str) -> Dict[str, int]:
+        """
+        Bring a mission's index up to date with its artifacts directory
+
+        Only files whose size or modification time changed are read
+
+        Returns:
+            Number of indexed and removed files
+        """
+        artifacts_dir = self._artifacts_dir(mission_id)
+        on_disk = {}
+        if os.path.isdir(artifacts_dir):
+            for entry in os.scandir(artifacts_dir):
+                if entry.is_file() and entry.name.endswith(ARTIFACT_EXTENSIONS):
+                    stat = entry.stat()
+                    on_disk[os.path.join("artifacts", entry.name)] = (entry.path, stat.st_mtime, stat.st_size)
+
+        with self._connect() as conn:
+            known = {path: (mtime, size) for path, mtime, size in conn.execute(
+                "SELECT path, mtime, size FROM artifact_files WHERE mission_id = ?", (mission_id,)
+            )}
+
+        indexed = 0
+        for relative_path, (file_path, mtime, size) in on_disk.items():
+            if known.get(relative_path) != (mtime, size):
+                indexed += self.index_file(mission_id, file_path)
+        removed = [path for path in known if path not in on_disk]
+        if removed:
+            with self._lock, self._connect() as conn:
+                for relative_path in removed:
+                    self._delete_file(conn, mission_id, relative_path)
+                self._vectors.pop(mission_id, None)
+        return {"indexed": indexed, "removed": len(removed)}
+
+    def _mission_vectors(self, conn, mission_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Chunk IDs and embedding matrix of a mission, cached until its artifacts change"""
+        cached = self._vectors.get(mission_id)
+        if cached is not None:
+            self._vectors.move_to_end(mission_id)
+        else:
+            rows = conn.execute(
+                "SELECT id, embedding FROM artifact_chunks WHERE mission_id = ? AND embedding IS NOT NULL",
+                (mission_id,)
+            ).fetchall()
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            matrix = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) if rows else None
+            cached = self._vectors[mission_id] = (ids, matrix)
+            while len(self._vectors) > self.max_cached_missions:
+                self._vectors.popitem(last=False)
+        return cached
+
+    def search(self, mission_id: str, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Most relevant passages of a mission's artifacts
+
+        Lexical (BM25) and vector rankings are merged with reciprocal rank fusion
+
+        Returns:
+            Passages with path, section, text and fused score
+        """
+        self.sync_mission(mission_id)
+        candidates = max(4 * n_results, 20)
+        query_vector = self._embed([query])
+
+        with self._lock, self._connect() as conn:
+            fused: Dict[int, float] = {}
+            ranks: Dict[int, Dict[str, int]] = {}
+            fts_query = _fts_query(query)
+            if fts_query:
+                lexical = conn.execute(
+                    "SELECT rowid FROM artifact_fts WHERE artifact_fts MATCH ? "
+                    "ORDER BY bm25(artifact_fts, 1.0, 0.0) LIMIT ?",
+                    (f'mission_key : "{_mission_key(mission_id)}" AND text : ({fts_query})', candidates)
+                ).fetchall()
+                for rank, (chunk_id,) in enumerate(lexical, 1):
+                    fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+                    ranks.setdefault(chunk_id, {})["lexical_rank"] = rank
+
+            if query_vector is not None:
+                ids, matrix = self._mission_vectors(conn, mission_id)
+                if matrix is not None:
+                    scores = matrix @ query_vector[0]
+                    top = np.argsort(-scores)[:candidates]
+                    for rank, index in enumerate(top, 1):
+                        chunk_id = int(ids[index])
+                        fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+                        ranks.setdefault(chunk_id, {})["vector_rank"] = rank
+
+            ranked = sorted(fused, key=fused.get, reverse=True)
+            rows = {row[0]: row[1:] for row in conn.execute(
+                f"SELECT id, path, chunk_id, section, text FROM artifact_chunks "
+                f"WHERE id IN ({','.join('?' * len(ranked))})", ranked
+            )} if ranked else {}
+
+        passages, seen = [], set()
+        for chunk_id in ranked:
+            path, chunk_index, section, text = rows[chunk_id]
+            # Agents often save the same output twice; one copy of a passage is enough
+            if text in seen:
+                continue
+            seen.add(text)
+            passages.append({"path": path, "chunk_id": chunk_index, "section": section, "content": text,
+                             "score": round(fused[chunk_id], 6), **ranks[chunk_id]})
+            if len(passages) == n_results:
+                break
+        return passages
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            missions, files = conn.execute(
+                "SELECT COUNT(DISTINCT mission_id), COUNT(*) FROM artifact_files"
+            ).fetchone()
+            chunks, = conn.execute("SELECT COUNT(*) FROM artifact_chunks").fetchone()
+        return {"missions": missions, "files": files, "chunks": chunks,
+                "vector_search": self.embedding_function is not None}
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Write-behind artifact store for task="save_results"
+Saves are appended to a journal by a background writer that fsyncs once per
+batch; a save is acknowledged as soon as its batch is durable in the journal.
+The writer then writes each artifact atomically (temp file and rename) into
+idea_missions/<id>/artifacts/, adds it to the mission's manifest and hands it
+to the artifact index. Content already saved in the mission is not written
+again. Saves whose file could not be written stay in the journal and are
+retried with the next batch; after a crash, journaled saves are replayed on
+start.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from artifact_index import artifact_path
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_JOURNAL_PATH = os.path.join(BACKEND_DIR, "data", "artifact_journal.jsonl")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("._") or "result"
+
+
+def _fsync_directory(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ArtifactWriter:
+    """Background writer that batches journal fsyncs and writes artifacts off the request path"""
+
+    def __init__(self, missions_dir: str, mission_store, artifact_index=None,
+                 journal_path: str = ARTIFACT_JOURNAL_PATH, batch_window: float = 0.01, max_batch: int = 64,
+                 ack_timeout: float = 30.0):
+        """
+        Args:
+            missions_dir: Directory with one subdirectory per mission
+            mission_store: MissionStore receiving the manifest entries
+            artifact_index: Optional ArtifactIndex updated with every written artifact
+            journal_path: Journal of acknowledged saves that are not fully written yet
+            batch_window: Seconds to wait for more saves before committing a batch
+            max_batch: Maximum saves per batch
+            ack_timeout: Seconds a save waits for its acknowledgement before it fails
+        """
+        self.missions_dir = missions_dir
+        self.mission_store = mission_store
+        self.artifact_index = artifact_index
+        self.journal_path = journal_path
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.ack_timeout = ack_timeout
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Indexing embeds text, so it runs on its own thread and never delays acknowledgements
+        self._indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-index")
+        # Journaled saves whose file write failed; they are retried and stay in the journal until written
+        self._failed: List[Dict[str, Any]] = []
+        # saves counts journaled saves; saves answered with an earlier artifact count as deduplicated
+        self._stats = {"saves": 0, "batches": 0, "journal_fsyncs": 0, "written": 0, "deduplicated": 0,
+                       "errors": 0, "replayed": 0, "ack_timeouts": 0}
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+
+    def start(self):
+        """Replay the journal left by an interrupted run, then start the writer thread"""
+        pending = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        pending.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # torn last line: that save was never acknowledged
+        if pending:
+            logger.info(f"📝 Replaying {len(pending)} journaled artifact saves")
+            self._failed = self._write_batch(pending)
+            self._stats["replayed"] += len(pending) - len(self._failed)
+        self._rewrite_journal(self._failed)
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything still queued and stop"""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._indexer.shutdown(wait=True)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    async def save(self, mission_id: str, content: str, agent: str, name: Optional[str] = None,
+                   message_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Queue an artifact and wait until it is durable in the journal
+
+        Returns:
+            The manifest entry the artifact will be written under, or the entry of an
+            earlier artifact with identical content (marked "deduplicated")
+
+        Raises:
+            ValueError: If the mission ID is not a plain slug
+            RuntimeError: If the writer thread is not running
+            TimeoutError: If the save is not acknowledged within ack_timeout seconds
+        """
+        now = datetime.now()
+        name = _slug(name or f"{agent}.md")
+        if not name.endswith(".md"):
+            name += ".md"
+        entry = {
+            "id": f"file_{uuid.uuid4().hex[:8]}",
+            "name": name,
+            "type": "markdown",
+            "size": len(content.encode("utf-8")),
+            "createdAt": now.isoformat(),
+            "path": f"artifacts/{now.strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:4]}_{name}",
+            "agent": agent,
+            "messageId": message_id,
+            "contentHash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            "metadata": metadata or {}
+        }
+        artifact_path(self.missions_dir, mission_id, entry["path"])
+        if not self.is_running():
+            raise RuntimeError("Artifact writer is not running")
+        acknowledged: Future = Future()
+        self._queue.put({"mission_id": mission_id, "entry": entry, "content": content, "ack": acknowledged})
+        try:
+            # Shielded so the writer can still acknowledge a save whose caller gave up
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(acknowledged)), self.ack_timeout)
+        except asyncio.TimeoutError:
+            self._stats["ack_timeouts"] += 1
+            raise TimeoutError(f"Artifact save not acknowledged within {self.ack_timeout:.0f}s "
+                               f"(writer running: {self.is_running()})")
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._commit(batch)
+            except Exception as e:
+                logger.error(f"❌ Artifact batch failed: {e}")
+                for item in batch:
+                    if not item["ack"].done():
+                        item["ack"].set_exception(e)
+            if stopping:
+                return
+
+    def _commit(self, batch: List[Dict[str, Any]]):
+        results, records, batch_hashes = [], [], {}
+        for item in batch:
+            entry = item["entry"]
+            key = (item["mission_id"], entry["contentHash"])
+            existing = batch_hashes.get(key) or self.mission_store.find_artifact_by_hash(*key)
+            if existing is not None:
+                results.append({**existing, "deduplicated": True})
+                continue
+            batch_hashes[key] = entry
+            results.append(entry)
+            records.append({"mission_id": item["mission_id"], "entry": entry, "content": item["content"]})
+
+        try:
+            if records:
+                # One fsync makes the whole batch durable
+                with open(self.journal_path, "a", encoding="utf-8") as journal:
+                    for record in records:
+                        journal.write(json.dumps(record) + "\n")
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                self._stats["journal_fsyncs"] += 1
+        except Exception as e:
+            self._stats["errors"] += len(batch)
+            for item in batch:
+                item["ack"].set_exception(e)
+            return
+        for item, result in zip(batch, results):
+            item["ack"].set_result(result)
+        self._stats["saves"] += len(records)
+        self._stats["deduplicated"] += len(batch) - len(records)
+        self._stats["batches"] += 1
+
+        if records or self._failed:
+            self._failed = self._write_batch(self._failed + records)
+            # The journal keeps exactly the acknowledged saves that are not written yet
+            self._rewrite_journal(self._failed)
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write artifact files atomically, then register them in the manifest
+
+        Returns:
+            The records whose file could not be written
+        """
+        written, failed, directories = [], [], set()
+        for record in records:
+            mission_id, entry = record["mission_id"], record["entry"]
+            try:
+                # Replayed saves may already have been written before the crash, and
+                # saves of a mission deleted while they were queued are dropped
+                if self.mission_store.find_artifact_by_hash(mission_id, entry["contentHash"]) is not None \
+                        or self.mission_store.get_mission(mission_id) is None:
+                    continue
+                path = artifact_path(self.missions_dir, mission_id, entry["path"])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(record["content"])
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, path)
+                directories.add(os.path.dirname(path))
+                written.append((mission_id, entry, path))
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"❌ Failed to write artifact {entry['path']} of {mission_id}: {e}")
+                # Paths outside the mission's artifacts directory will never be writable
+                if not isinstance(e, ValueError):
+                    failed.append(record)
+        # Renames are durable once their directories are synced, once per directory per batch
+        for directory in directories:
+            _fsync_directory(directory)
+
+        for mission_id, entry, path in written:
+            self.mission_store.add_artifact(mission_id, entry)
+            self._stats["written"] += 1
+            if self.artifact_index is not None:
+                self._indexer.submit(self._index, mission_id, path)
+        return failed
+
+    def _index(self, mission_id: str, path: str):
+        try:
+            self.artifact_index.index_file(mission_id, path)
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to index artifact {path}: {e}")
+
+    def _truncate_journal(self):
+        # Every journaled save is now in the artifact directory and the manifest
+        with open(self.journal_path, "w", encoding="utf-8") as journal:
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _rewrite_journal(self, records: List[Dict[str, Any]]):
+        """Replace the journal with the given records, atomically"""
+        if not records:
+            self._truncate_journal()
+            return
+        temp_path = f"{self.journal_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as journal:
+            for record in records:
+                journal.write(json.dumps(record) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temp_path, self.journal_path)
+        _fsync_directory(os.path.dirname(self.journal_path))
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches"]
+        batched = self._stats["saves"] + self._stats["deduplicated"]
+        return {
+            **self._stats,
+            "writer_alive": self.is_running(),
+            "queued": self._queue.qsize(),
+            "pending_retries": len(self._failed),
+            "avg_batch_size": round(batched / batches, 2) if batches else 0.0
+        }
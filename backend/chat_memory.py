@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Semantic memory over mission chat history
+Every chat message of a mission is embedded once, when it is first seen, so an
+agent can retrieve the few prior turns relevant to its task (scored by
+similarity and recency) instead of replaying the whole transcript. Older
+turns are folded, one closed segment at a time, into a rolling summary of
+bounded size, so the context built from memory stays the same size however
+long the conversation gets.
+"""
+
+import os
+import re
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CHAT_MEMORY_PATH = os.path.join(BACKEND_DIR, "data", "chat_memory.sqlite3")
+# Turns are stored and returned truncated; search listings can be many thousand characters long
+MAX_TURN_CHARS = 1500
+SEGMENT_TURNS = 20
+RECENT_TURNS = 6
+# A turn this many turns old counts half as recent as the newest one
+HALF_LIFE_TURNS = 50
+RECENCY_WEIGHT = 0.3
+SUMMARY_MAX_CHARS = 2000
+EMBED_BATCH_SIZE = 64
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def speaker_of(message: Dict[str, Any]) -> str:
+    """Agent name of assistant messages, the role otherwise"""
+    return message.get("agentName") or message.get("agentId") or message.get("role") or "unknown"
+
+
+def extractive_summary(previous: Optional[str], turns: List[Dict[str, Any]],
+                       max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Rolling summary without an LLM: the first sentence of every turn appended to the previous summary
+
+    When the summary grows past max_chars its oldest lines are dropped.
+    """
+    lines = previous.splitlines() if previous else []
+    for turn in turns:
+        text = " ".join(turn["text"].split())
+        if not text:
+            continue
+        first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+        lines.append(f"- {turn['speaker']}: {_truncate(first_sentence, 160)}")
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ChatMemory:
+    """Per-mission index of embedded chat turns and rolling summaries of older segments"""
+
+    def __init__(self, mission_store, path: str = CHAT_MEMORY_PATH,
+                 embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 segment_turns: int = SEGMENT_TURNS, half_life_turns: float = HALF_LIFE_TURNS,
+                 recency_weight: float = RECENCY_WEIGHT):
+        """
+        Args:
+            mission_store: MissionStore the chat messages are read from
+            path: SQLite database file
+            embedding_function: Embeds turns and queries; lookups only return recent turns when None
+            segment_turns: Turns folded into the rolling summary at a time
+            half_life_turns: Age in turns at which a turn's recency score halves
+            recency_weight: Share of recency in the lookup score (the rest is similarity)
+        """
+        self.mission_store = mission_store
+        self.path = path
+        self.embedding_function = embedding_function
+        self.segment_turns = segment_turns
+        self.half_life_turns = half_life_turns
+        self.recency_weight = recency_weight
+        self._lock = threading.Lock()
+        # mission -> (seq of every turn, ordinal of embedded turns, their embeddings)
+        self._vectors: Dict[str, Tuple[List[int], np.ndarray, Optional[np.ndarray]]] = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_turns ("
+                "mission_id TEXT NOT NULL, seq INTEGER NOT NULL, message_id TEXT, role TEXT, speaker TEXT, "
+                "timestamp TEXT, text TEXT NOT NULL, embedding BLOB, PRIMARY KEY (mission_id, seq))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_summaries ("
+                "mission_id TEXT NOT NULL, segment INTEGER NOT NULL, first_seq INTEGER NOT NULL, "
+                "last_seq INTEGER NOT NULL, summary TEXT NOT NULL, method TEXT, created_at TEXT, "
+                "PRIMARY KEY (mission_id, segment))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        if self.embedding_function is None or not texts:
+            return None
+        try:
+            vectors = np.vstack([
+                np.asarray(self.embedding_function(texts[start:start + EMBED_BATCH_SIZE]), dtype=np.float32)
+                for start in range(0, len(texts), EMBED_BATCH_SIZE)
+            ])
+        except Exception as e:
+            # Turns are kept without embeddings and embedded on a later sync
+            logger.warning(f"⚠️  Chat memory embedding failed: {e}")
+            return None
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _new_messages(self, mission_id: str, after: int) -> List[Dict[str, Any]]:
+        messages = []
+        while True:
+            page = self.mission_store.list_events("chat_messages", mission_id, after=after, limit=500)
+            messages.extend(page["items"])
+            if page["next_cursor"] is None:
+                return messages
+            after = page["next_cursor"]
+
+    def sync(self, mission_id: str) -> Dict[str, int]:
+        """
+        Embed the chat messages appended since the last sync
+
+        Turns whose embedding failed earlier are embedded again.
+
+        Returns:
+            Number of added and embedded turns
+        """
+        with self._connect() as conn:
+            last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM chat_turns WHERE mission_id = ?",
+                                    (mission_id,)).fetchone()[0]
+            unembedded = conn.execute(
+                "SELECT seq, text FROM chat_turns WHERE mission_id = ? AND embedding IS NULL AND text != ''",
+                (mission_id,)
+            ).fetchall() if self.embedding_function is not None else []
+        messages = self._new_messages(mission_id, last_seq)
+        turns = [(message["seq"], message, _truncate(str(message.get("content") or "").strip(), MAX_TURN_CHARS))
+                 for message in messages]
+        if not turns and not unembedded:
+            return {"added": 0, "embedded": 0}
+
+        # Embedding happens outside the lock so lookups are not blocked by it
+        pending = [(seq, text) for seq, text in unembedded] + [(seq, text) for seq, _, text in turns if text]
+        vectors = self._embed([text for _, text in pending])
+        embeddings = {seq: vectors[i].tobytes() for i, (seq, _) in enumerate(pending)} if vectors is not None else {}
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO chat_turns "
+                "(mission_id, seq, message_id, role, speaker, timestamp, text, embedding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(mission_id, seq, message.get("id"), message.get("role"), speaker_of(message),
+                  message.get("timestamp"), text, embeddings.get(seq)) for seq, message, text in turns]
+            )
+            conn.executemany(
+                "UPDATE chat_turns SET embedding = ? WHERE mission_id = ? AND seq = ?",
+                [(embeddings[seq], mission_id, seq) for seq, _ in unembedded if seq in embeddings]
+            )
+            self._vectors.pop(mission_id, None)
+        return {"added": len(turns), "embedded": len(embeddings)}
+
+    def _mission_vectors(self, conn, mission_id: str) -> Tuple[List[int], np.ndarray, Optional[np.ndarray]]:
+        """Turn seqs, ordinals of the embedded turns and their embeddings, cached until the next sync"""
+        cached = self._vectors.get(mission_id)
+        if cached is None:
+            rows = conn.execute("SELECT seq, embedding FROM chat_turns WHERE mission_id = ? ORDER BY seq",
+                                (mission_id,)).fetchall()
+            embedded = [(ordinal, embedding) for ordinal, (_, embedding) in enumerate(rows) if embedding is not None]
+            ordinals = np.array([ordinal for ordinal, _ in embedded], dtype=np.int64)
+            matrix = np.vstack([np.frombuffer(embedding, dtype=np.float32) for _, embedding in embedded]) \
+                if embedded else None
+            cached = self._vectors[mission_id] = ([row[0] for row in rows], ordinals, matrix)
+        return cached
+
+    @staticmethod
+    def _turns(conn, mission_id: str, seqs: List[int]) -> Dict[int, Dict[str, Any]]:
+        if not seqs:
+            return {}
+        rows = conn.execute(
+            f"SELECT seq, message_id, role, speaker, timestamp, text FROM chat_turns "
+            f"WHERE mission_id = ? AND seq IN ({','.join('?' * len(seqs))})", [mission_id, *seqs]
+        ).fetchall()
+        return {row[0]: {"seq": row[0], "message_id": row[1], "role": row[2], "speaker": row[3],
+                         "timestamp": row[4], "text": row[5]} for row in rows}
+
+    def search(self, mission_id: str, query: str, k: int = 5, exclude_recent: int = 0,
+               recency_weight: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Prior turns most relevant to a query, scored by similarity and recency
+
+        Args:
+            mission_id: Mission ID
+            query: What the agent is working on
+            k: Turns to return
+            exclude_recent: Leave out the newest turns (the caller passes them verbatim)
+            recency_weight: Share of recency in the score (default: the memory's weight)
+
+        Returns:
+            Turns in conversation order with similarity, recency and score
+        """
+        self.sync(mission_id)
+        query_vector = self._embed([query])
+        if query_vector is None:
+            return []
+        weight = self.recency_weight if recency_weight is None else recency_weight
+
+        with self._lock, self._connect() as conn:
+            seqs, ordinals, matrix = self._mission_vectors(conn, mission_id)
+            if matrix is None:
+                return []
+            similarity = matrix @ query_vector[0]
+            recency = 0.5 ** ((len(seqs) - 1 - ordinals) / self.half_life_turns)
+            scores = (1 - weight) * similarity + weight * recency
+            scores[ordinals >= len(seqs) - exclude_recent] = -np.inf
+            top = [int(i) for i in np.argsort(-scores)[:k] if np.isfinite(scores[i])]
+            turns = self._turns(conn, mission_id, [seqs[ordinals[i]] for i in top])
+
+        results = [{**turns[seqs[ordinals[i]]], "similarity": round(float(similarity[i]), 4),
+                    "recency": round(float(recency[i]), 4), "score": round(float(scores[i]), 4)} for i in top]
+        return sorted(results, key=lambda turn: turn["seq"])
+
+    def recent(self, mission_id: str, n: int) -> List[Dict[str, Any]]:
+        """The newest n turns in conversation order"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, message_id, role, speaker, timestamp, text FROM chat_turns "
+                "WHERE mission_id = ? ORDER BY seq DESC LIMIT ?", (mission_id, n)
+            ).fetchall()
+        return [{"seq": row[0], "message_id": row[1], "role": row[2], "speaker": row[3], "timestamp": row[4],
+                 "text": row[5]} for row in reversed(rows)]
+
+    def latest_summary(self, mission_id: str) -> Optional[Dict[str, Any]]:
+        """Rolling summary covering the oldest closed segments, if any"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT segment, first_seq, last_seq, summary, method, created_at FROM chat_summaries "
+                "WHERE mission_id = ? ORDER BY segment DESC LIMIT 1", (mission_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"segment": row[0], "first_seq": row[1], "last_seq": row[2], "summary": row[3],
+                "method": row[4], "created_at": row[5], "turns": (row[0] + 1) * self.segment_turns}
+
+    def pending_segments(self, mission_id: str, keep_recent: int = RECENT_TURNS) -> List[Dict[str, Any]]:
+        """
+        Closed segments not yet folded into the rolling summary, oldest first
+
+        A segment is closed once all its turns are older than the keep_recent newest turns.
+        """
+        latest = self.latest_summary(mission_id)
+        next_segment = latest["segment"] + 1 if latest else 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, speaker, text FROM chat_turns WHERE mission_id = ? ORDER BY seq LIMIT -1 OFFSET ?",
+                (mission_id, next_segment * self.segment_turns)
+            ).fetchall()
+        closed = (len(rows) - keep_recent) // self.segment_turns
+        return [{
+            "segment": next_segment + i,
+            "turns": [{"seq": seq, "speaker": speaker, "text": text}
+                      for seq, speaker, text in rows[i * self.segment_turns:(i + 1) * self.segment_turns]]
+        } for i in range(max(0, closed))]
+
+    def store_summary(self, mission_id: str, segment: int, turns: List[Dict[str, Any]], summary: str,
+                      method: str):
+        """Save the rolling summary of all turns up to the end of a segment"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_summaries "
+                "(mission_id, segment, first_seq, last_seq, summary, method, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (mission_id, segment, turns[0]["seq"], turns[-1]["seq"], summary, method, datetime.now().isoformat())
+            )
+
+    def context(self, mission_id: str, query: str, k: int = 5, recent: int = RECENT_TURNS) -> Dict[str, Any]:
+        """
+        Bounded agent context: rolling summary, k relevant older turns and the newest turns verbatim
+
+        Returns:
+            Summary (or None), relevant and recent turns, and the number of turns in memory
+        """
+        relevant = self.search(mission_id, query, k, exclude_recent=recent)
+        with self._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM chat_turns WHERE mission_id = ?", (mission_id,)).fetchone()[0]
+        return {"summary": self.latest_summary(mission_id), "relevant": relevant,
+                "recent": self.recent(mission_id, recent) if recent > 0 else [], "total_turns": total}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            missions, turns, embedded = conn.execute(
+                "SELECT COUNT(DISTINCT mission_id), COUNT(*), COUNT(embedding) FROM chat_turns"
+            ).fetchone()
+            summaries, = conn.execute("SELECT COUNT(*) FROM chat_summaries").fetchone()
+        return {"missions": missions, "turns": turns, "embedded": embedded, "summaries": summaries,
+                "segment_turns": self.segment_turns, "vector_search": self.embedding_function is not None}
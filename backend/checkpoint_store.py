@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Delta-compressed checkpoint store for workflow states
+Each save of a thread's state is stored as the top-level keys that changed
+since the previous checkpoint, compressed with the previous state as the
+compression dictionary, so a rewritten proposal draft only costs what differs.
+A full snapshot is written every snapshot_interval steps, which bounds the
+work of reading any step; the latest state of recently used threads is kept
+in memory so resuming is a dictionary lookup.
+Usage: python backend/checkpoint_store.py import backend/data/collections/*/intermediate_states
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import zlib
+import sqlite3
+import argparse
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CHECKPOINT_DB_PATH = os.path.join(BACKEND_DIR, "data", "checkpoints.sqlite3")
+DEFAULT_SNAPSHOT_INTERVAL = 8
+CODEC = "zstd" if zstandard is not None else "zlib"
+
+
+def _serialize(state: Dict[str, Any]) -> bytes:
+    """Canonical encoding; deltas are decompressed against exactly these bytes"""
+    return json.dumps(state, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _compress(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT) \
+            if dictionary else None
+        return zstandard.ZstdCompressor(level=3, dict_data=dict_data).compress(data)
+    compressor = zlib.compressobj(6, zdict=dictionary) if dictionary else zlib.compressobj(6)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress(payload: bytes, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Checkpoint was written with zstd; install zstandard to read it")
+        dict_data = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT) \
+            if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(payload) + decompressor.flush()
+
+
+def diff_states(previous: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+    """Top-level keys that were set or removed between two states"""
+    return {
+        "set": {key: value for key, value in state.items() if key not in previous or previous[key] != value},
+        "unset": [key for key in previous if key not in state]
+    }
+
+
+def apply_delta(previous: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    state = {key: value for key, value in previous.items() if key not in delta["unset"]}
+    state.update(delta["set"])
+    return state
+
+
+class CheckpointStore:
+    """SQLite-backed per-thread checkpoint history with periodic full snapshots"""
+
+    def __init__(self, path: str = CHECKPOINT_DB_PATH, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+                 cached_threads: int = 256):
+        """
+        Args:
+            path: SQLite database file
+            snapshot_interval: A full snapshot is stored every this many steps
+            cached_threads: Threads whose latest state is kept in memory
+        """
+        self.path = path
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.cached_threads = cached_threads
+        self._latest: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "thread_id TEXT NOT NULL, step INTEGER NOT NULL, name TEXT, kind TEXT NOT NULL, "
+                "codec TEXT NOT NULL, payload BLOB NOT NULL, raw_size INTEGER NOT NULL, "
+                "stored_size INTEGER NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (thread_id, step))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS threads ("
+                "thread_id TEXT PRIMARY KEY, latest_step INTEGER NOT NULL, "
+                "latest_full_step INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, thread_id: str, step: int, state: Dict[str, Any]):
+        self._latest[thread_id] = (step, state)
+        self._latest.move_to_end(thread_id)
+        while len(self._latest) > self.cached_threads:
+            self._latest.popitem(last=False)
+
+    def _replay(self, conn, thread_id: str, full_step: int, step: int) -> Dict[str, Any]:
+        """Rebuild a step from the full snapshot at full_step and the deltas after it"""
+        state = None
+        for kind, codec, payload in conn.execute(
+            "SELECT kind, codec, payload FROM checkpoints WHERE thread_id = ? AND step BETWEEN ? AND ? "
+            "ORDER BY step", (thread_id, full_step, step)
+        ):
+            if kind == "full":
+                state = json.loads(_decompress(payload, codec))
+            else:
+                delta = json.loads(_decompress(payload, codec, _serialize(state)))
+                state = apply_delta(state, delta)
+        return state
+
+    def _load_latest(self, conn, thread_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        cached = self._latest.get(thread_id)
+        if cached is not None:
+            self._latest.move_to_end(thread_id)
+            return cached
+        row = conn.execute(
+            "SELECT latest_step, latest_full_step FROM threads WHERE thread_id = ?", (thread_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        latest = (row[0], self._replay(conn, thread_id, row[1], row[0]))
+        self._remember(thread_id, *latest)
+        return latest
+
+    def save(self, thread_id: str, state: Dict[str, Any], name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Append a checkpoint to a thread
+
+        Args:
+            thread_id: Workflow thread the state belongs to
+            state: Complete workflow state
+            name: Step label (defaults to the state's current_step)
+
+        Returns:
+            Step number, checkpoint kind and raw vs stored size
+        """
+        raw = _serialize(state)
+        with self._lock, self._connect() as conn:
+            latest = self._load_latest(conn, thread_id)
+            step = latest[0] + 1 if latest else 0
+            full_row = conn.execute(
+                "SELECT latest_full_step FROM threads WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+            full_step = full_row[0] if full_row else step
+            if latest is None or step - full_step >= self.snapshot_interval:
+                kind, full_step = "full", step
+                payload = _compress(raw, CODEC)
+            else:
+                kind = "delta"
+                payload = _compress(_serialize(diff_states(latest[1], state)), CODEC, _serialize(latest[1]))
+
+            now = time.time()
+            conn.execute(
+                "INSERT INTO checkpoints (thread_id, step, name, kind, codec, payload, raw_size, stored_size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, step, name or state.get("current_step"), kind, CODEC, payload, len(raw), len(payload), now)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, latest_step, latest_full_step, updated_at) "
+                "VALUES (?, ?, ?, ?)", (thread_id, step, full_step, now)
+            )
+            # Round-trip through JSON so the cached state never aliases the caller's objects
+            self._remember(thread_id, step, json.loads(raw))
+        return {"thread_id": thread_id, "step": step, "kind": kind, "raw_bytes": len(raw), "stored_bytes": len(payload)}
+
+    def latest(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Latest step and state of a thread, or None for an unknown thread"""
+        with self._lock, self._connect() as conn:
+            latest = self._load_latest(conn, thread_id)
+        if latest is None:
+            return None
+        return {"thread_id": thread_id, "step": latest[0], "state": json.loads(_serialize(latest[1]))}
+
+    def get(self, thread_id: str, step: int) -> Optional[Dict[str, Any]]:
+        """State of a thread at any step, or None when the step does not exist"""
+        with self._lock, self._connect() as conn:
+            full_row = conn.execute(
+                "SELECT MAX(step) FROM checkpoints WHERE thread_id = ? AND kind = 'full' AND step <= ?",
+                (thread_id, step)
+            ).fetchone()
+            exists = conn.execute(
+                "SELECT 1 FROM checkpoints WHERE thread_id = ? AND step = ?", (thread_id, step)
+            ).fetchone()
+            if not exists or full_row[0] is None:
+                return None
+            state = self._replay(conn, thread_id, full_row[0], step)
+        return {"thread_id": thread_id, "step": step, "state": state}
+
+    def steps(self, thread_id: str) -> List[Dict[str, Any]]:
+        """Checkpoint list of a thread without the states"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT step, name, kind, raw_size, stored_size, created_at FROM checkpoints "
+                "WHERE thread_id = ? ORDER BY step", (thread_id,)
+            ).fetchall()
+        return [
+            {"step": row[0], "name": row[1], "kind": row[2], "raw_bytes": row[3], "stored_bytes": row[4],
+             "created_at": row[5]}
+            for row in rows
+        ]
+
+    def delete_thread(self, thread_id: str) -> int:
+        """Remove a thread's history, returns the number of deleted checkpoints"""
+        with self._lock, self._connect() as conn:
+            self._latest.pop(thread_id, None)
+            conn.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+            return conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            threads, = conn.execute("SELECT COUNT(*) FROM threads").fetchone()
+            checkpoints, full, raw, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(kind = 'full'), 0), COALESCE(SUM(raw_size), 0), "
+                "COALESCE(SUM(stored_size), 0) FROM checkpoints"
+            ).fetchone()
+        return {
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "full_snapshots": full,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "reduction": round(raw / stored, 2) if stored else None,
+            "codec": CODEC,
+            "snapshot_interval": self.snapshot_interval
+        }
+
+
+def import_state_files(store: CheckpointStore, state_dirs: List[str]) -> Dict[str, int]:
+    """
+    Load intermediate_states/*.json snapshots into the store, in save order per thread
+
+    Returns:
+        Number of imported files per thread
+    """
+    files = []
+    for state_dir in state_dirs:
+        files.extend(glob.glob(os.path.join(state_dir, "*.json")))
+    imported: Dict[str, int] = {}
+    # File names start with a timestamp, so sorting by name restores the save order
+    for path in sorted(files, key=os.path.basename):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        thread_id = state.get("thread_id") or state.get("session_id") or os.path.basename(path)
+        store.save(thread_id, state)
+        imported[thread_id] = imported.get(thread_id, 0) + 1
+    return imported
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Manage the workflow checkpoint store')
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help='Import intermediate_states JSON snapshots')
+    import_parser.add_argument('state_dirs', nargs='+', help='intermediate_states directories')
+    subparsers.add_parser("stats", help='Show storage statistics')
+    parser.add_argument('--db', default=CHECKPOINT_DB_PATH, help='Checkpoint database file')
+    parser.add_argument('--snapshot-interval', type=int, default=DEFAULT_SNAPSHOT_INTERVAL,
+                        help='Steps between full snapshots')
+    args = parser.parse_args()
+
+    store = CheckpointStore(args.db, args.snapshot_interval)
+    if args.command == "import":
+        imported = import_state_files(store, args.state_dirs)
+        if not imported:
+            print("❌ No state files found")
+            sys.exit(1)
+        for thread_id, count in imported.items():
+            print(f"📥 {thread_id}: {count} checkpoints")
+
+    stats = store.stats()
+    print(f"💾 {stats['checkpoints']} checkpoints in {stats['threads']} threads: "
+          f"{stats['raw_bytes']} bytes as full JSON, {stats['stored_bytes']} bytes stored "
+          f"({stats['reduction']}x smaller, {stats['codec']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ from datetime import datetime
 BATCH_SIZE = 20
 BATCH_DELAY = 5
 
+# Paths are resolved from this file so the script works from any directory
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
 def extract_arxiv_ids_from_pdfs(collection_name: str) -> List[str]:
     """
     Extract arXiv IDs from PDF filenames in the collection directory
@@ -29,8 +32,8 @@ def extract_arxiv_ids_from_pdfs(collection_name: str) -> List[str]:
     Returns:
         List of arXiv IDs found in PDF filenames
     """
-    # Build path to PDF directory (relative to backend directory)
-    pdf_dir = Path(f"../data/collections/{collection_name}/pdfs")
+    # Build path to PDF directory
+    pdf_dir = DATA_DIR / "collections" / collection_name / "pdfs"
     
     if not pdf_dir.exists():
         print(f"❌ PDF directory not found: {pdf_dir}")
@@ -184,7 +187,7 @@ def save_metadata_to_csv(papers_data: Dict[str, Any], collection_name: str) -> s
     Returns:
         Path to the created CSV file
     """
-    collection_dir = Path(f"../data/collections/{collection_name}")
+    collection_dir = DATA_DIR / "collections" / collection_name
     collection_dir.mkdir(parents=True, exist_ok=True)
     
     csv_path = collection_dir / "arxiv_metadata.csv"
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Load enhanced arXiv metadata into ChromaDB collection
-Usage: python arxiv_to_chromadb.py <collection_name>
+Usage: python arxiv_to_chromadb.py <collection_name> [--db-path PATH] [--metric {cosine,ip,l2}]
 """
 
 import os
@@ -18,6 +18,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import chromadb
 from chromadb.config import Settings
 
+# collection_config lives in the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from collection_config import DISTANCE_METRICS, collection_creation_metadata, distance_metric_of
+
+# Paths are resolved from this file so the script works from any directory
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CHROMA_DB_PATH = os.path.join(DATA_DIR, "chromadb")
+
 def load_csv_data(collection_name: str) -> List[Dict[str, Any]]:
     """
     Load arXiv metadata from CSV file
@@ -28,7 +36,7 @@ def load_csv_data(collection_name: str) -> List[Dict[str, Any]]:
     Returns:
         List of paper data dictionaries
     """
-    csv_path = Path(f"../data/collections/{collection_name}/arxiv_metadata.csv")
+    csv_path = Path(DATA_DIR) / "collections" / collection_name / "arxiv_metadata.csv"
     
     if not csv_path.exists():
         print(f"❌ CSV file not found: {csv_path}")
@@ -56,13 +64,17 @@ def load_csv_data(collection_name: str) -> List[Dict[str, Any]]:
     print(f"📄 Loaded {len(papers_data)} papers from: {csv_path}")
     return papers_data
 
-def create_or_get_collection(client: chromadb.PersistentClient, collection_name: str) -> chromadb.Collection:
+def create_or_get_collection(client: chromadb.PersistentClient, collection_name: str,
+                             chroma_db_path: str = CHROMA_DB_PATH,
+                             metric: Optional[str] = None) -> chromadb.Collection:
     """
     Create or get the arxiv_metadata collection
     
     Args:
         client: ChromaDB client
         collection_name: Base collection name
+        chroma_db_path: ChromaDB persistence directory (for index settings)
+        metric: Distance metric of a new collection ('cosine', 'ip', 'l2'; default cosine)
         
     Returns:
         ChromaDB collection
@@ -75,13 +87,18 @@ def create_or_get_collection(client: chromadb.PersistentClient, collection_name:
     except:
         collection = client.create_collection(
             name=arxiv_collection_name,
-            metadata={
-                "description": f"arXiv metadata for {collection_name} papers",
-                "source": "arxiv_api",
-                "created_at": datetime.now().isoformat()
-            }
+            metadata=collection_creation_metadata(
+                chroma_db_path,
+                arxiv_collection_name,
+                {
+                    "description": f"arXiv metadata for {collection_name} papers",
+                    "source": "arxiv_api",
+                    "created_at": datetime.now().isoformat()
+                },
+                metric=metric
+            )
         )
-        print(f"📚 Created new collection: {arxiv_collection_name}")
+        print(f"📚 Created new collection: {arxiv_collection_name} ({distance_metric_of(collection)} distance)")
     
     return collection
 
@@ -129,19 +146,21 @@ def prepare_documents_for_chromadb(papers_data: List[Dict[str, Any]]) -> tuple:
     
     return documents, metadatas, ids
 
-def load_papers_to_chromadb(papers_data: List[Dict[str, Any]], collection_name: str) -> bool:
+def load_papers_to_chromadb(papers_data: List[Dict[str, Any]], collection_name: str,
+                            chroma_db_path: str = CHROMA_DB_PATH, metric: Optional[str] = None) -> bool:
     """
     Load papers into ChromaDB collection
     
     Args:
         papers_data: List of paper data
         collection_name: Name of the collection
+        chroma_db_path: ChromaDB persistence directory
+        metric: Distance metric of a new collection
         
     Returns:
         True if successful, False otherwise
     """
     # Initialize ChromaDB client
-    chroma_db_path = "../data/chromadb"
     os.makedirs(chroma_db_path, exist_ok=True)
     
     client = chromadb.PersistentClient(
@@ -153,7 +172,7 @@ def load_papers_to_chromadb(papers_data: List[Dict[str, Any]], collection_name:
     )
     
     # Get or create collection
-    collection = create_or_get_collection(client, collection_name)
+    collection = create_or_get_collection(client, collection_name, chroma_db_path, metric)
     
     # Prepare data for ChromaDB
     documents, metadatas, ids = prepare_documents_for_chromadb(papers_data)
@@ -192,14 +211,14 @@ def load_papers_to_chromadb(papers_data: List[Dict[str, Any]], collection_name:
         print(f"❌ Error inserting documents: {str(e)}")
         return False
 
-def test_collection(collection_name: str):
+def test_collection(collection_name: str, chroma_db_path: str = CHROMA_DB_PATH):
     """
     Test the collection with a sample query
     
     Args:
         collection_name: Name of the collection
+        chroma_db_path: ChromaDB persistence directory
     """
-    chroma_db_path = "../data/chromadb"
     arxiv_collection_name = f"{collection_name}_arxiv_metadata"
     
     try:
@@ -241,6 +260,9 @@ def main():
     """Main function"""
     parser = argparse.ArgumentParser(description='Load arXiv metadata into ChromaDB')
     parser.add_argument('collection_name', help='Name of the collection directory')
+    parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+    parser.add_argument('--metric', choices=DISTANCE_METRICS, default=None,
+                        help='Distance metric of a new collection (default: cosine)')
     args = parser.parse_args()
     
     collection_name = args.collection_name
@@ -257,14 +279,14 @@ def main():
         sys.exit(1)
     
     # Load papers into ChromaDB
-    success = load_papers_to_chromadb(papers_data, collection_name)
+    success = load_papers_to_chromadb(papers_data, collection_name, args.db_path, args.metric)
     
     if not success:
         print("❌ Failed to load papers into ChromaDB. Exiting.")
         sys.exit(1)
     
     # Test the collection
-    test_collection(collection_name)
+    test_collection(collection_name, args.db_path)
     
     print("\n🎉 Completed successfully!")
     print(f"📚 arXiv metadata collection: {collection_name}_arxiv_metadata")
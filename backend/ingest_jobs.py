@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Background ingestion jobs for the FastAPI server
+Jobs convert PDFs, chunk and embed markdown, and upsert papers into a live
+collection on a dedicated executor, then swap the new index state into the
+search tool without a restart
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+COLLECTIONS_DIR = os.path.join(DATA_DIR, "collections")
+CHROMA_DB_PATH = os.path.join(DATA_DIR, "chromadb")
+MAX_JOBS_KEPT = 100
+
+JOB_STAGES = ("queued", "convert", "chunk_embed", "metadata", "refresh", "done")
+
+
+class IngestJob:
+    """State and progress of one ingestion job"""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = f"ingest_{uuid.uuid4().hex[:8]}"
+        self.params = params
+        self.status = "queued"
+        self.stage = "queued"
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Any] = {
+            "pdfs_converted": 0,
+            "pdfs_failed": 0,
+            "papers_total": 0,
+            "papers_done": 0,
+            "chunks_added": 0,
+            "chunks_unchanged": 0,
+            "chunks_deleted": 0,
+            "metadata_added": 0
+        }
+        self._lock = threading.Lock()
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            progress = dict(self.progress)
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        throughput = {}
+        if elapsed:
+            throughput = {
+                "papers_per_second": round(progress["papers_done"] / elapsed, 3),
+                "chunks_per_second": round(progress["chunks_added"] / elapsed, 3)
+            }
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "params": self.params,
+            "progress": progress,
+            "throughput": throughput,
+            "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+            "created_at": self.created_at,
+            "error": self.error
+        }
+
+
+class IngestJobManager:
+    """Queues ingestion jobs on a dedicated single-worker executor"""
+
+    def __init__(self, get_client: Callable[[], Any], on_complete: Callable[[str], None],
+                 db_path: str = CHROMA_DB_PATH, collections_dir: str = COLLECTIONS_DIR,
+                 on_paper_changed: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            get_client: Returns the ChromaDB client shared with the search tool
+            on_complete: Called with the chunk collection name after a job finishes
+            db_path: ChromaDB persistence directory
+            collections_dir: Root directory of the paper collections
+            on_paper_changed: Called with each paper whose chunks were changed or removed
+        """
+        self.get_client = get_client
+        self.on_complete = on_complete
+        self.on_paper_changed = on_paper_changed
+        self.db_path = db_path
+        self.collections_dir = collections_dir
+        # One worker: jobs never compete with each other for CPU or the collection
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+        self.jobs: Dict[str, IngestJob] = {}
+
+    def submit(self, params: Dict[str, Any]) -> IngestJob:
+        """Queue a job and return it immediately"""
+        job = IngestJob(params)
+        self.jobs[job.id] = job
+        self._trim()
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in reversed(list(self.jobs.values()))]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in ("completed", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - MAX_JOBS_KEPT)]:
+            del self.jobs[job_id]
+
+    def _run(self, job: IngestJob):
+        import load_to_chromadb
+
+        job.status = "running"
+        job.started_at = time.perf_counter()
+        params = job.params
+        collection_dir = os.path.join(self.collections_dir, params["collection"])
+        chunk_collection_name = params["chroma_collection"]
+
+        try:
+            if params.get("convert"):
+                job.stage = "convert"
+                self._convert(job, params)
+
+            job.stage = "chunk_embed"
+            paper_ids = params.get("paper_ids")
+            markdown_files = load_to_chromadb.find_markdown_files(
+                os.path.join(collection_dir, "markdown"), paper_ids
+            ) if paper_ids is None or paper_ids else []
+            job.update(papers_total=len(markdown_files))
+
+            client = self.get_client()
+            collection = load_to_chromadb.get_or_create_chunk_collection(client, self.db_path, chunk_collection_name)
+
+            def report(counts: Dict[str, int]):
+                job.update(
+                    papers_done=counts["papers"] + counts["failed"],
+                    chunks_added=counts["chunks_added"],
+                    chunks_unchanged=counts["chunks_unchanged"],
+                    chunks_deleted=counts["chunks_deleted"]
+                )
+
+            changed: List[str] = []
+
+            def paper_changed(paper_id: str):
+                changed.append(paper_id)
+                if self.on_paper_changed:
+                    self.on_paper_changed(paper_id)
+
+            counts = load_to_chromadb.ingest_markdown_files(
+                markdown_files, collection, self.db_path, chunk_collection_name, progress=report,
+                on_paper_changed=paper_changed,
+                group_ids=[params["collection"], *params.get("groups", [])]
+            )
+            removed = params.get("removed_paper_ids") or []
+            if removed:
+                deleted = load_to_chromadb.remove_papers(removed, collection, self.db_path, chunk_collection_name)
+                job.update(chunks_deleted=counts["chunks_deleted"] + deleted)
+                for paper_id in removed:
+                    paper_changed(paper_id)
+            # Only the changed papers' rows are rewritten; an unchanged re-ingest touches neither
+            if changed:
+                load_to_chromadb.update_quantized_index(collection, self.db_path, chunk_collection_name, changed)
+                load_to_chromadb.calibrate_similarity_threshold(collection, self.db_path, chunk_collection_name)
+
+            if params.get("load_metadata", True):
+                job.stage = "metadata"
+                self._load_metadata(job, client, params["collection"])
+
+            job.stage = "refresh"
+            self.on_complete(chunk_collection_name)
+
+            job.stage = "done"
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.perf_counter()
+
+    def _convert(self, job: IngestJob, params: Dict[str, Any]):
+        import convert_pdfs
+
+        converter_class = convert_pdfs.CONVERTERS.get(params.get("converter", "mineru"))
+        if converter_class is None:
+            raise ValueError(f"Unknown converter: {params.get('converter')}")
+
+        counts = convert_pdfs.convert_collection(
+            params["collection"],
+            converter_class(),
+            workers=params.get("workers"),
+            collections_dir=self.collections_dir,
+            on_converted=lambda _: job.update(pdfs_converted=job.progress["pdfs_converted"] + 1)
+        )
+        job.update(pdfs_converted=counts["converted"], pdfs_failed=counts["failed"])
+
+    def _load_metadata(self, job: IngestJob, client, collection_name: str):
+        """Add arXiv metadata rows for papers that are not in the metadata collection yet"""
+        from fetcher import arxiv_to_chromadb
+
+        csv_path = os.path.join(self.collections_dir, collection_name, "arxiv_metadata.csv")
+        if not os.path.exists(csv_path):
+            return
+
+        papers_data = arxiv_to_chromadb.load_csv_data(collection_name)
+        documents, metadatas, ids = arxiv_to_chromadb.prepare_documents_for_chromadb(papers_data)
+        if not ids:
+            return
+
+        collection = arxiv_to_chromadb.create_or_get_collection(client, collection_name, self.db_path)
+        existing = set(collection.get(ids=ids, include=[])["ids"])
+        new_rows = [i for i, row_id in enumerate(ids) if row_id not in existing]
+        if new_rows:
+            collection.add(
+                documents=[documents[i] for i in new_rows],
+                metadatas=[metadatas[i] for i in new_rows],
+                ids=[ids[i] for i in new_rows]
+            )
+        job.update(metadata_added=len(new_rows))
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+LLM gateway
+Proxies OpenAI-compatible chat completion requests (Ollama, Gemini's OpenAI
+endpoint, llm_stub.py) so the backend can cache and meter agent LLM calls.
+Identical requests are answered from an exact-match cache; an optional
+semantic cache reuses responses of near-identical prompts by embedding
+similarity. Streaming requests are passed through as server-sent events.
+"""
+
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+# Request fields that only steer the gateway and are not sent to the provider
+GATEWAY_FIELDS = ("agent", "cache", "stream")
+
+logger = logging.getLogger(__name__)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(f"{message.get('role', '')}: {message.get('content', '')}" for message in messages)
+
+
+def _cache_keys(body: Dict[str, Any]) -> Tuple[str, str]:
+    """Exact key over the whole request and partition key over everything except the messages"""
+    params = {key: value for key, value in body.items() if key not in GATEWAY_FIELDS}
+    exact = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    params.pop("messages", None)
+    partition = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    return exact, partition
+
+
+class ExactResponseCache:
+    """LRU map from request hash to completion text"""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticResponseCache:
+    """Completions indexed by prompt embedding, searched by cosine similarity within a partition"""
+
+    def __init__(self, embedding_function: Callable[[List[str]], List[List[float]]],
+                 threshold: float = 0.97, max_entries: int = 2000):
+        """
+        Args:
+            embedding_function: Embeds prompt texts (the search tool's embedding model)
+            threshold: Minimum cosine similarity for a prompt to reuse a cached response
+            max_entries: Oldest entries are dropped beyond this many
+        """
+        self.embedding_function = embedding_function
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._partitions: List[str] = []
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.embedding_errors = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedding_function([text])[0], dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, partition: str, vector: np.ndarray) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            if self._vectors is None:
+                return None
+            scores = self._vectors @ vector
+            mask = np.fromiter((p == partition for p in self._partitions), dtype=bool, count=len(self._partitions))
+            scores[~mask] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            return self._entries[best], float(scores[best])
+
+    def put(self, partition: str, vector: np.ndarray, entry: Dict[str, Any]):
+        with self._lock:
+            row = vector[np.newaxis, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._partitions.append(partition)
+            self._entries.append(entry)
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._vectors = self._vectors[overflow:]
+                del self._partitions[:overflow]
+                del self._entries[:overflow]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AgentUsage:
+    """Token and latency counters of one agent"""
+
+    def __init__(self):
+        self.requests = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.saved_completion_tokens = 0
+        self.provider_seconds = 0.0
+        self.errors = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        generated = self.requests - self.exact_hits - self.semantic_hits - self.errors
+        return {
+            "requests": self.requests,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+            "avg_latency_ms": round(1000 * self.provider_seconds / generated, 3) if generated > 0 else None
+        }
+
+
+class LLMGateway:
+    """Caching, metering proxy in front of one OpenAI-compatible chat completions endpoint"""
+
+    def __init__(self, provider_url: str, default_model: str, api_key: Optional[str] = None,
+                 timeout: float = 300.0, cache_size: int = 2000,
+                 semantic_cache: Optional[SemanticResponseCache] = None):
+        """
+        Args:
+            provider_url: Chat completions URL of the provider
+            default_model: Model used when a request does not name one
+            api_key: Bearer token sent to the provider
+            timeout: Provider request timeout in seconds
+            cache_size: Entries kept in the exact-match cache
+            semantic_cache: Optional similarity cache consulted after an exact miss
+        """
+        self.provider_url = provider_url
+        self.default_model = default_model
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(timeout=timeout, headers=headers)
+        self.exact_cache = ExactResponseCache(cache_size)
+        self.semantic_cache = semantic_cache
+        self.usage: Dict[str, AgentUsage] = {}
+
+    def _agent(self, body: Dict[str, Any]) -> AgentUsage:
+        return self.usage.setdefault(body.get("agent") or "unknown", AgentUsage())
+
+    def _provider_body(self, body: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        payload = {key: value for key, value in body.items() if key not in GATEWAY_FIELDS}
+        payload["stream"] = stream
+        return payload
+
+    async def _lookup(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve cache keys and return a cache hit if there is one"""
+        exact, partition = _cache_keys(body)
+        lookup = {"exact_key": exact, "partition": partition, "vector": None, "hit": None}
+        if not body.get("cache", True):
+            return lookup
+        entry = self.exact_cache.get(exact)
+        if entry is not None:
+            lookup["hit"] = ("exact", entry, 1.0)
+            return lookup
+        if self.semantic_cache is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                vector = await loop.run_in_executor(None, self.semantic_cache.embed, _prompt_text(body["messages"]))
+            except Exception as e:
+                # The cache never blocks generation when the embedding model is unavailable
+                self.semantic_cache.embedding_errors += 1
+                logger.warning(f"⚠️  Prompt embedding failed, skipping the semantic cache: {e}")
+                return lookup
+            lookup["vector"] = vector
+            match = self.semantic_cache.get(partition, vector)
+            if match is not None:
+                lookup["hit"] = ("semantic", match[0], match[1])
+        return lookup
+
+    def _store(self, body: Dict[str, Any], lookup: Dict[str, Any], entry: Dict[str, Any]):
+        if not body.get("cache", True):
+            return
+        self.exact_cache.put(lookup["exact_key"], entry)
+        if self.semantic_cache is not None and lookup["vector"] is not None:
+            self.semantic_cache.put(lookup["partition"], lookup["vector"], entry)
+
+    def _record_hit(self, usage: AgentUsage, kind: str, entry: Dict[str, Any]):
+        if kind == "exact":
+            usage.exact_hits += 1
+        else:
+            usage.semantic_hits += 1
+        usage.saved_completion_tokens += entry["completion_tokens"]
+
+    def _record_generation(self, usage: AgentUsage, body: Dict[str, Any], content: str,
+                           provider_usage: Optional[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+        provider_usage = provider_usage or {}
+        prompt_tokens = provider_usage.get("prompt_tokens") or _estimate_tokens(_prompt_text(body["messages"]))
+        completion_tokens = provider_usage.get("completion_tokens") or _estimate_tokens(content)
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+        usage.provider_seconds += seconds
+        return {"content": content, "model": body["model"], "completion_tokens": completion_tokens,
+                "prompt_tokens": prompt_tokens, "created": int(time.time())}
+
+    @staticmethod
+    def _completion(entry: Dict[str, Any], cache: Optional[str], similarity: Optional[float] = None) -> Dict[str, Any]:
+        response = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": entry["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": entry["content"]},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": entry["prompt_tokens"], "completion_tokens": entry["completion_tokens"],
+                      "total_tokens": entry["prompt_tokens"] + entry["completion_tokens"]},
+            "cache": cache
+        }
+        if similarity is not None:
+            response["cache_similarity"] = round(similarity, 4)
+        return response
+
+    async def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a non-streaming chat completion request
+
+        Returns:
+            OpenAI-format chat completion with an extra "cache" field (exact, semantic or None)
+        """
+        body = {**body, "model": body.get("model") or self.default_model}
+        usage = self._agent(body)
+        usage.requests += 1
+        lookup = await self._lookup(body)
+        if lookup["hit"]:
+            kind, entry, similarity = lookup["hit"]
+            self._record_hit(usage, kind, entry)
+            return self._completion(entry, kind, similarity if kind == "semantic" else None)
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(self.provider_url, json=self._provider_body(body, stream=False))
+            response.raise_for_status()
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+        except Exception:
+            usage.errors += 1
+            raise
+        entry = self._record_generation(usage, body, content, data.get("usage"), time.perf_counter() - started)
+        self._store(body, lookup, entry)
+        data["cache"] = None
+        return data
+
+    async def open_stream(self, body: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """
+        Start a streaming chat completion request
+
+        Provider errors are raised here, before any bytes are sent to the caller
+
+        Returns:
+            Iterator over server-sent event lines in OpenAI streaming format
+        """
+        body = {**body, "model": body.get("model") or self.default_model}
+        usage = self._agent(body)
+        usage.requests += 1
+        lookup = await self._lookup(body)
+        if lookup["hit"]:
+            kind, entry, _ = lookup["hit"]
+            self._record_hit(usage, kind, entry)
+            return self._replay(entry, kind)
+
+        started = time.perf_counter()
+        request = self.client.build_request("POST", self.provider_url, json=self._provider_body(body, stream=True))
+        try:
+            response = await self.client.send(request, stream=True)
+            if response.status_code >= 400:
+                await response.aread()
+                await response.aclose()
+                response.raise_for_status()
+        except Exception:
+            usage.errors += 1
+            raise
+        return self._pass_through(response, body, usage, lookup, started)
+
+    async def _replay(self, entry: Dict[str, Any], kind: str) -> AsyncIterator[bytes]:
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        for delta, finish_reason in (({"role": "assistant", "content": entry["content"]}, None), ({}, "stop")):
+            chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": entry["model"], "cache": kind,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+    async def _pass_through(self, response: httpx.Response, body: Dict[str, Any], usage: AgentUsage,
+                            lookup: Dict[str, Any], started: float) -> AsyncIterator[bytes]:
+        """Forward provider events as they arrive and cache the completed text"""
+        parts = []
+        provider_usage = None
+        completed = False
+        try:
+            async for line in response.aiter_lines():
+                yield f"{line}\n".encode("utf-8")
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):].strip()
+                if data == "[DONE]":
+                    completed = True
+                    continue
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                provider_usage = chunk.get("usage") or provider_usage
+                for choice in chunk.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        parts.append(content)
+                    if choice.get("finish_reason"):
+                        completed = True
+        finally:
+            await response.aclose()
+            # Streams cut short by the client or the provider are metered but never cached
+            entry = self._record_generation(usage, body, "".join(parts), provider_usage,
+                                            time.perf_counter() - started)
+            if completed:
+                self._store(body, lookup, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        agents = {name: usage.to_dict() for name, usage in sorted(self.usage.items())}
+        requests = sum(usage.requests for usage in self.usage.values())
+        hits = sum(usage.exact_hits + usage.semantic_hits for usage in self.usage.values())
+        return {
+            "provider_url": self.provider_url,
+            "default_model": self.default_model,
+            "requests": requests,
+            "cache_hit_rate": round(hits / requests, 4) if requests else 0.0,
+            "exact_cache_entries": len(self.exact_cache),
+            "semantic_cache": {
+                "entries": len(self.semantic_cache),
+                "threshold": self.semantic_cache.threshold,
+                "embedding_errors": self.semantic_cache.embedding_errors
+            } if self.semantic_cache is not None else None,
+            "agents": agents
+        }
+
+    async def close(self):
+        await self.client.aclose()
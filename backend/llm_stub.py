@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Stub LLM provider
+Minimal OpenAI-compatible chat completions server that answers with a
+deterministic echo of the last user message, for exercising the /llm gateway
+without Ollama or a Gemini key
+Usage: python backend/llm_stub.py --port 11500 [--delay 0.05]
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+class ChatRequest(BaseModel):
+    model: str = "stub"
+    messages: List[Dict[str, Any]]
+    stream: bool = False
+    temperature: Optional[float] = None
+
+
+def create_app(delay: float = 0.0) -> FastAPI:
+    """Build the stub provider; delay is the simulated generation time per word"""
+    app = FastAPI(title="LLM Stub", version="1.0.0")
+    state = {"requests": 0}
+
+    def answer(request: ChatRequest) -> List[str]:
+        prompt = request.messages[-1].get("content", "") if request.messages else ""
+        return f"Stub answer #{state['requests']} to: {prompt[:200]}".split(" ")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": state["requests"]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: ChatRequest):
+        state["requests"] += 1
+        words = answer(request)
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.messages)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+
+        if not request.stream:
+            await asyncio.sleep(delay * len(words))
+            return {
+                "id": f"stub-{state['requests']}", "object": "chat.completion", "created": int(time.time()),
+                "model": request.model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                             "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        async def events():
+            for i, word in enumerate(words):
+                await asyncio.sleep(delay)
+                chunk = {"id": f"stub-{state['requests']}", "object": "chat.completion.chunk",
+                         "model": request.model,
+                         "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                                      "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {"id": f"stub-{state['requests']}", "object": "chat.completion.chunk", "model": request.model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Serve a stub OpenAI-compatible LLM')
+    parser.add_argument('--host', default="127.0.0.1", help='Bind address')
+    parser.add_argument('--port', type=int, default=11500, help='Port')
+    parser.add_argument('--delay', type=float, default=0.0, help='Simulated seconds per generated word')
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.delay), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
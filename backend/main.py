@@ -4,25 +4,50 @@ FastAPI Backend for Multi-Agent Research Assistant
 Provides tool endpoints for research agents including ChromaDB search
 """
 
-from fastapi import FastAPI, HTTPException, Request
+import time
+
+# Reference point of the startup-time report
+PROCESS_STARTED = time.perf_counter()
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import uvicorn
 import os
 import sys
 import logging
+import uuid
+import hmac
+import shutil
+import asyncio
 from datetime import datetime
 
 # Add the parent directory to path to import chromadb_search_tool
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from chromadb_search_tool import search_papers_for_fastapi, ChromaDBSearchTool
-except ImportError:
-    print("Warning: chromadb_search_tool not found. ChromaDB search will be disabled.")
-    search_papers_for_fastapi = None
-    ChromaDBSearchTool = None
+from request_coalescing import SingleFlight, normalize_query
+from tool_scheduler import FairToolScheduler
+from ingest_jobs import IngestJobManager, COLLECTIONS_DIR
+from markdown_watcher import MarkdownWatcher
+from sharded_search import ShardedSearchCoordinator
+from summary_cache import SummaryCache, prompt_hash, subject_key, paper_id_of_chunk
+from llm_gateway import LLMGateway, SemanticResponseCache
+from checkpoint_store import CheckpointStore
+from mission_store import MissionStore, is_valid_mission_id
+from artifact_index import ArtifactIndex, artifact_path
+from artifact_writer import ArtifactWriter
+from chat_memory import ChatMemory, RECENT_TURNS, extractive_summary
+from search_cache import SearchResultCache, QueryLog, CachePrewarmer, activity_searches, SEARCH_OPERATION
+from collection_config import DEFAULT_MIN_SIMILARITY
+from wire_format import encoded_response, etag_of, parse_fields, project, wants_structured
+from profiling import (
+    SlowRequestRecorder, SlowRequestMiddleware, Profiler, stage, record_stages, label_request
+)
+from reranker import SearchReranker, LexicalScorer, CrossEncoderScorer, DEFAULT_CROSS_ENCODER
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +69,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Requests slower than SLOW_REQUEST_MS are kept with stage timings and stack samples for /admin/slow-requests
+slow_requests = SlowRequestRecorder(
+    threshold_seconds=float(os.getenv("SLOW_REQUEST_MS", "1000")) / 1000,
+    capacity=int(os.getenv("SLOW_REQUEST_BUFFER", "100")),
+    sample_interval=float(os.getenv("SLOW_REQUEST_SAMPLE_MS", "10")) / 1000
+)
+app.add_middleware(SlowRequestMiddleware, recorder=slow_requests)
+
+# On-demand cProfile and sampling sessions (/admin/profile)
+profiler = Profiler()
+
+# Admin endpoints need this token in X-Admin-Token; without it they only answer loopback clients
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(request: Request):
+    """Dependency restricting an endpoint to administrators"""
+    if ADMIN_TOKEN:
+        if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+            raise HTTPException(status_code=401, detail="Admin token required")
+    elif not request.client or request.client.host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are local-only unless ADMIN_TOKEN is set")
+
 # Pydantic models for request/response
 class ToolRequest(BaseModel):
     agent_name: str
@@ -58,6 +105,47 @@ class ToolResponse(BaseModel):
     error: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
+class IngestRequest(BaseModel):
+    collection: str = "LLM_Reasoning_Agents"
+    chroma_collection: str = "llm_reasoning_agents_papers"
+    paper_ids: Optional[List[str]] = None
+    removed_paper_ids: List[str] = []
+    convert: bool = False
+    converter: str = "mineru"
+    workers: Optional[int] = None
+    load_metadata: bool = True
+    groups: List[str] = []
+
+class SummaryKey(BaseModel):
+    paper_id: Optional[str] = None
+    chunk_ids: Optional[List[str]] = None
+    prompt_template: str
+    model: str
+
+class SummaryEntry(SummaryKey):
+    summary: str
+    metadata: Dict[str, Any] = {}
+
+class LLMRequest(BaseModel):
+    messages: List[Dict[str, Any]]
+    model: Optional[str] = None
+    stream: bool = False
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    max_tokens: Optional[int] = None
+    agent: Optional[str] = None
+    cache: bool = True
+
+class CheckpointRequest(BaseModel):
+    state: Dict[str, Any]
+    name: Optional[str] = None
+
+class MissionCreateRequest(BaseModel):
+    userId: str
+    title: str
+    description: Optional[str] = None
+    documentGroupIds: List[str] = []
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: str
@@ -66,33 +154,546 @@ class HealthResponse(BaseModel):
 # Global search tool instance
 search_tool = None
 
+# Startup pipeline: the server listens right away and reports ready once the index is warm
+startup_state: Dict[str, Any] = {"stage": "starting", "ready": False, "error": None, "timings": {}}
+
+def _record_timing(name: str, started: float):
+    startup_state["timings"][name] = round(time.perf_counter() - started, 3)
+
+# Scatter-gather coordinator, used instead of search_tool when SEARCH_SHARDS is set
+sharded_search = None
+
+# Concurrent identical searches share one in-flight computation
+search_coalescer = SingleFlight()
+
+# Fair scheduling of searches across missions, agents and priority classes
+tool_scheduler = FairToolScheduler(
+    max_concurrency=int(os.getenv("TOOL_MAX_CONCURRENCY", "4")),
+    class_weights={
+        "interactive": float(os.getenv("TOOL_INTERACTIVE_WEIGHT", "8")),
+        "batch": float(os.getenv("TOOL_BATCH_WEIGHT", "1"))
+    }
+)
+
+# Query embeddings and local_search results, cleared when the collection changes
+search_cache = SearchResultCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+)
+
+# Overrides the collection's calibrated similarity cutoff for local_search results when set
+SEARCH_MIN_SIMILARITY = float(os.environ["SEARCH_MIN_SIMILARITY"]) if os.getenv("SEARCH_MIN_SIMILARITY") else None
+
+# Optional second stage of local_search, selected per request with metadata.rerank
+search_reranker = SearchReranker(
+    [LexicalScorer(), CrossEncoderScorer(os.getenv("RERANK_MODEL", DEFAULT_CROSS_ENCODER))],
+    budget_seconds=float(os.getenv("RERANK_BUDGET_MS", "150")) / 1000,
+    cache_size=int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+)
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_DEFAULT_SCORER = os.getenv("RERANK_DEFAULT_SCORER", "lexical")
+
+# Searches served by this server, mined together with the missions' activity logs for pre-warming.
+# Appends are buffered and flushed off the event loop; the file is compacted beyond its size or age cap.
+query_log = QueryLog(
+    max_bytes=int(os.getenv("QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024))),
+    max_age_days=float(os.getenv("PREWARM_WINDOW_DAYS", "90"))
+)
+QUERY_LOG_FLUSH_SECONDS = float(os.getenv("QUERY_LOG_FLUSH_SECONDS", "5"))
+
 
 def initialize_search_tool():
     """Initialize ChromaDB search tool"""
     global search_tool
-    if ChromaDBSearchTool:
+    started = time.perf_counter()
+    try:
+        # Imported here so chromadb is not loaded before the server is listening
+        from chromadb_search_tool import ChromaDBSearchTool
+    except ImportError:
+        logger.warning("⚠️ ChromaDB search tool not available")
+        return
+    _record_timing("import_search_tool", started)
+    try:
+        # Build absolute path to ChromaDB directory regardless of CWD
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        chroma_db_path = os.path.join(project_root, 'backend', 'data', 'chromadb')
+
+        # Boot from a precomputed snapshot instead of re-embedding on this node
+        snapshot_dir = os.getenv("SEARCH_SNAPSHOT")
+        if snapshot_dir:
+            started = time.perf_counter()
+            from collection_snapshot import restore_if_needed
+            if restore_if_needed(get_chroma_client(), chroma_db_path, snapshot_dir):
+                logger.info(f"📦 Restored collections from snapshot {snapshot_dir}")
+            _record_timing("restore_snapshot", started)
+
+        started = time.perf_counter()
+        search_tool = ChromaDBSearchTool(db_path=chroma_db_path)
+        _record_timing("open_index", started)
+        if getattr(search_tool, 'collection', None):
+            logger.info("✅ ChromaDB search tool initialized successfully")
+        else:
+            logger.warning("⚠️  ChromaDB search tool created but collection is unavailable")
+            search_tool = None
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize ChromaDB search tool: {e}")
+        search_tool = None
+
+def initialize_sharded_search():
+    """Connect to the shard workers listed in SEARCH_SHARDS"""
+    global sharded_search
+    shard_urls = [url.strip() for url in os.getenv("SEARCH_SHARDS", "").split(",") if url.strip()]
+    if not shard_urls:
+        return
+    # Shards embed queries themselves until warm_up() attaches the local embedding model
+    sharded_search = ShardedSearchCoordinator(
+        shard_urls,
+        timeout=float(os.getenv("SEARCH_SHARD_TIMEOUT", "2"))
+    )
+    logger.info(f"✅ Sharded search across {len(shard_urls)} shards")
+
+def warm_up() -> bool:
+    """
+    Open the index and load the embedding model in the background
+    Each stage is timed into startup_state["timings"]
+    """
+    try:
+        if sharded_search:
+            startup_state["stage"] = "loading_embedding_model"
+            started = time.perf_counter()
+            try:
+                from chromadb.utils import embedding_functions
+                embedding_function = embedding_functions.DefaultEmbeddingFunction()
+                embedding_function(["warm up"])
+                sharded_search.embedding_function = embedding_function
+            except Exception as e:
+                logger.warning(f"⚠️  Query embedding unavailable, shards will embed queries: {e}")
+            _record_timing("load_embedding_model", started)
+        else:
+            startup_state["stage"] = "opening_index"
+            initialize_search_tool()
+            if not search_tool:
+                raise RuntimeError("ChromaDB search tool unavailable")
+            # The first query loads the embedding model and pages in the index
+            startup_state["stage"] = "first_query"
+            started = time.perf_counter()
+            result = search_tool.search("reasoning agents", 1)
+            if not result["success"]:
+                raise RuntimeError(result.get("error", "warm-up query failed"))
+            _record_timing("first_query", started)
+        return True
+    except Exception as e:
+        startup_state.update(stage="failed", error=str(e))
+        logger.error(f"❌ Warm-up failed, /ready will report not ready: {e}")
+        return False
+
+def search_local_collection(query: str, n_results: int, groups: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Search the local collection, embedding the query only when its embedding is not cached"""
+    query_embedding = search_cache.get_embedding(query)
+    if query_embedding is None:
+        with stage("embed_query"):
+            query_embedding = search_tool.embedding_function([query])[0]
+        search_cache.put_embedding(query, query_embedding)
+    results = search_tool.search(query, n_results, query_embedding=query_embedding, groups=groups)
+    record_stages(results.get("timings"), "search.")
+    return results
+
+async def run_local_search(query: str, n_results: int, groups: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Search the shards when sharding is enabled, otherwise the local collection"""
+    if sharded_search:
+        return await sharded_search.search(query, n_results, groups)
+    return await run_in_threadpool(search_local_collection, query, n_results, groups)
+
+async def search_and_cache(query: str, n_results: int, groups: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run a local search and cache it when it succeeded"""
+    results = await run_local_search(query, n_results, groups)
+    if results["success"]:
+        search_cache.put(query, n_results, results, groups)
+    return results
+
+def get_chroma_client():
+    """ChromaDB client shared by ingestion jobs and the search tool"""
+    if search_tool and search_tool.client:
+        return search_tool.client
+    import chromadb
+    from chromadb.config import Settings
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # Same settings as the search tool, so both resolve to one client per path
+    return chromadb.PersistentClient(
+        path=os.path.join(project_root, 'backend', 'data', 'chromadb'),
+        settings=Settings(anonymized_telemetry=False)
+    )
+
+def refresh_search_tool(collection_name: str):
+    """Swap newly ingested papers into the live search tool"""
+    if search_tool and search_tool.collection_name == collection_name:
+        search_tool.refresh()
+    elif not search_tool:
+        initialize_search_tool()
+        # The first ingest into an empty node makes it ready without waiting for the next warm-up retry
+        if search_tool and not sharded_search and not startup_state["ready"]:
+            startup_state.update(stage="ready", ready=True, error=None)
+            logger.info("✅ Ready after ingest")
+    search_cache.invalidate()
+
+# Literature summaries shared across missions; re-ingesting a paper invalidates its summaries
+summary_cache = SummaryCache(
+    max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "20000")),
+    max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_MB", "200")) * 1024 * 1024
+)
+
+# Workflow states saved per thread as compressed deltas with periodic full snapshots
+checkpoint_store = CheckpointStore(snapshot_interval=int(os.getenv("CHECKPOINT_SNAPSHOT_INTERVAL", "8")))
+
+# Missions and their chat, activity, feedback and artifact manifests
+mission_store = MissionStore()
+
+# Route names of the append-only mission event tables
+MISSION_EVENTS = {"chat": "chat_messages", "activity": "activity_events", "feedback": "feedback"}
+
+# Background ingestion runs on its own executor, away from request handling
+ingest_jobs = IngestJobManager(
+    get_client=get_chroma_client,
+    on_complete=refresh_search_tool,
+    on_paper_changed=summary_cache.invalidate_paper
+)
+
+_fallback_embedding_function = None
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed texts with the search tool's embedding model instead of loading a second copy"""
+    global _fallback_embedding_function
+    if search_tool and search_tool.embedding_function:
+        return search_tool.embedding_function(texts)
+    if _fallback_embedding_function is None:
+        from chromadb.utils import embedding_functions
+        _fallback_embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    return _fallback_embedding_function(texts)
+
+def create_llm_gateway() -> LLMGateway:
+    """Gateway to the configured LLM provider, with the semantic cache when LLM_SEMANTIC_CACHE is set"""
+    semantic_cache = None
+    if os.getenv("LLM_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes"):
+        semantic_cache = SemanticResponseCache(
+            embed_texts,
+            threshold=float(os.getenv("LLM_SEMANTIC_THRESHOLD", "0.97")),
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "2000"))
+        )
+    return LLMGateway(
+        provider_url=os.getenv("LLM_PROVIDER_URL", "http://localhost:11434/v1/chat/completions"),
+        default_model=os.getenv("LLM_MODEL", "qwen3:4b"),
+        api_key=os.getenv("LLM_API_KEY"),
+        timeout=float(os.getenv("LLM_TIMEOUT", "300")),
+        cache_size=int(os.getenv("LLM_CACHE_SIZE", "2000")),
+        semantic_cache=semantic_cache
+    )
+
+# Agent LLM calls routed through the backend for caching and accounting
+llm_gateway = create_llm_gateway()
+
+# Passage index over each mission's generated artifacts, for task="artifact_search"
+artifact_index = ArtifactIndex(
+    embedding_function=embed_texts if os.getenv("ARTIFACT_VECTOR_SEARCH", "true").lower() in ("1", "true", "yes") else None
+)
+
+# Write-behind persistence for task="save_results"
+artifact_writer = ArtifactWriter(artifact_index.missions_dir, mission_store, artifact_index,
+                                 ack_timeout=float(os.getenv("ARTIFACT_ACK_TIMEOUT_SECONDS", "30")))
+
+# Embedded chat turns and rolling summaries per mission, for task="chat_memory"
+chat_memory = ChatMemory(
+    mission_store,
+    embedding_function=embed_texts,
+    segment_turns=int(os.getenv("CHAT_MEMORY_SEGMENT_TURNS", "20")),
+    half_life_turns=float(os.getenv("CHAT_MEMORY_HALF_LIFE_TURNS", "50")),
+    recency_weight=float(os.getenv("CHAT_MEMORY_RECENCY_WEIGHT", "0.3"))
+)
+CHAT_MEMORY_LLM_SUMMARIES = os.getenv("CHAT_MEMORY_LLM_SUMMARIES", "").lower() in ("1", "true", "yes")
+CHAT_SUMMARY_PROMPT = (
+    "You maintain the running summary of a research mission's conversation. Merge the previous summary "
+    "with the new turns. Keep decisions, findings, open questions and paper titles; drop chit-chat. "
+    "Answer with the updated summary only, at most 200 words."
+)
+_summarizing_missions: set = set()
+
+async def summarize_chat_segment(previous: Optional[str], turns: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """Fold one segment into the rolling summary; extractive unless LLM summaries are enabled and answer"""
+    if CHAT_MEMORY_LLM_SUMMARIES:
+        transcript = "\n".join(f"{turn['speaker']}: {turn['text']}" for turn in turns)
         try:
-            # Build absolute path to ChromaDB directory regardless of CWD
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            chroma_db_path = os.path.join(project_root, 'backend', 'data', 'chromadb')
+            response = await llm_gateway.complete({
+                "messages": [
+                    {"role": "system", "content": CHAT_SUMMARY_PROMPT},
+                    {"role": "user", "content": f"Previous summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"}
+                ],
+                "agent": "chat_memory",
+                "temperature": 0,
+                "max_tokens": 400
+            })
+            return response["choices"][0]["message"]["content"].strip(), "llm"
+        except Exception as e:
+            logger.warning(f"⚠️  LLM chat summary failed, using an extractive summary: {e}")
+    return extractive_summary(previous, turns), "extractive"
 
-            search_tool = ChromaDBSearchTool(db_path=chroma_db_path)
-            if getattr(search_tool, 'collection', None):
-                logger.info("✅ ChromaDB search tool initialized successfully")
-            else:
-                logger.warning("⚠️  ChromaDB search tool created but collection is unavailable")
-                search_tool = None
+async def summarize_chat_memory(mission_id: str):
+    """Fold a mission's closed segments into its rolling summary, one segment at a time"""
+    if mission_id in _summarizing_missions:
+        return
+    _summarizing_missions.add(mission_id)
+    try:
+        for segment in await run_in_threadpool(chat_memory.pending_segments, mission_id):
+            latest = await run_in_threadpool(chat_memory.latest_summary, mission_id)
+            summary, method = await summarize_chat_segment(latest["summary"] if latest else None, segment["turns"])
+            await run_in_threadpool(chat_memory.store_summary, mission_id, segment["segment"], segment["turns"],
+                                    summary, method)
+    except Exception as e:
+        logger.error(f"❌ Chat memory summary failed for {mission_id}: {e}")
+    finally:
+        _summarizing_missions.discard(mission_id)
+
+async def chat_memory_context(mission_id: str, query: str, k: int, recent: int) -> Dict[str, Any]:
+    """Memory context of a mission; closed segments are summarized in the background, off the request path"""
+    context = await run_in_threadpool(chat_memory.context, mission_id, query, k, recent)
+    asyncio.ensure_future(summarize_chat_memory(mission_id))
+    return context
+
+def collect_searches(since: str) -> List[Dict[str, Any]]:
+    """Semantic searches from the activity.json files, the mission store and the query log"""
+    stored = [{"timestamp": event.get("timestamp"), **(event.get("args") or {})}
+              for event in mission_store.operation_events(SEARCH_OPERATION, since)]
+    return activity_searches(artifact_index.missions_dir, since) + stored + query_log.read(since)
+
+async def prewarm_search(query: str, n_results: int, groups: Optional[List[str]] = None) -> Dict[str, Any]:
+    # Pre-warm searches share the scheduler with agents at batch priority
+    group_key = ",".join(sorted(groups)) if groups is not None else "*"
+    return await search_coalescer.do(
+        f"local_search:{n_results}:{group_key}:{query}",
+        lambda: tool_scheduler.run(lambda: search_and_cache(query, n_results, groups),
+                                   agent_name="cache_prewarm", priority="batch")
+    )
+
+# Runs the hottest recent queries ahead of users (PREWARM_ON_STARTUP, PREWARM_INTERVAL_SECONDS)
+search_prewarmer = CachePrewarmer(
+    search_cache,
+    collect_searches,
+    prewarm_search,
+    n_results=3,
+    max_queries=int(os.getenv("PREWARM_MAX_QUERIES", "200")),
+    window_days=float(os.getenv("PREWARM_WINDOW_DAYS", "90")),
+    half_life_days=float(os.getenv("PREWARM_HALF_LIFE_DAYS", "7"))
+)
+PREWARM_BUDGET_SECONDS = float(os.getenv("PREWARM_BUDGET_SECONDS", "10"))
+prewarm_task = None
+startup_task = None
+query_log_task = None
+# A failed warm-up (no collection yet, model download error) is retried with exponential backoff
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "300"))
+
+async def prewarm_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            report = await search_prewarmer.run(PREWARM_BUDGET_SECONDS)
+            logger.info(f"🔥 Pre-warmed {report['warmed']} of {report['candidates']} hot queries")
         except Exception as e:
-            logger.error(f"❌ Failed to initialize ChromaDB search tool: {e}")
-            search_tool = None
+            logger.error(f"❌ Periodic cache pre-warm failed: {e}")
+
+async def flush_query_log_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(query_log.flush)
+        except Exception as e:
+            logger.error(f"❌ Query log flush failed: {e}")
+
+async def finish_startup():
+    """Warm the index, optionally pre-warm the search cache, then mark the server ready"""
+    delay = WARMUP_RETRY_SECONDS
+    while not await run_in_threadpool(warm_up):
+        logger.info(f"🔁 Retrying warm-up in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        if startup_state["ready"]:
+            # An ingest job opened the index meanwhile
+            return
+        delay = min(2 * delay, WARMUP_RETRY_MAX_SECONDS)
+    if os.getenv("PREWARM_ON_STARTUP", "").lower() in ("1", "true", "yes"):
+        startup_state["stage"] = "prewarming_cache"
+        started = time.perf_counter()
+        try:
+            report = await search_prewarmer.run(PREWARM_BUDGET_SECONDS)
+            logger.info(f"🔥 Pre-warmed {report['warmed']} of {report['candidates']} hot queries "
+                        f"in {report['elapsed']}s")
+        except Exception as e:
+            # A cold cache is slower, not broken
+            logger.error(f"❌ Cache pre-warm failed: {e}")
+        _record_timing("prewarm_cache", started)
+    startup_state.update(stage="ready", ready=True)
+    _record_timing("ready_after_process_start", PROCESS_STARTED)
+    logger.info(f"✅ Ready: {startup_state['timings']}")
+
+# Opt-in watcher that re-indexes papers as new markdown lands
+markdown_watcher = None
+
+def start_markdown_watcher():
+    """Start the markdown watcher when WATCH_COLLECTION is set"""
+    global markdown_watcher
+    collection = os.getenv("WATCH_COLLECTION")
+    if not collection:
+        return
+    chroma_collection = os.getenv("WATCH_CHROMA_COLLECTION", "llm_reasoning_agents_papers")
+
+    def reindex(changed: List[str], removed: List[str]):
+        job = ingest_jobs.submit({
+            "collection": collection,
+            "chroma_collection": chroma_collection,
+            "paper_ids": changed,
+            "removed_paper_ids": removed,
+            "load_metadata": True
+        })
+        logger.info(f"📥 Watcher queued {job.id}: {len(changed)} changed, {len(removed)} removed papers")
+
+    markdown_watcher = MarkdownWatcher(
+        os.path.join(COLLECTIONS_DIR, collection, "markdown"),
+        reindex,
+        debounce=float(os.getenv("WATCH_DEBOUNCE_SECONDS", "5")),
+        retry=float(os.getenv("WATCH_RETRY_SECONDS", "30")),
+        force_polling=os.getenv("WATCH_FORCE_POLLING", "").lower() in ("1", "true", "yes")
+    )
+    markdown_watcher.start()
+
+def relevant_search_results(search_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Results above the collection's calibrated similarity cutoff"""
+    min_similarity = SEARCH_MIN_SIMILARITY if SEARCH_MIN_SIMILARITY is not None else \
+        search_results.get("min_similarity") or DEFAULT_MIN_SIMILARITY
+    return [r for r in search_results["results"] if r["similarity_score"] > min_similarity]
+
+def format_search_results(query: str, search_results: Dict[str, Any]) -> str:
+    """Format local search results as markdown for LLM consumption"""
+    if not search_results["results"]:
+        result = f"No relevant papers found for query: '{query}'"
     else:
-        logger.warning("⚠️ ChromaDB search tool not available")
+        relevant_results = relevant_search_results(search_results)
+        
+        if not relevant_results:
+            result = f"No sufficiently relevant papers found for query: '{query}'. The available papers are about LLM reasoning agents and multi-agent systems."
+        else:
+            # Format results for LLM consumption
+            result = f"# Research Papers Search Results\n\n"
+            result += f"**Query:** {query}\n"
+            result += f"**Found:** {len(relevant_results)} relevant papers\n\n"
+            
+            for i, search_result in enumerate(relevant_results, 1):
+                paper_id = search_result["paper_id"]
+                filename = search_result["filename"]
+                chunk_id = search_result["chunk_id"]
+                headers = search_result["headers"]
+                similarity = search_result["similarity_score"]
+                content = search_result["content"]
+                paper_metadata = search_result.get("paper_metadata", {})
+                
+                # Truncate content for readability
+                content_preview = content[:500] + "..." if len(content) > 500 else content
+                
+                result += f"## {i}. {paper_id} - Chunk {chunk_id} (Similarity: {similarity:.2f})\n"
+                result += f"**File:** {filename}\n"
+                if headers:
+                    result += f"**Section:** {headers}\n"
+                result += f"**Chunk Size:** {search_result['chunk_size']} chars\n\n"
+                result += f"{content_preview}\n\n"
+                
+                # Add paper metadata
+                result += f"**Paper Details:**\n"
+                result += f"- **ID:** {paper_id}\n"
+                result += f"- **Title:** {paper_metadata.get('title', 'Unknown')}\n"
+                result += f"- **Authors:** {paper_metadata.get('authors', 'Unknown')}\n"
+                result += f"- **Published:** {paper_metadata.get('published_date', 'Unknown')}\n"
+                result += f"- **Abstract:** {paper_metadata.get('abstract', 'No abstract available')[:200]}...\n"
+                result += f"- **Categories:** {paper_metadata.get('categories', '')}\n"
+                if paper_metadata.get('arxiv_url'):
+                    result += f"- **arXiv URL:** {paper_metadata.get('arxiv_url')}\n"
+                if paper_metadata.get('doi'):
+                    result += f"- **DOI:** {paper_metadata.get('doi')}\n"
+                
+                result += "\n---\n\n"
+    
+    return result
+
+def format_chat_memory(query: str, context: Dict[str, Any]) -> str:
+    """Format a mission's chat memory context as markdown for LLM consumption"""
+    if not context["total_turns"]:
+        return "No earlier conversation in this mission"
+    result = f"# Mission Conversation Memory\n\n"
+    result += f"**Query:** {query}\n"
+    result += f"**Turns in mission:** {context['total_turns']}\n\n"
+    if context["summary"]:
+        result += f"## Summary of the first {context['summary']['turns']} turns\n\n{context['summary']['summary']}\n\n"
+    if context["relevant"]:
+        result += "## Relevant earlier turns\n\n"
+        for turn in context["relevant"]:
+            result += f"**{turn['speaker']}** ({(turn['timestamp'] or '')[:16]}): {turn['text']}\n\n"
+    if context["recent"]:
+        result += "## Most recent turns\n\n"
+        for turn in context["recent"]:
+            result += f"**{turn['speaker']}**: {turn['text']}\n\n"
+    return result
+
+def format_artifact_results(query: str, passages: List[Dict[str, Any]]) -> str:
+    """Format artifact passages as markdown for LLM consumption"""
+    if not passages:
+        return f"No relevant passages in this mission's artifacts for query: '{query}'"
+    result = f"# Mission Artifact Passages\n\n"
+    result += f"**Query:** {query}\n"
+    result += f"**Found:** {len(passages)} passages\n\n"
+    for i, passage in enumerate(passages, 1):
+        result += f"## {i}. {os.path.basename(passage['path'])} - Chunk {passage['chunk_id']}\n"
+        if passage["section"]:
+            result += f"**Section:** {passage['section']}\n"
+        result += f"\n{passage['content']}\n\n---\n\n"
+    return result
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     logger.info("🚀 Starting Multi-Agent Research Assistant API...")
-    initialize_search_tool()
+    _record_timing("import", PROCESS_STARTED)
+    global prewarm_task, startup_task, query_log_task
+    initialize_sharded_search()
+    if not sharded_search:
+        # Shards embed queries themselves, so only the local search uses cached embeddings
+        search_prewarmer.embed = embed_texts
+    artifact_writer.start()
+    slow_requests.start()
+    start_markdown_watcher()
+    # Warm-up runs after the server starts listening; /ready turns 200 when it is done
+    startup_state["stage"] = "warming_up"
+    startup_task = asyncio.ensure_future(finish_startup())
+    query_log_task = asyncio.ensure_future(flush_query_log_periodically(QUERY_LOG_FLUSH_SECONDS))
+    interval = float(os.getenv("PREWARM_INTERVAL_SECONDS", "0"))
+    if interval > 0:
+        prewarm_task = asyncio.ensure_future(prewarm_periodically(interval))
+    _record_timing("listening_after_process_start", PROCESS_STARTED)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    if startup_task:
+        startup_task.cancel()
+    if prewarm_task:
+        prewarm_task.cancel()
+    if query_log_task:
+        query_log_task.cancel()
+    await run_in_threadpool(query_log.flush)
+    if markdown_watcher:
+        markdown_watcher.stop()
+    ingest_jobs.shutdown()
+    artifact_writer.stop()
+    search_reranker.close()
+    profiler.stop()
+    slow_requests.stop()
+    if sharded_search:
+        await sharded_search.close()
+    await llm_gateway.close()
 
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -105,11 +706,16 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: the process is up and serving requests (see /ready for readiness)"""
     services = {
         "api": "healthy",
-        "chromadb": "healthy" if search_tool else "unavailable"
+        "chromadb": "healthy" if search_tool else "unavailable",
+        "startup": startup_state["stage"]
     }
+    if sharded_search:
+        shard_health = await sharded_search.health()
+        healthy = sum(1 for status in shard_health.values() if status.get("status") == "healthy")
+        services["shards"] = f"{healthy}/{len(shard_health)} healthy"
     
     return HealthResponse(
         status="healthy",
@@ -117,29 +723,70 @@ async def health_check():
         services=services
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the index and embedding model are warm, 503 before (or if warm-up failed)"""
+    body = {**startup_state, "timestamp": datetime.now().isoformat()}
+    return JSONResponse(status_code=200 if startup_state["ready"] else 503, content=body)
+
 @app.post("/tool", response_model=ToolResponse)
-async def execute_tool(request: ToolRequest):
+async def execute_tool(request: ToolRequest, http_request: Request):
     """
     Execute a tool for a research agent
     
     Supported tasks:
     - local_search: Search ChromaDB for research papers
+    - artifact_search: Search the passages of a mission's generated artifacts
+    - chat_memory: Summary, relevant earlier turns and newest turns of a mission's conversation
     - web_search: Web search (placeholder for future implementation)
-    - save_results: Save results (placeholder for future implementation)
+    - save_results: Save an agent's output as a mission artifact
+    
+    Searches return structured results instead of markdown when
+    metadata.responseFormat is "structured" (or the Accept header asks for
+    it), projected to metadata.fields when given.
     """
     logger.info(f"🔧 Tool request: {request.agent_name} -> {request.task}")
+    label_request(agent=request.agent_name, task=request.task)
     
     try:
         if request.task == "local_search":
-            if not search_tool:
+            if not search_tool and not sharded_search:
                 return ToolResponse(
                     result="ChromaDB search tool not available",
                     success=False,
                     error="ChromaDB search tool not initialized"
                 )
             
-            # Use the global search tool instance
-            search_results = search_tool.search(request.query, n_results=3)
+            normalized_query = normalize_query(request.query)
+            # documentGroupIds restricts the search to the mission's document groups
+            groups = request.metadata.get("documentGroupIds")
+            if groups is not None and not (isinstance(groups, list) and all(isinstance(g, str) for g in groups)):
+                return ToolResponse(
+                    result="metadata.documentGroupIds must be a list of strings",
+                    success=False,
+                    error="Invalid document group IDs"
+                )
+            # rerank: true or a scorer name ('lexical', 'cross_encoder') over-fetches and reranks candidates
+            rerank = request.metadata.get("rerank")
+            scorer_name = RERANK_DEFAULT_SCORER if rerank is True else rerank or None
+            n_results = max(3, RERANK_CANDIDATES) if scorer_name else 3
+            query_log.append(normalized_query, groups)
+            with stage("cache_lookup"):
+                search_results = search_cache.get(normalized_query, n_results, groups)
+            if search_results is None:
+                # Identical concurrent searches are coalesced into one scheduled search
+                group_key = ",".join(sorted(groups)) if groups is not None else "*"
+                # Includes the scheduler's queue wait; the search.* stages break down the search itself
+                with stage("search"):
+                    search_results = await search_coalescer.do(
+                        f"local_search:{n_results}:{group_key}:{normalized_query}",
+                        lambda: tool_scheduler.run(
+                            lambda: search_and_cache(normalized_query, n_results, groups),
+                            mission_id=request.metadata.get("missionId") or request.metadata.get("mission_id", ""),
+                            agent_name=request.agent_name,
+                            priority=request.metadata.get("priority")
+                        )
+                    )
             
             if not search_results["success"]:
                 return ToolResponse(
@@ -148,53 +795,34 @@ async def execute_tool(request: ToolRequest):
                     error=search_results.get('error', 'Unknown error')
                 )
             
-            if not search_results["results"]:
-                result = f"No relevant papers found for query: '{request.query}'"
-            else:
-                # Filter out very low similarity results
-                relevant_results = [r for r in search_results["results"] if r["similarity_score"] > 0.1]
-                
-                if not relevant_results:
-                    result = f"No sufficiently relevant papers found for query: '{request.query}'. The available papers are about LLM reasoning agents and multi-agent systems."
-                else:
-                    # Format results for LLM consumption
-                    result = f"# Research Papers Search Results\n\n"
-                    result += f"**Query:** {request.query}\n"
-                    result += f"**Found:** {len(relevant_results)} relevant papers\n\n"
-                    
-                    for i, search_result in enumerate(relevant_results, 1):
-                        paper_id = search_result["paper_id"]
-                        filename = search_result["filename"]
-                        chunk_id = search_result["chunk_id"]
-                        headers = search_result["headers"]
-                        similarity = search_result["similarity_score"]
-                        content = search_result["content"]
-                        paper_metadata = search_result.get("paper_metadata", {})
-                        
-                        # Truncate content for readability
-                        content_preview = content[:500] + "..." if len(content) > 500 else content
-                        
-                        result += f"## {i}. {paper_id} - Chunk {chunk_id} (Similarity: {similarity:.2f})\n"
-                        result += f"**File:** {filename}\n"
-                        if headers:
-                            result += f"**Section:** {headers}\n"
-                        result += f"**Chunk Size:** {search_result['chunk_size']} chars\n\n"
-                        result += f"{content_preview}\n\n"
-                        
-                        # Add paper metadata
-                        result += f"**Paper Details:**\n"
-                        result += f"- **ID:** {paper_id}\n"
-                        result += f"- **Title:** {paper_metadata.get('title', 'Unknown')}\n"
-                        result += f"- **Authors:** {paper_metadata.get('authors', 'Unknown')}\n"
-                        result += f"- **Published:** {paper_metadata.get('published_date', 'Unknown')}\n"
-                        result += f"- **Abstract:** {paper_metadata.get('abstract', 'No abstract available')[:200]}...\n"
-                        result += f"- **Categories:** {paper_metadata.get('categories', '')}\n"
-                        if paper_metadata.get('arxiv_url'):
-                            result += f"- **arXiv URL:** {paper_metadata.get('arxiv_url')}\n"
-                        if paper_metadata.get('doi'):
-                            result += f"- **DOI:** {paper_metadata.get('doi')}\n"
-                        
-                        result += "\n---\n\n"
+            rerank_report = None
+            if scorer_name:
+                budget_ms = request.metadata.get("rerankBudgetMs")
+                with stage("rerank"):
+                    reranked, rerank_report = await search_reranker.rerank(
+                        normalized_query, search_results["results"], 3, scorer_name,
+                        float(budget_ms) / 1000 if budget_ms is not None else None
+                    )
+                search_results = {**search_results, "results": reranked, "total_found": len(reranked)}
+            
+            if wants_structured(http_request, request.metadata):
+                with stage("format"):
+                    fields = parse_fields(request.metadata.get("fields"))
+                    results = [project(r, fields) for r in relevant_search_results(search_results)]
+                    return encoded_response(http_request, {
+                        "success": True,
+                        "tool_type": "local_search",
+                        "query": request.query,
+                        "results": results,
+                        "total_found": len(results),
+                        "metric": search_results.get("metric"),
+                        "min_similarity": search_results.get("min_similarity"),
+                        "rerank": rerank_report,
+                        "timestamp": datetime.now().isoformat()
+                    })
+            
+            with stage("format"):
+                result = format_search_results(request.query, search_results)
             
             return ToolResponse(
                 result=result,
@@ -202,6 +830,76 @@ async def execute_tool(request: ToolRequest):
                 metadata={
                     "tool_type": "local_search",
                     "query": request.query,
+                    "rerank": rerank_report,
+                    "timestamp": datetime.now().isoformat()
+                }
+            )
+        
+        elif request.task == "artifact_search":
+            mission_id = request.metadata.get("missionId") or request.metadata.get("mission_id")
+            if not mission_id:
+                return ToolResponse(
+                    result="artifact_search requires metadata.missionId",
+                    success=False,
+                    error="Missing mission ID"
+                )
+            n_results = int(request.metadata.get("n_results", 5))
+            passages = await run_in_threadpool(artifact_index.search, mission_id, request.query, n_results)
+            if wants_structured(http_request, request.metadata):
+                fields = parse_fields(request.metadata.get("fields"))
+                return encoded_response(http_request, {
+                    "success": True,
+                    "tool_type": "artifact_search",
+                    "query": request.query,
+                    "mission_id": mission_id,
+                    "results": [project(passage, fields) for passage in passages],
+                    "total_found": len(passages),
+                    "timestamp": datetime.now().isoformat()
+                })
+            return ToolResponse(
+                result=format_artifact_results(request.query, passages),
+                success=True,
+                metadata={
+                    "tool_type": "artifact_search",
+                    "query": request.query,
+                    "mission_id": mission_id,
+                    "passages": len(passages),
+                    "timestamp": datetime.now().isoformat()
+                }
+            )
+        
+        elif request.task == "chat_memory":
+            mission_id = request.metadata.get("missionId") or request.metadata.get("mission_id")
+            if not mission_id:
+                return ToolResponse(
+                    result="chat_memory requires metadata.missionId",
+                    success=False,
+                    error="Missing mission ID"
+                )
+            context = await chat_memory_context(
+                mission_id,
+                request.query,
+                int(request.metadata.get("n_results", 5)),
+                int(request.metadata.get("recentTurns", RECENT_TURNS))
+            )
+            if wants_structured(http_request, request.metadata):
+                return encoded_response(http_request, {
+                    "success": True,
+                    "tool_type": "chat_memory",
+                    "query": request.query,
+                    "mission_id": mission_id,
+                    **context,
+                    "timestamp": datetime.now().isoformat()
+                })
+            return ToolResponse(
+                result=format_chat_memory(request.query, context),
+                success=True,
+                metadata={
+                    "tool_type": "chat_memory",
+                    "query": request.query,
+                    "mission_id": mission_id,
+                    "total_turns": context["total_turns"],
+                    "relevant": len(context["relevant"]),
                     "timestamp": datetime.now().isoformat()
                 }
             )
@@ -215,11 +913,43 @@ async def execute_tool(request: ToolRequest):
             )
         
         elif request.task == "save_results":
-            # Placeholder for save results implementation
+            mission_id = request.metadata.get("missionId") or request.metadata.get("mission_id")
+            if not mission_id:
+                return ToolResponse(
+                    result="save_results requires metadata.missionId",
+                    success=False,
+                    error="Missing mission ID"
+                )
+            if not is_valid_mission_id(mission_id) \
+                    or await run_in_threadpool(mission_store.get_mission, mission_id) is None:
+                return ToolResponse(
+                    result=f"Mission {mission_id} not found",
+                    success=False,
+                    error="Unknown mission ID"
+                )
+            # Returns once the save is durably queued; the artifact file is written in the background
+            entry = await artifact_writer.save(
+                mission_id,
+                request.query,
+                agent=request.metadata.get("agentId") or request.agent_name,
+                name=request.metadata.get("filename"),
+                message_id=request.metadata.get("messageId"),
+                metadata={key: value for key, value in request.metadata.items()
+                          if key not in ("missionId", "mission_id", "filename", "messageId")}
+            )
+            if entry.get("deduplicated"):
+                result = f"Identical content already saved as {entry['path']}"
+            else:
+                result = f"Saved {entry['name']} as {entry['path']}"
             return ToolResponse(
-                result="Save results not yet implemented. This is a placeholder response.",
+                result=result,
                 success=True,
-                error=None
+                metadata={
+                    "tool_type": "save_results",
+                    "mission_id": mission_id,
+                    "artifact": entry,
+                    "timestamp": datetime.now().isoformat()
+                }
             )
         
         else:
@@ -237,56 +967,369 @@ async def execute_tool(request: ToolRequest):
             error=str(e)
         )
 
+@app.get("/tool/stats")
+async def get_tool_stats():
+    """Get tool execution statistics"""
+    return {
+        "coalescing": search_coalescer.stats(),
+        "scheduler": tool_scheduler.stats(),
+        "sharding": sharded_search.stats() if sharded_search else None,
+        "search_cache": search_cache.stats(),
+        "search_prewarm": search_prewarmer.last_report,
+        "query_log": query_log.stats(),
+        "rerank": search_reranker.stats(),
+        "summary_cache": summary_cache.stats(),
+        "artifact_index": artifact_index.stats(),
+        "artifact_writer": artifact_writer.stats(),
+        "chat_memory": chat_memory.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/ingest")
+async def start_ingest(request: IngestRequest):
+    """Start a background ingestion job and return its ID"""
+    job = ingest_jobs.submit(request.dict())
+    logger.info(f"📥 Ingestion job {job.id} queued for {request.collection}")
+    return {"success": True, "job": job.to_dict()}
+
+@app.get("/ingest")
+async def list_ingest_jobs():
+    """List recent ingestion jobs"""
+    return {"jobs": ingest_jobs.list(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/ingest/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Get the status and progress of an ingestion job"""
+    job = ingest_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    return {"job": job.to_dict(), "timestamp": datetime.now().isoformat()}
+
+def _summary_subject(key: SummaryKey) -> str:
+    try:
+        return subject_key(key.paper_id, key.chunk_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/summaries/lookup")
+async def lookup_summary(key: SummaryKey):
+    """Return a cached summary for a paper or chunk set, prompt template and model"""
+    cached = summary_cache.get(_summary_subject(key), prompt_hash(key.prompt_template), key.model)
+    return {"hit": cached is not None, **(cached or {})}
+
+@app.put("/summaries")
+async def store_summary(entry: SummaryEntry):
+    """Store a summary after the LLM produced it"""
+    subject = _summary_subject(entry)
+    paper_ids = [entry.paper_id] if entry.paper_id else sorted({paper_id_of_chunk(c) for c in entry.chunk_ids})
+    summary_cache.put(subject, prompt_hash(entry.prompt_template), entry.model, entry.summary, paper_ids, entry.metadata)
+    return {"success": True, "subject": subject}
+
+@app.delete("/summaries/paper/{paper_id}")
+async def invalidate_paper_summaries(paper_id: str):
+    """Drop all summaries generated from a paper"""
+    return {"success": True, "removed": summary_cache.invalidate_paper(paper_id)}
+
+@app.get("/summaries/stats")
+async def get_summary_stats():
+    """Summary cache size, hit rate and evictions"""
+    return {"stats": summary_cache.stats(), "timestamp": datetime.now().isoformat()}
+
+@app.post("/llm")
+async def llm_completion(request: LLMRequest):
+    """OpenAI-compatible chat completions through the caching gateway"""
+    body = request.dict(exclude_none=True)
+    try:
+        if request.stream:
+            events = await llm_gateway.open_stream(body)
+            return StreamingResponse(events, media_type="text/event-stream")
+        return await llm_gateway.complete(body)
+    except Exception as e:
+        logger.error(f"❌ LLM provider error: {e}")
+        raise HTTPException(status_code=502, detail=f"LLM provider error: {e}")
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    """Per-agent token, latency and cache statistics of the LLM gateway"""
+    return {"stats": llm_gateway.stats(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/checkpoints/stats")
+async def get_checkpoint_stats():
+    """Checkpoint counts and stored vs full-JSON size"""
+    return {"stats": checkpoint_store.stats(), "timestamp": datetime.now().isoformat()}
+
+@app.put("/checkpoints/{thread_id}")
+async def save_checkpoint(thread_id: str, request: CheckpointRequest):
+    """Append a workflow state to a thread's checkpoint history"""
+    return await run_in_threadpool(checkpoint_store.save, thread_id, request.state, request.name)
+
+@app.get("/checkpoints/{thread_id}")
+async def list_checkpoints(thread_id: str):
+    """Steps of a thread, without their states"""
+    steps = checkpoint_store.steps(thread_id)
+    if not steps:
+        raise HTTPException(status_code=404, detail=f"No checkpoints for thread {thread_id}")
+    return {"thread_id": thread_id, "steps": steps}
+
+@app.get("/checkpoints/{thread_id}/latest")
+async def get_latest_checkpoint(thread_id: str):
+    """Latest state of a thread, for resuming"""
+    checkpoint = await run_in_threadpool(checkpoint_store.latest, thread_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail=f"No checkpoints for thread {thread_id}")
+    return checkpoint
+
+@app.get("/checkpoints/{thread_id}/steps/{step}")
+async def get_checkpoint(thread_id: str, step: int):
+    """State of a thread at any step"""
+    checkpoint = await run_in_threadpool(checkpoint_store.get, thread_id, step)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail=f"Step {step} of thread {thread_id} not found")
+    return checkpoint
+
+@app.delete("/checkpoints/{thread_id}")
+async def delete_checkpoints(thread_id: str):
+    """Delete a thread's checkpoint history"""
+    return {"success": True, "deleted": checkpoint_store.delete_thread(thread_id)}
+
+@app.get("/missions/stats")
+async def get_mission_stats():
+    """Row counts of the mission store"""
+    return {"stats": await run_in_threadpool(mission_store.stats), "timestamp": datetime.now().isoformat()}
+
+@app.post("/missions")
+async def create_mission(request: MissionCreateRequest):
+    """Create a mission"""
+    now = datetime.now().isoformat()
+    mission = {
+        "id": f"idea_{uuid.uuid4().hex[:8]}",
+        **request.dict(),
+        "status": "CREATED",
+        "createdAt": now,
+        "updatedAt": now,
+        "completedAt": None
+    }
+    return await run_in_threadpool(mission_store.upsert_mission, mission)
+
+@app.get("/missions")
+async def list_missions(user_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50, offset: int = 0):
+    """Missions filtered by user and status, most recently updated first"""
+    return await run_in_threadpool(mission_store.list_missions, user_id, status, limit, offset)
+
+async def _require_mission(mission_id: str):
+    if await run_in_threadpool(mission_store.get_mission, mission_id) is None:
+        raise HTTPException(status_code=404, detail=f"Mission {mission_id} not found")
+
+@app.get("/missions/{mission_id}")
+async def get_mission(mission_id: str):
+    mission = await run_in_threadpool(mission_store.get_mission, mission_id)
+    if mission is None:
+        raise HTTPException(status_code=404, detail=f"Mission {mission_id} not found")
+    return mission
+
+@app.patch("/missions/{mission_id}")
+async def update_mission(mission_id: str, fields: Dict[str, Any]):
+    """Update mission fields such as status or title"""
+    mission = await run_in_threadpool(mission_store.update_mission, mission_id,
+                                      {**fields, "updatedAt": datetime.now().isoformat()})
+    if mission is None:
+        raise HTTPException(status_code=404, detail=f"Mission {mission_id} not found")
+    return mission
+
+@app.delete("/missions/{mission_id}")
+async def delete_mission(mission_id: str):
+    """Delete a mission, its events, manifest and artifact files"""
+    if not is_valid_mission_id(mission_id) or not await run_in_threadpool(mission_store.delete_mission, mission_id):
+        raise HTTPException(status_code=404, detail=f"Mission {mission_id} not found")
+    await run_in_threadpool(shutil.rmtree, os.path.join(artifact_index.missions_dir, mission_id), True)
+    # Drops the deleted files' passages from the artifact index
+    await run_in_threadpool(artifact_index.sync_mission, mission_id)
+    return {"success": True, "mission_id": mission_id}
+
+@app.post("/missions/{mission_id}/artifacts")
+async def add_mission_artifact(mission_id: str, entry: Dict[str, Any]):
+    """Add a manifest entry for an artifact file"""
+    await _require_mission(mission_id)
+    try:
+        file_path = artifact_path(artifact_index.missions_dir, mission_id, entry.get("path") or "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    entry = {"id": f"file_{uuid.uuid4().hex[:8]}", "createdAt": datetime.now().isoformat(), **entry}
+    seq = await run_in_threadpool(mission_store.add_artifact, mission_id, entry)
+    if os.path.isfile(file_path):
+        await run_in_threadpool(artifact_index.index_file, mission_id, file_path)
+    return {**entry, "seq": seq}
+
+@app.get("/missions/{mission_id}/artifacts")
+async def list_mission_artifacts(mission_id: str, agent: Optional[str] = None, before: Optional[int] = None,
+                                 limit: int = 50):
+    """A mission's manifest entries, newest first; pass next_cursor as before for the next page"""
+    return await run_in_threadpool(mission_store.list_artifacts, mission_id, agent, before, limit)
+
+@app.get("/missions/{mission_id}/memory/search")
+async def search_mission_memory(mission_id: str, query: str, k: int = 5, recent: int = RECENT_TURNS):
+    """Rolling summary, the k earlier turns most relevant to the query and the newest turns of a mission's chat"""
+    await _require_mission(mission_id)
+    return {**await chat_memory_context(mission_id, query, k, recent), "timestamp": datetime.now().isoformat()}
+
+@app.post("/missions/{mission_id}/{kind}")
+async def append_mission_event(mission_id: str, kind: str, record: Dict[str, Any]):
+    """Append a chat message, activity event or feedback entry"""
+    if kind not in MISSION_EVENTS:
+        raise HTTPException(status_code=404, detail=f"Unknown mission event type: {kind}")
+    await _require_mission(mission_id)
+    record = {"timestamp": datetime.now().isoformat(), **record}
+    if kind == "chat":
+        record = {"id": f"msg_{uuid.uuid4().hex[:8]}", **record}
+    seq = await run_in_threadpool(mission_store.append_event, MISSION_EVENTS[kind], mission_id, record)
+    return {**record, "seq": seq}
+
+@app.get("/missions/{mission_id}/{kind}")
+async def list_mission_events(mission_id: str, kind: str, after: Optional[int] = None,
+                              before: Optional[int] = None, limit: int = 50):
+    """
+    One page of a mission's chat, activity or feedback
+    Newest first by default (page back with before=next_cursor); with after, oldest first
+    """
+    if kind not in MISSION_EVENTS:
+        raise HTTPException(status_code=404, detail=f"Unknown mission event type: {kind}")
+    return await run_in_threadpool(mission_store.list_events, MISSION_EVENTS[kind], mission_id, after, before, limit)
+
 @app.get("/search/stats")
-async def get_search_stats():
-    """Get ChromaDB collection statistics"""
+async def get_search_stats(request: Request):
+    """Get ChromaDB collection statistics; unchanged stats are answered with 304 for a matching If-None-Match"""
     if not search_tool:
         raise HTTPException(status_code=503, detail="ChromaDB search tool not available")
     
     try:
         stats = search_tool.get_collection_stats()
-        return {
+        # The tag covers the stats only, so the timestamp does not defeat revalidation
+        return encoded_response(request, {
             "success": True,
             "stats": stats,
             "timestamp": datetime.now().isoformat()
-        }
+        }, etag=etag_of(stats))
     except Exception as e:
         logger.error(f"❌ Error getting search stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get search stats: {str(e)}")
 
+@app.post("/search/prewarm")
+async def prewarm_search_cache(budget_seconds: Optional[float] = None):
+    """Pre-warm the search cache with the hottest recent queries now"""
+    if not search_tool and not sharded_search:
+        raise HTTPException(status_code=503, detail="ChromaDB search tool not initialized")
+    report = await search_prewarmer.run(budget_seconds if budget_seconds is not None else PREWARM_BUDGET_SECONDS)
+    return {"report": report, "cache": search_cache.stats(), "timestamp": datetime.now().isoformat()}
+
 @app.post("/search/test")
-async def test_search(query: str = "reasoning agents", n_results: int = 2):
-    """Test ChromaDB search functionality"""
+async def test_search(request: Request, query: str = "reasoning agents", n_results: int = 2,
+                      groups: Optional[str] = None, fields: Optional[str] = None):
+    """
+    Test ChromaDB search functionality, optionally restricted to comma-separated document groups
+    
+    fields projects every result to comma-separated (dotted) fields, e.g. paper_id,similarity_score,paper_metadata.title
+    """
     if not search_tool:
         raise HTTPException(status_code=503, detail="ChromaDB search tool not available")
     
     try:
-        results = search_tool.search(query, n_results)
-        return {
+        results = search_tool.search(query, n_results, groups=groups.split(",") if groups is not None else None)
+        projection = parse_fields(fields)
+        return encoded_response(request, {
             "success": results["success"],
             "query": query,
-            "results": results.get("results", []),
+            "results": [project(r, projection) for r in results.get("results", [])],
             "total_found": results.get("total_found", 0),
+            "metric": results.get("metric"),
+            "min_similarity": results.get("min_similarity"),
             "error": results.get("error"),
             "timestamp": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
         logger.error(f"❌ Error testing search: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search test failed: {str(e)}")
 
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def start_profiling(mode: str = "sampling", seconds: float = 30.0):
+    """Start a cProfile or sampling session that stops itself after the given seconds"""
+    try:
+        session = profiler.start(mode, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"session": session.to_dict(), "timestamp": datetime.now().isoformat()}
+
+@app.post("/admin/profile/stop", dependencies=[Depends(require_admin)])
+async def stop_profiling():
+    """Stop the running profiling session early"""
+    session = profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session is running")
+    return {"session": session.to_dict(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def list_profiling_sessions():
+    """List the running and recent profiling sessions"""
+    return {"sessions": profiler.list(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/admin/profile/{session_id}", dependencies=[Depends(require_admin)])
+async def get_profiling_session(session_id: str):
+    """Status of a profiling session, with the top entries of its result once finished"""
+    session = profiler.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Profiling session {session_id} not found")
+    return {"session": session.to_dict(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/admin/profile/{session_id}/download", dependencies=[Depends(require_admin)])
+async def download_profile(session_id: str):
+    """Download a finished session: pstats data (.prof) or folded stacks for flame graphs (.folded)"""
+    session = profiler.get(session_id)
+    if session is None or session.status != "finished" or not os.path.exists(session.path):
+        raise HTTPException(status_code=404, detail=f"No finished profile {session_id}")
+    media_type = "application/octet-stream" if session.mode == "cprofile" else "text/plain"
+    return FileResponse(session.path, media_type=media_type, filename=os.path.basename(session.path))
+
+@app.get("/admin/slow-requests", dependencies=[Depends(require_admin)])
+async def list_slow_requests(limit: int = 50, path: Optional[str] = None, stacks: bool = False):
+    """Recent requests over the SLOW_REQUEST_MS threshold with their stage timings, newest first"""
+    return {
+        "requests": slow_requests.list(limit, path, include_stacks=stacks),
+        "stats": slow_requests.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/admin/slow-requests/{request_id}", dependencies=[Depends(require_admin)])
+async def get_slow_request(request_id: str):
+    """One slow request including its stack samples"""
+    record = slow_requests.get(request_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Slow request {request_id} not found")
+    return record
+
+@app.delete("/admin/slow-requests", dependencies=[Depends(require_admin)])
+async def clear_slow_requests():
+    """Empty the slow-request buffer"""
+    slow_requests.clear()
+    return {"success": True, "stats": slow_requests.stats()}
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
-    return {"error": "Endpoint not found", "path": request.url.path}
+    detail = getattr(exc, 'detail', None)
+    return JSONResponse(
+        status_code=404,
+        content={"error": "Endpoint not found", "path": request.url.path, "detail": detail}
+    )
 
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc: Exception):
     if hasattr(exc, 'detail'):
         logger.error(f"Internal server error: {exc.detail}")
-        return {"error": "Internal server error", "detail": str(exc.detail)}
+        return JSONResponse(status_code=500, content={"error": "Internal server error", "detail": str(exc.detail)})
     else:
         logger.error(f"Internal server error: {str(exc)}")
-        return {"error": "Internal server error", "detail": str(exc)}
+        return JSONResponse(status_code=500, content={"error": "Internal server error", "detail": str(exc)})
 
 if __name__ == "__main__":
     # Run the FastAPI server
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Watches a collection's markdown directory and incrementally re-indexes papers
+Changes are picked up with inotify (via watchfiles) or by polling when that is
+not available, debounced per paper, and handed to the ingestion jobs so only the
+affected papers are re-chunked, upserted or removed
+Usage: python backend/markdown_watcher.py [--collection NAME] [--server URL] [--debounce SECONDS]
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+import urllib.request
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import watchfiles
+except ImportError:
+    watchfiles = None
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+COLLECTIONS_DIR = os.path.join(BACKEND_DIR, "data", "collections")
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+DEFAULT_POLL_INTERVAL = 2.0
+# Papers whose re-index failed (e.g. the server is down) are dispatched again after this delay
+DEFAULT_RETRY_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+def markdown_path_for(markdown_dir: str, paper_id: str) -> str:
+    """Expected MinerU output path of a paper"""
+    return os.path.join(markdown_dir, f"{paper_id}.md", paper_id, "auto", f"{paper_id}.md")
+
+
+class MarkdownWatcher:
+    """Debounced watcher that reports changed and removed papers of one collection"""
+
+    def __init__(self, markdown_dir: str, on_papers: Callable[[List[str], List[str]], None],
+                 debounce: float = DEFAULT_DEBOUNCE_SECONDS, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 force_polling: bool = False, retry: float = DEFAULT_RETRY_SECONDS):
+        """
+        Args:
+            markdown_dir: Collection markdown directory to watch
+            on_papers: Called with (changed paper IDs, removed paper IDs)
+            debounce: Seconds a paper must be quiet before it is re-indexed
+            poll_interval: Seconds between scans in polling mode (and timer ticks otherwise)
+            force_polling: Poll even when inotify is available
+            retry: Seconds before papers whose re-index failed are dispatched again
+        """
+        self.markdown_dir = os.path.abspath(markdown_dir)
+        self.on_papers = on_papers
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.retry = retry
+        self.mode = "polling" if force_polling or watchfiles is None else "inotify"
+
+        self._pending: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dispatched = 0
+        self.failures = 0
+
+    def start(self):
+        """Start watching on a daemon thread"""
+        self._thread = threading.Thread(target=self.run, name="markdown-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def paper_id_for(self, path: str) -> Optional[str]:
+        """Paper ID of any path inside a paper's {paper_id}.md directory"""
+        relative = os.path.relpath(os.path.abspath(path), self.markdown_dir)
+        top = relative.split(os.sep)[0]
+        if top in (".", "..") or not top.endswith(".md"):
+            return None
+        return top.replace('.md', '')
+
+    def run(self):
+        """Watch until stop() is called"""
+        os.makedirs(self.markdown_dir, exist_ok=True)
+        logger.info(f"👀 Watching {self.markdown_dir} ({self.mode}, {self.debounce:.1f}s debounce)")
+        events = self._inotify_events() if self.mode == "inotify" else self._polling_events()
+        for paths in events:
+            now = time.monotonic()
+            for path in paths:
+                paper_id = self.paper_id_for(path)
+                if paper_id:
+                    self._pending[paper_id] = now
+            self._flush(now)
+            if self._stop.is_set():
+                break
+
+    def _flush(self, now: float):
+        ready = [paper_id for paper_id, seen in self._pending.items() if now - seen >= self.debounce]
+        if not ready:
+            return
+
+        changed, removed = [], []
+        for paper_id in sorted(ready):
+            if os.path.exists(markdown_path_for(self.markdown_dir, paper_id)):
+                changed.append(paper_id)
+            else:
+                removed.append(paper_id)
+        try:
+            self.on_papers(changed, removed)
+        except Exception as e:
+            # Keep the papers pending so the change is not lost, and retry once the delay has passed
+            self.failures += 1
+            for paper_id in ready:
+                self._pending[paper_id] = now + self.retry - self.debounce
+            logger.error(f"❌ Re-indexing {len(ready)} papers failed, retrying in {self.retry:.1f}s: {str(e)}")
+            return
+        for paper_id in ready:
+            del self._pending[paper_id]
+        self.dispatched += len(ready)
+
+    def _inotify_events(self) -> Iterator[Set[str]]:
+        # Empty sets on timeout keep the debounce timer ticking
+        for changes in watchfiles.watch(
+            self.markdown_dir,
+            stop_event=self._stop,
+            rust_timeout=int(self.poll_interval * 1000),
+            yield_on_timeout=True
+        ):
+            yield {path for _, path in changes}
+
+    def _snapshot(self) -> Dict[str, Tuple[float, int]]:
+        snapshot = {}
+        for root, _, files in os.walk(self.markdown_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def _polling_events(self) -> Iterator[Set[str]]:
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            changed = {path for path, state in current.items() if previous.get(path) != state}
+            changed.update(path for path in previous if path not in current)
+            previous = current
+            yield changed
+
+
+def post_to_server(server_url: str, collection: str, chroma_collection: str) -> Callable[[List[str], List[str]], None]:
+    """Handler for sidecar mode that queues ingestion jobs on a running server"""
+    def handler(changed: List[str], removed: List[str]):
+        payload = {
+            "collection": collection,
+            "chroma_collection": chroma_collection,
+            "paper_ids": changed,
+            "removed_paper_ids": removed
+        }
+        request = urllib.request.Request(
+            f"{server_url.rstrip('/')}/ingest",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            job = json.loads(response.read())["job"]
+        logger.info(f"📥 Queued {job['id']}: {len(changed)} changed, {len(removed)} removed papers")
+    return handler
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Watch a collection and re-index changed markdown')
+    parser.add_argument('--collection', default="LLM_Reasoning_Agents", help='Collection directory name')
+    parser.add_argument('--chroma-collection', default="llm_reasoning_agents_papers", help='Chunk collection')
+    parser.add_argument('--server', default="http://localhost:8000", help='Backend that runs the ingestion jobs')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE_SECONDS, help='Quiet seconds before re-indexing')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help='Seconds between polls')
+    parser.add_argument('--force-polling', action='store_true', help='Poll instead of using inotify')
+    parser.add_argument('--retry', type=float, default=DEFAULT_RETRY_SECONDS, help='Seconds before a failed re-index is retried')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    watcher = MarkdownWatcher(
+        os.path.join(COLLECTIONS_DIR, args.collection, "markdown"),
+        post_to_server(args.server, args.collection, args.chroma_collection),
+        debounce=args.debounce,
+        poll_interval=args.poll_interval,
+        force_polling=args.force_polling,
+        retry=args.retry
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped after re-indexing {watcher.dispatched} papers")
+
+
+if __name__ == "__main__":
+    main()
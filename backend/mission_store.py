@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Indexed mission store
+Missions, chat messages, activity events, feedback and artifact manifests in
+one SQLite database (WAL mode) instead of JSON arrays that are rewritten on
+every append. Events are append-only rows, lists are indexed by user, status,
+mission and timestamp, and every list is paginated with a seq cursor so busy
+missions never load their whole history.
+Usage: python backend/mission_store.py import [--data-dir backend/data]
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+MISSION_DB_PATH = os.path.join(DATA_DIR, "missions.sqlite3")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Mission IDs name directories under idea_missions/, so only plain slugs are accepted
+MISSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+# Append-only event tables: name -> (per-event columns taken from the record, record field for each column)
+EVENT_TABLES = {
+    "chat_messages": {"message_id": "id", "role": "role", "timestamp": "timestamp"},
+    "activity_events": {"user_id": "userId", "operation": "operation", "timestamp": "timestamp"},
+    "feedback": {"message_id": "messageId", "user_id": "userId", "timestamp": "timestamp"},
+}
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS missions ("
+    "id TEXT PRIMARY KEY, user_id TEXT, status TEXT, created_at TEXT, updated_at TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS missions_by_user ON missions (user_id, updated_at)",
+    "CREATE INDEX IF NOT EXISTS missions_by_status ON missions (status, updated_at)",
+    "CREATE INDEX IF NOT EXISTS missions_by_update ON missions (updated_at)",
+
+    "CREATE TABLE IF NOT EXISTS chat_messages ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, mission_id TEXT NOT NULL, message_id TEXT, role TEXT, "
+    "timestamp TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS chat_by_mission ON chat_messages (mission_id, seq)",
+    "CREATE INDEX IF NOT EXISTS chat_by_time ON chat_messages (mission_id, timestamp)",
+
+    "CREATE TABLE IF NOT EXISTS activity_events ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, mission_id TEXT NOT NULL, user_id TEXT, operation TEXT, "
+    "timestamp TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS activity_by_mission ON activity_events (mission_id, seq)",
+    "CREATE INDEX IF NOT EXISTS activity_by_user ON activity_events (user_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS activity_by_time ON activity_events (timestamp)",
+    "CREATE INDEX IF NOT EXISTS activity_by_operation ON activity_events (operation, timestamp)",
+
+    "CREATE TABLE IF NOT EXISTS feedback ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, mission_id TEXT NOT NULL, message_id TEXT, user_id TEXT, "
+    "timestamp TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS feedback_by_mission ON feedback (mission_id, seq)",
+
+    "CREATE TABLE IF NOT EXISTS artifacts ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, mission_id TEXT NOT NULL, agent TEXT, "
+    "created_at TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS artifacts_by_mission ON artifacts (mission_id, seq)",
+    "CREATE INDEX IF NOT EXISTS artifacts_by_time ON artifacts (mission_id, created_at)",
+]
+
+
+def is_valid_mission_id(mission_id: Any) -> bool:
+    return isinstance(mission_id, str) and MISSION_ID_PATTERN.fullmatch(mission_id) is not None
+
+
+def _page(rows: List[tuple], limit: int, descending: bool) -> Dict[str, Any]:
+    """Items of one page plus the cursor of the next page (None on the last page)"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [{**json.loads(data), "seq": seq} for seq, data in rows]
+    next_cursor = rows[-1][0] if has_more else None
+    return {"items": items, "next_cursor": next_cursor, "order": "desc" if descending else "asc"}
+
+
+class MissionStore:
+    """SQLite store of missions and their append-only chat, activity, feedback and artifact rows"""
+
+    def __init__(self, path: str = MISSION_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            # WAL lets readers list missions while an append is being committed
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # Missions
+
+    def upsert_mission(self, mission: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert or replace a mission record (camelCase fields as in idea_missions.json)"""
+        with self._connect() as conn:
+            self._upsert_mission(conn, mission)
+        return mission
+
+    @staticmethod
+    def _upsert_mission(conn, mission: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO missions (id, user_id, status, created_at, updated_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (mission["id"], mission.get("userId"), mission.get("status"), mission.get("createdAt"),
+             mission.get("updatedAt") or mission.get("createdAt"), json.dumps(mission))
+        )
+
+    def get_mission(self, mission_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM missions WHERE id = ?", (mission_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update_mission(self, mission_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge fields into a mission, returns the updated record or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM missions WHERE id = ?", (mission_id,)).fetchone()
+            if row is None:
+                return None
+            mission = {**json.loads(row[0]), **fields, "id": mission_id}
+            self._upsert_mission(conn, mission)
+        return mission
+
+    def delete_mission(self, mission_id: str) -> bool:
+        """Delete a mission with its events and manifest, returns False if it does not exist"""
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM missions WHERE id = ?", (mission_id,)).rowcount
+            for table in (*EVENT_TABLES, "artifacts"):
+                conn.execute(f"DELETE FROM {table} WHERE mission_id = ?", (mission_id,))
+        return bool(deleted)
+
+    def list_missions(self, user_id: Optional[str] = None, status: Optional[str] = None,
+                      limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> Dict[str, Any]:
+        """Missions, most recently updated first, optionally filtered by user and status"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT data FROM missions {where} ORDER BY updated_at DESC, id LIMIT ? OFFSET ?",
+                params + [limit + 1, offset]
+            ).fetchall()
+        return {
+            "items": [json.loads(row[0]) for row in rows[:limit]],
+            "next_offset": offset + limit if len(rows) > limit else None
+        }
+
+    # Append-only events
+
+    def append_event(self, table: str, mission_id: str, record: Dict[str, Any]) -> int:
+        """Append one chat message, activity event or feedback entry, returns its seq"""
+        columns = EVENT_TABLES[table]
+        with self._connect() as conn:
+            return self._append_event(conn, table, columns, mission_id, record)
+
+    @staticmethod
+    def _append_event(conn, table: str, columns: Dict[str, str], mission_id: str, record: Dict[str, Any]) -> int:
+        names = ", ".join(["mission_id", *columns, "data"])
+        placeholders = ", ".join("?" * (len(columns) + 2))
+        values = [mission_id, *(record.get(field) for field in columns.values()), json.dumps(record)]
+        return conn.execute(f"INSERT INTO {table} ({names}) VALUES ({placeholders})", values).lastrowid
+
+    def list_events(self, table: str, mission_id: str, after: Optional[int] = None, before: Optional[int] = None,
+                    limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        One page of a mission's events
+
+        Args:
+            table: chat_messages, activity_events or feedback
+            mission_id: Mission ID
+            after: Return events after this seq, oldest first
+            before: Return events before this seq, newest first
+            limit: Page size
+            (with neither cursor the newest events are returned, newest first)
+        """
+        if table not in EVENT_TABLES:
+            raise ValueError(f"Unknown event table: {table}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        with self._connect() as conn:
+            if after is not None:
+                rows = conn.execute(
+                    f"SELECT seq, data FROM {table} WHERE mission_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (mission_id, after, limit + 1)
+                ).fetchall()
+                return _page(rows, limit, descending=False)
+            rows = conn.execute(
+                f"SELECT seq, data FROM {table} WHERE mission_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (mission_id, before if before is not None else sys.maxsize, limit + 1)
+            ).fetchall()
+        return _page(rows, limit, descending=True)
+
+    def user_activity(self, user_id: str, since: Optional[str] = None,
+                      limit: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """A user's activity across missions, newest first"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT mission_id, data FROM activity_events WHERE user_id = ? AND timestamp >= ? "
+                "ORDER BY timestamp DESC LIMIT ?", (user_id, since or "", limit)
+            ).fetchall()
+        return [{**json.loads(data), "missionId": mission_id} for mission_id, data in rows]
+
+    def operation_events(self, operation: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Activity events of one operation across missions, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT mission_id, data FROM activity_events WHERE operation = ? AND timestamp >= ? "
+                "ORDER BY timestamp", (operation, since or "")
+            ).fetchall()
+        return [{**json.loads(data), "missionId": mission_id} for mission_id, data in rows]
+
+    # Artifact manifests
+
+    def add_artifact(self, mission_id: str, entry: Dict[str, Any]) -> int:
+        """Add or replace a manifest entry, returns its seq"""
+        with self._connect() as conn:
+            return self._add_artifact(conn, mission_id, entry)
+
+    @staticmethod
+    def _add_artifact(conn, mission_id: str, entry: Dict[str, Any]) -> int:
+        return conn.execute(
+            "INSERT OR REPLACE INTO artifacts (id, mission_id, agent, created_at, data) VALUES (?, ?, ?, ?, ?)",
+            (entry["id"], mission_id, entry.get("agent"), entry.get("createdAt"), json.dumps(entry))
+        ).lastrowid
+
+    def find_artifact_by_hash(self, mission_id: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Manifest entry of a mission's artifact with the given contentHash, if any"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM artifacts WHERE mission_id = ? AND json_extract(data, '$.contentHash') = ? LIMIT 1",
+                (mission_id, content_hash)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_artifacts(self, mission_id: str, agent: Optional[str] = None, before: Optional[int] = None,
+                       limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """A mission's manifest entries, newest first"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = "SELECT seq, data FROM artifacts WHERE mission_id = ? AND seq < ?"
+        params: List[Any] = [mission_id, before if before is not None else sys.maxsize]
+        if agent is not None:
+            query += " AND agent = ?"
+            params.append(agent)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY seq DESC LIMIT ?", params + [limit + 1]).fetchall()
+        return _page(rows, limit, descending=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            counts = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("missions", *EVENT_TABLES, "artifacts")
+            }
+        return {"path": self.path, **counts}
+
+
+def _read_json_list(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else []
+
+
+def import_json_layout(store: MissionStore, data_dir: str = DATA_DIR) -> Dict[str, int]:
+    """
+    One-shot import of idea_missions.json and the per-mission JSON arrays
+
+    Missions are upserted; a mission's chat, activity, feedback and manifest are
+    only imported while its tables are still empty, so re-running does not
+    duplicate events. Returns the number of imported rows per table.
+    """
+    missions = {mission["id"]: mission for mission in _read_json_list(os.path.join(data_dir, "idea_missions.json"))}
+    missions_dir = os.path.join(data_dir, "idea_missions")
+    mission_dirs = sorted(os.listdir(missions_dir)) if os.path.isdir(missions_dir) else []
+    files = {"chat_messages": "chat.json", "activity_events": "activity.json", "feedback": "feedback.json"}
+    counts = {"missions": 0, **{table: 0 for table in files}, "artifacts": 0}
+
+    with store._connect() as conn:
+        for mission_id in sorted(set(missions) | set(mission_dirs)):
+            directory = os.path.join(missions_dir, mission_id)
+            events = {table: _read_json_list(os.path.join(directory, name)) for table, name in files.items()}
+            manifest = _read_json_list(os.path.join(directory, "manifest.json"))
+            mission = missions.get(mission_id)
+            if mission is None:
+                if not any(events.values()) and not manifest:
+                    continue
+                # Directory without a mission record: keep its history under a minimal mission
+                user_id = next((e.get("userId") for e in events["activity_events"] if e.get("userId")), None)
+                mission = {"id": mission_id, "userId": user_id, "title": None, "status": None}
+            store._upsert_mission(conn, mission)
+            counts["missions"] += 1
+
+            for table, records in events.items():
+                if conn.execute(f"SELECT 1 FROM {table} WHERE mission_id = ? LIMIT 1", (mission_id,)).fetchone():
+                    continue
+                for record in sorted(records, key=lambda record: record.get("timestamp") or ""):
+                    store._append_event(conn, table, EVENT_TABLES[table], mission_id, record)
+                counts[table] += len(records)
+            if not conn.execute("SELECT 1 FROM artifacts WHERE mission_id = ? LIMIT 1", (mission_id,)).fetchone():
+                for entry in sorted(manifest, key=lambda entry: entry.get("createdAt") or ""):
+                    store._add_artifact(conn, mission_id, entry)
+                counts["artifacts"] += len(manifest)
+    return counts
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Manage the indexed mission store')
+    parser.add_argument('command', choices=["import", "stats"], help='Import the JSON layout or show row counts')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='Directory with idea_missions.json and idea_missions/')
+    parser.add_argument('--db', default=MISSION_DB_PATH, help='Mission database file')
+    args = parser.parse_args()
+
+    store = MissionStore(args.db)
+    if args.command == "import":
+        counts = import_json_layout(store, args.data_dir)
+        print("📥 Imported " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"💾 {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
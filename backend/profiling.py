@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Request tracing, slow-request capture and on-demand profiling
+Every request gets a trace that code on the request path adds stage timings
+to. A watchdog thread samples the stacks of the threads working on a request
+(the event loop and any thread it entered a stage on) while the request runs
+past half the slow threshold; requests that end over the threshold are kept
+with their stages and folded stack samples in a bounded ring buffer. Profiling
+sessions (cProfile of the event loop thread, or stack sampling of every
+thread) run for a fixed time and produce a downloadable result.
+"""
+
+import os
+import io
+import sys
+import time
+import uuid
+import pstats
+import cProfile
+import asyncio
+import logging
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILES_DIR = os.path.join(BACKEND_DIR, "data", "profiles")
+PROFILE_MODES = ("cprofile", "sampling")
+# Deepest frames kept per stack sample; the outermost frames are dropped
+MAX_STACK_DEPTH = 64
+# Top folded stacks kept per slow request
+MAX_STACKS_PER_REQUEST = 30
+# Innermost functions of threads that are parked, left out of session summaries (not of the folded file)
+IDLE_FUNCTIONS = ("wait", "select", "poll", "_wait_for_tstate_lock", "_worker")
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+def _folded_stack(frame) -> str:
+    """Stack as 'outer;...;inner' frames of file:function:line, the folded format of flame graph tools"""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def _sample_threads(exclude: int) -> Dict[int, str]:
+    """One folded stack per thread, prefixed with the thread name, except the sampling thread itself"""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    return {ident: f"{names.get(ident, ident)};{_folded_stack(frame)}"
+            for ident, frame in sys._current_frames().items() if ident != exclude}
+
+
+class RequestTrace:
+    """Stage timings and stack samples of one request"""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat()
+        self.stages: Dict[str, float] = {}
+        self.labels: Dict[str, Any] = {}
+        self.samples: Counter = Counter()
+        self.threads = {threading.get_ident()}
+
+    def add_stage(self, name: str, seconds: float):
+        # Repeated stages (e.g. one per batch) accumulate
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_dict(self, duration: float, status: Optional[int]) -> Dict[str, Any]:
+        stage_total = sum(self.stages.values())
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(1000 * duration, 3),
+            "status": status,
+            **self.labels,
+            "stages_ms": {name: round(1000 * seconds, 3) for name, seconds in self.stages.items()},
+            "unattributed_ms": round(1000 * max(0.0, duration - stage_total), 3),
+            "samples": sum(self.samples.values()),
+            "stacks": [{"stack": stack, "count": count}
+                       for stack, count in self.samples.most_common(MAX_STACKS_PER_REQUEST)]
+        }
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage of the current request; a no-op outside a traced request"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.threads.add(threading.get_ident())
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.add_stage(name, time.perf_counter() - started)
+
+
+def record_stages(timings: Optional[Dict[str, float]], prefix: str = ""):
+    """Add stage timings measured elsewhere (in seconds) to the current request"""
+    trace = _current_trace.get()
+    if trace is not None and timings:
+        for name, seconds in timings.items():
+            trace.add_stage(f"{prefix}{name}", seconds)
+
+
+def label_request(**labels: Any):
+    """Attach labels such as the agent and task to the current request's slow-request record"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.labels.update(labels)
+
+
+class SlowRequestRecorder:
+    """Ring buffer of requests over a latency threshold, with stack samples taken while they ran"""
+
+    def __init__(self, threshold_seconds: float = 1.0, capacity: int = 100, sample_interval: float = 0.01):
+        """
+        Args:
+            threshold_seconds: Requests taking longer are recorded
+            capacity: Slow requests kept (oldest dropped first)
+            sample_interval: Seconds between stack samples of requests past half the threshold
+        """
+        self.threshold_seconds = threshold_seconds
+        self.sample_interval = sample_interval
+        self._records: deque = deque(maxlen=capacity)
+        self._in_flight: Dict[str, RequestTrace] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"requests": 0, "slow": 0, "samples": 0}
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="slow-request-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                # Only requests that may turn out slow pay for sampling
+                due = [trace for trace in self._in_flight.values()
+                       if trace.elapsed() >= self.threshold_seconds / 2]
+            if not due:
+                continue
+            stacks = _sample_threads(own)
+            for trace in due:
+                trace.samples.update(stacks[ident] for ident in list(trace.threads) if ident in stacks)
+            self._stats["samples"] += 1
+
+    def begin(self, method: str, path: str) -> RequestTrace:
+        trace = RequestTrace(method, path)
+        with self._lock:
+            self._in_flight[trace.id] = trace
+        return trace
+
+    def end(self, trace: RequestTrace, status: Optional[int]):
+        duration = trace.elapsed()
+        with self._lock:
+            self._in_flight.pop(trace.id, None)
+            self._stats["requests"] += 1
+            if duration >= self.threshold_seconds:
+                self._stats["slow"] += 1
+                self._records.append(trace.to_dict(duration, status))
+                logger.warning(f"🐢 Slow request {trace.method} {trace.path}: {1000 * duration:.0f} ms "
+                               f"(stages: {', '.join(f'{k}={1000 * v:.0f}ms' for k, v in trace.stages.items())})")
+
+    def list(self, limit: int = 50, path: Optional[str] = None, include_stacks: bool = False) -> List[Dict[str, Any]]:
+        """Most recent slow requests first"""
+        with self._lock:
+            records = list(self._records)
+        records = [record for record in reversed(records) if path is None or record["path"].startswith(path)]
+        if not include_stacks:
+            records = [{key: value for key, value in record.items() if key != "stacks"} for record in records]
+        return records[:limit]
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next((record for record in self._records if record["id"] == record_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "kept": len(self._records), "capacity": self._records.maxlen,
+                    "in_flight": len(self._in_flight), "threshold_ms": round(1000 * self.threshold_seconds, 1)}
+
+
+class SlowRequestMiddleware:
+    """ASGI middleware tracing every HTTP request, including the time to stream its body"""
+
+    def __init__(self, app, recorder: SlowRequestRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = self.recorder.begin(scope.get("method", ""), scope.get("path", ""))
+        token = _current_trace.set(trace)
+        status = None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_trace.reset(token)
+            self.recorder.end(trace, status)
+
+
+class ProfilingSession:
+    """One time-limited cProfile or sampling run"""
+
+    def __init__(self, mode: str, seconds: float, sample_interval: float, output_dir: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.seconds = seconds
+        self.sample_interval = sample_interval
+        self.started_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.status = "running"
+        self.samples = 0
+        self.path = os.path.join(output_dir, f"{self.id}.{'prof' if mode == 'cprofile' else 'folded'}")
+        self._profile: Optional[cProfile.Profile] = None
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.summary: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "mode": self.mode, "seconds": self.seconds, "status": self.status,
+                "started_at": self.started_at, "finished_at": self.finished_at, "samples": self.samples,
+                "file": os.path.basename(self.path), "summary": self.summary}
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            self._stacks.update(_sample_threads(own).values())
+            self.samples += 1
+
+
+class Profiler:
+    """Runs one profiling session at a time and keeps the results of recent sessions"""
+
+    def __init__(self, output_dir: str = PROFILES_DIR, max_seconds: float = 300.0,
+                 sample_interval: float = 0.005, keep: int = 10):
+        """
+        Args:
+            output_dir: Directory the profile files are written to
+            max_seconds: Longest allowed session
+            sample_interval: Seconds between stack samples in sampling mode
+            keep: Finished sessions kept (older files are deleted)
+        """
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.sample_interval = sample_interval
+        self.keep = keep
+        self.sessions: "deque[ProfilingSession]" = deque()
+        self.active: Optional[ProfilingSession] = None
+
+    def start(self, mode: str, seconds: float) -> ProfilingSession:
+        """
+        Start a session that stops itself after seconds
+
+        cProfile mode profiles the event loop thread (all request handling
+        except work offloaded to threads); sampling mode samples the stacks of
+        every thread and costs little enough to use under production load.
+        Must be called on the event loop thread.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profiling mode: {mode}")
+        if self.active is not None:
+            raise RuntimeError(f"Profiling session {self.active.id} is already running")
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be between 0 and {self.max_seconds}")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        session = ProfilingSession(mode, seconds, self.sample_interval, self.output_dir)
+        if mode == "cprofile":
+            session._profile = cProfile.Profile()
+            session._profile.enable()
+        else:
+            session._thread = threading.Thread(target=session._sample, name="profiler-sampler", daemon=True)
+            session._thread.start()
+        session._timer = asyncio.get_running_loop().call_later(seconds, self.stop)
+        self.active = session
+        logger.info(f"🔬 Profiling session {session.id} started ({mode}, {seconds}s)")
+        return session
+
+    def stop(self) -> Optional[ProfilingSession]:
+        """Stop the running session and write its result file"""
+        session = self.active
+        if session is None:
+            return None
+        self.active = None
+        if session._timer is not None:
+            session._timer.cancel()
+        if session._profile is not None:
+            session._profile.disable()
+            session._profile.dump_stats(session.path)
+            summary = io.StringIO()
+            pstats.Stats(session._profile, stream=summary).sort_stats("cumulative").print_stats(25)
+            session.summary = summary.getvalue()
+            session._profile = None
+        else:
+            session._stop.set()
+            session._thread.join()
+            with open(session.path, "w", encoding="utf-8") as f:
+                for stack, count in session._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            busy = Counter()
+            for stack, count in session._stacks.items():
+                leaf = stack.rsplit(";", 1)[-1]
+                if leaf.split(":")[1:2] and leaf.split(":")[1] not in IDLE_FUNCTIONS:
+                    busy[leaf] += count
+            session.summary = "".join(f"{count:6d} {leaf}\n" for leaf, count in busy.most_common(25))
+        session.status = "finished"
+        session.finished_at = datetime.now().isoformat()
+        self.sessions.append(session)
+        while len(self.sessions) > self.keep:
+            old = self.sessions.popleft()
+            try:
+                os.remove(old.path)
+            except OSError:
+                pass
+        logger.info(f"🔬 Profiling session {session.id} finished: {session.path}")
+        return session
+
+    def get(self, session_id: str) -> Optional[ProfilingSession]:
+        if self.active is not None and self.active.id == session_id:
+            return self.active
+        return next((session for session in self.sessions if session.id == session_id), None)
+
+    def list(self) -> List[Dict[str, Any]]:
+        sessions = ([self.active] if self.active else []) + list(reversed(self.sessions))
+        return [{key: value for key, value in session.to_dict().items() if key != "summary"} for session in sessions]
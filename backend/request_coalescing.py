@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing for tool calls
+Concurrent requests with the same key share one in-flight computation
+"""
+
+import re
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a key"""
+    normalized = " ".join(query.split()).lower()
+    return re.sub(r"^[\s\W]+|[\s\W]+$", "", normalized)
+
+
+class SingleFlight:
+    """Deduplicates concurrent async computations by key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.max_waiters = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key among concurrent callers and share its result
+
+        The computation runs in its own task, so a caller that is cancelled
+        (e.g. a disconnected client) does not cancel it for the others.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            The shared result
+        """
+        self.requests += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        self.max_waiters = max(self.max_waiters, self._waiters[key])
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters"""
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "in_flight": len(self._inflight),
+            "max_waiters_per_key": self.max_waiters,
+            "coalescing_ratio": round(self.coalesced / self.requests, 4) if self.requests else 0.0
+        }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Second-stage reranking of local_search candidates
+The first stage over-fetches candidates in ANN order; a scorer then scores all
+of them in one batch, either a lexical/feature scorer (query-term coverage and
+phrase matches blended with the vector similarity) or a small CPU
+cross-encoder. Scores are cached per (scorer, query, chunk). Reranking has a
+hard time budget: when the batch does not finish in time the candidates are
+returned in ANN order, and the late scores still land in the cache.
+"""
+
+import re
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:
+    CrossEncoder = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# Words that match almost every chunk and would only add noise to term coverage
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to was what when which with".split()
+)
+
+
+def _terms(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def _chunk_key(result: Dict[str, Any]) -> str:
+    """Cache key of a chunk; content-addressed so re-ingested chunks are scored again"""
+    return hashlib.sha1(result.get("content", "").encode("utf-8")).hexdigest()[:16]
+
+
+class LexicalScorer:
+    """Feature scorer blending query-term coverage, phrase and section matches with the vector similarity"""
+
+    name = "lexical"
+
+    def __init__(self, similarity_weight: float = 0.5, phrase_weight: float = 0.2, section_weight: float = 0.1,
+                 k1: float = 1.2):
+        """
+        Args:
+            similarity_weight: Share of the first-stage similarity in the score (the rest is term coverage)
+            phrase_weight: Bonus for the fraction of query bigrams found verbatim
+            section_weight: Bonus for the fraction of query terms in the chunk's section headers
+            k1: Term-frequency saturation, as in BM25
+        """
+        self.similarity_weight = similarity_weight
+        self.phrase_weight = phrase_weight
+        self.section_weight = section_weight
+        self.k1 = k1
+
+    def score(self, query: str, candidates: List[Dict[str, Any]]) -> List[float]:
+        query_terms = [term for term in _terms(query) if term not in STOPWORDS] or _terms(query)
+        distinct = list(dict.fromkeys(query_terms))
+        bigrams = set(zip(query_terms, query_terms[1:]))
+        scores = []
+        for candidate in candidates:
+            terms = _terms(candidate.get("content", ""))
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            # Saturated term frequency, so one repeated term cannot dominate the coverage
+            coverage = sum(counts.get(term, 0) / (counts.get(term, 0) + self.k1) * (1 + self.k1)
+                           for term in distinct) / ((1 + self.k1) * len(distinct)) if distinct else 0.0
+            phrases = len(bigrams & set(zip(terms, terms[1:]))) / len(bigrams) if bigrams else 0.0
+            section_terms = set(_terms(str(candidate.get("headers") or "")))
+            section = sum(term in section_terms for term in distinct) / len(distinct) if distinct else 0.0
+            scores.append(self.similarity_weight * float(candidate.get("similarity_score", 0.0))
+                          + (1 - self.similarity_weight) * coverage
+                          + self.phrase_weight * phrases + self.section_weight * section)
+        return scores
+
+
+class CrossEncoderScorer:
+    """Small cross-encoder run on CPU; needs sentence-transformers and loads the model on first use"""
+
+    name = "cross_encoder"
+
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER, max_length: int = 256, batch_size: int = 32):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return CrossEncoder is not None
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                if CrossEncoder is None:
+                    raise RuntimeError("cross_encoder reranking needs the sentence-transformers package")
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+            return self._model
+
+    def score(self, query: str, candidates: List[Dict[str, Any]]) -> List[float]:
+        model = self._load()
+        pairs = [(query, candidate.get("content", "")) for candidate in candidates]
+        return [float(score) for score in model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)]
+
+
+class SearchReranker:
+    """Batched, cached and time-budgeted reranking of first-stage search results"""
+
+    def __init__(self, scorers: List[Any], budget_seconds: float = 0.15, cache_size: int = 20000,
+                 max_workers: int = 2):
+        """
+        Args:
+            scorers: Scorers by their name attribute
+            budget_seconds: Default time budget of one rerank
+            cache_size: Maximum cached (scorer, query, chunk) scores
+            max_workers: Threads scoring batches; a batch that overran its budget keeps one busy
+        """
+        self.scorers = {scorer.name: scorer for scorer in scorers}
+        self.budget_seconds = budget_seconds
+        self.cache_size = cache_size
+        self._scores: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rerank")
+        self._stats = {"requests": 0, "reranked": 0, "fallbacks": 0, "errors": 0, "score_hits": 0,
+                       "score_misses": 0, "scoring_seconds": 0.0, "batches": 0}
+
+    def _cached(self, keys: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], float]:
+        with self._lock:
+            found = {key: self._scores[key] for key in keys if key in self._scores}
+            for key in found:
+                self._scores.move_to_end(key)
+            return found
+
+    def _store(self, keys: List[Tuple[str, str, str]], scores: List[float]):
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    def _score_batch(self, scorer, query: str, keys: List[Tuple[str, str, str]],
+                     candidates: List[Dict[str, Any]]) -> List[float]:
+        started = time.perf_counter()
+        scores = scorer.score(query, candidates)
+        # Stored here, so a batch that finishes after its budget still serves the next request
+        self._store(keys, scores)
+        self._stats["batches"] += 1
+        self._stats["scoring_seconds"] += time.perf_counter() - started
+        return scores
+
+    async def rerank(self, query: str, results: List[Dict[str, Any]], n_results: int, scorer_name: str,
+                     budget_seconds: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Rerank candidates and keep the best n_results
+
+        Args:
+            query: Normalized search query
+            results: Candidates in first-stage (ANN) order
+            n_results: Results to keep
+            scorer_name: 'lexical' or 'cross_encoder'
+            budget_seconds: Time budget (default: the reranker's budget)
+
+        Returns:
+            Kept results with a rerank_score each (ANN order without scores on fallback) and a report
+        """
+        started = time.perf_counter()
+        budget = self.budget_seconds if budget_seconds is None else budget_seconds
+        self._stats["requests"] += 1
+        report = {"scorer": scorer_name, "candidates": len(results), "cached": 0, "scored": 0,
+                  "fell_back": False, "budget_ms": round(1000 * budget, 1)}
+
+        def fall_back(reason: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+            self._stats["fallbacks"] += 1
+            report.update(fell_back=True, reason=reason, elapsed_ms=round(1000 * (time.perf_counter() - started), 3))
+            return results[:n_results], report
+
+        scorer = self.scorers.get(scorer_name)
+        if scorer is None:
+            return fall_back(f"unknown scorer {scorer_name!r}")
+        if not results:
+            report["elapsed_ms"] = 0.0
+            return [], report
+
+        keys = [(scorer_name, query, _chunk_key(result)) for result in results]
+        scores = self._cached(keys)
+        report["cached"] = len(scores)
+        self._stats["score_hits"] += len(scores)
+        missing = [i for i, key in enumerate(keys) if key not in scores]
+        if missing:
+            self._stats["score_misses"] += len(missing)
+            remaining = budget - (time.perf_counter() - started)
+            if remaining <= 0:
+                return fall_back("budget exhausted")
+            batch = asyncio.wrap_future(self._executor.submit(
+                self._score_batch, scorer, query, [keys[i] for i in missing], [results[i] for i in missing]
+            ))
+            try:
+                # shield: on timeout the batch keeps running and fills the cache
+                batch_scores = await asyncio.wait_for(asyncio.shield(batch), remaining)
+            except asyncio.TimeoutError:
+                return fall_back("budget exceeded")
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"⚠️  {scorer_name} reranking failed, keeping ANN order: {e}")
+                return fall_back(str(e))
+            scores.update(zip((keys[i] for i in missing), batch_scores))
+            report["scored"] = len(missing)
+
+        # Ties keep the first-stage order
+        order = sorted(range(len(results)), key=lambda i: -scores[keys[i]])
+        reranked = [{**results[i], "rerank_score": round(scores[keys[i]], 6), "ann_rank": i + 1}
+                    for i in order[:n_results]]
+        self._stats["reranked"] += 1
+        report["elapsed_ms"] = round(1000 * (time.perf_counter() - started), 3)
+        return reranked, report
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cached = len(self._scores)
+        batches = self._stats["batches"]
+        return {
+            **{key: value for key, value in self._stats.items() if key != "scoring_seconds"},
+            "cached_scores": cached,
+            "avg_batch_ms": round(1000 * self._stats["scoring_seconds"] / batches, 3) if batches else 0.0,
+            "scorers": sorted(self.scorers),
+            "cross_encoder_available": CrossEncoder is not None
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
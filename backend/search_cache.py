@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Search result cache and cache pre-warming
+Query embeddings and local_search results are cached in memory. The hot query
+set is mined from the semantic searches recorded in mission activity logs and
+from the server's own query log, ranked by frequency and recency, and run
+ahead of users within a time budget after a restart and periodically.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from request_coalescing import normalize_query
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MISSIONS_DIR = os.path.join(BACKEND_DIR, "data", "idea_missions")
+QUERY_LOG_PATH = os.path.join(BACKEND_DIR, "data", "query_log.jsonl")
+SEARCH_OPERATION = "idea.search.semantic.execute"
+
+
+class SearchResultCache:
+    """LRU caches of query embeddings and search results; results expire after ttl seconds"""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 3600.0):
+        """
+        Args:
+            max_entries: Maximum cached results (and, separately, embeddings)
+            ttl: Seconds a search result stays valid; embeddings do not expire
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._results: "OrderedDict[Tuple[str, int, Tuple[str, ...]], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "embedding_hits": 0, "embedding_misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def _key(query: str, n_results: int, groups: Optional[List[str]]) -> Tuple[str, int, Tuple[str, ...]]:
+        # None (all papers) and an empty group set are different searches
+        return query, n_results, ("*",) if groups is None else tuple(sorted(set(groups)))
+
+    def get(self, query: str, n_results: int, groups: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Cached search result of a normalized query, if present and fresh"""
+        key = self._key(query, n_results, groups)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is None or time.monotonic() - cached[0] > self.ttl:
+                self._results.pop(key, None)
+                self._stats["misses"] += 1
+                return None
+            self._results.move_to_end(key)
+            self._stats["hits"] += 1
+            return cached[1]
+
+    def contains(self, query: str, n_results: int, groups: Optional[List[str]] = None) -> bool:
+        """Whether a fresh result is cached, without counting a lookup"""
+        with self._lock:
+            cached = self._results.get(self._key(query, n_results, groups))
+            return cached is not None and time.monotonic() - cached[0] <= self.ttl
+
+    def has_embedding(self, query: str) -> bool:
+        with self._lock:
+            return query in self._embeddings
+
+    def put(self, query: str, n_results: int, result: Dict[str, Any], groups: Optional[List[str]] = None):
+        key = self._key(query, n_results, groups)
+        with self._lock:
+            self._results[key] = (time.monotonic(), result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._embeddings.get(query)
+            if embedding is None:
+                self._stats["embedding_misses"] += 1
+                return None
+            self._embeddings.move_to_end(query)
+            self._stats["embedding_hits"] += 1
+            return embedding
+
+    def put_embedding(self, query: str, embedding: List[float]):
+        with self._lock:
+            self._embeddings[query] = [float(x) for x in embedding]
+            self._embeddings.move_to_end(query)
+            while len(self._embeddings) > self.max_entries:
+                self._embeddings.popitem(last=False)
+
+    def invalidate(self):
+        """Drop all search results, e.g. after the collection changed; embeddings stay valid"""
+        with self._lock:
+            self._results.clear()
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "results": len(self._results),
+                "embeddings": len(self._embeddings),
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+class QueryLog:
+    """
+    Append-only JSONL log of the searches served by this server
+
+    Appends only buffer the record in memory; flush() writes them and is run
+    off the event loop. The file is compacted whenever it grows beyond
+    max_bytes or holds searches older than max_age_days.
+    """
+
+    def __init__(self, path: str = QUERY_LOG_PATH, max_bytes: int = 5 * 1024 * 1024, max_age_days: float = 90.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        self.compactions = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def append(self, query: str, group_ids: Optional[List[str]] = None):
+        record = {"timestamp": datetime.now().isoformat(), "query": query,
+                  "documentGroupIds": sorted(set(group_ids)) if group_ids is not None else None}
+        with self._lock:
+            self._buffer.append(record)
+
+    def flush(self):
+        """Write buffered searches, compacting the file when it is over its size or age cap"""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if records:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(record) + "\n" for record in records)
+            oversized = os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes
+            expired = self._oldest_timestamp() < self._cutoff()
+        if oversized or expired:
+            self.compact(self._cutoff())
+
+    def _cutoff(self) -> str:
+        return datetime.fromtimestamp(time.time() - self.max_age_days * 86400).isoformat()
+
+    def _oldest_timestamp(self) -> str:
+        if not os.path.exists(self.path):
+            return "9999"
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                return json.loads(f.readline()).get("timestamp", "")
+            except json.JSONDecodeError:
+                return ""
+
+    def _read_file(self, since: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("timestamp", "") >= since:
+                    records.append(record)
+        return records
+
+    def read(self, since: str = "") -> List[Dict[str, Any]]:
+        """Logged searches at or after the ISO timestamp since, including unflushed ones"""
+        with self._lock:
+            return self._read_file(since) + [record for record in self._buffer if record["timestamp"] >= since]
+
+    def compact(self, since: str):
+        """Drop searches older than since and, beyond max_bytes, the oldest ones down to half the cap"""
+        with self._lock:
+            lines = [json.dumps(record) + "\n" for record in self._read_file(max(since, self._cutoff()))]
+            kept, size = [], 0
+            for line in reversed(lines):
+                size += len(line.encode("utf-8"))
+                if size > self.max_bytes // 2 and kept:
+                    break
+                kept.append(line)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(reversed(kept))
+            os.replace(temp_path, self.path)
+            self.compactions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+                "max_bytes": self.max_bytes,
+                "max_age_days": self.max_age_days,
+                "compactions": self.compactions
+            }
+
+
+def activity_searches(missions_dir: str = MISSIONS_DIR, since: str = "") -> List[Dict[str, Any]]:
+    """Semantic searches recorded in the missions' activity.json files"""
+    searches = []
+    if not os.path.isdir(missions_dir):
+        return searches
+    for entry in os.scandir(missions_dir):
+        path = os.path.join(entry.path, "activity.json")
+        if not entry.is_dir() or not os.path.exists(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                events = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️  Skipping unreadable activity log {path}: {e}")
+            continue
+        for event in events if isinstance(events, list) else []:
+            if event.get("operation") == SEARCH_OPERATION and event.get("timestamp", "") >= since:
+                args = event.get("args") or {}
+                searches.append({"timestamp": event["timestamp"], "query": args.get("query", ""),
+                                 "documentGroupIds": args.get("documentGroupIds")})
+    return searches
+
+
+def _group_ids(value: Any) -> Optional[List[str]]:
+    """Sorted document group IDs of a logged search (None: all papers)"""
+    if not isinstance(value, list) or not all(isinstance(group_id, str) for group_id in value):
+        return None
+    return sorted(set(value))
+
+
+def rank_queries(searches: Iterable[Dict[str, Any]], half_life_days: float = 7.0,
+                 now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Rank searched queries by frequency and recency
+
+    A query searched within different document groups is a different search
+    (and a different cache entry), so it is ranked once per group set.
+
+    Every search of a query adds 0.5 ** (age / half_life) to its score, so a
+    query searched often long ago can be outranked by one searched recently.
+    Ages are measured from now, or by default from the latest search, which
+    ranks the same but keeps scores readable for old logs. The same search
+    recorded in several sources is counted once.
+
+    Returns:
+        Normalized queries with their group IDs (None: all papers), score, count and
+        last search time, best first
+    """
+    parsed, seen = [], set()
+    for search in searches:
+        query = normalize_query(search.get("query") or "")
+        timestamp = search.get("timestamp")
+        groups = _group_ids(search.get("documentGroupIds"))
+        group_key = tuple(groups) if groups is not None else None
+        if not query or not timestamp or (timestamp, query, group_key) in seen:
+            continue
+        seen.add((timestamp, query, group_key))
+        try:
+            parsed.append((query, groups, timestamp, datetime.fromisoformat(timestamp)))
+        except ValueError:
+            continue
+    if not parsed:
+        return []
+    now = now or max(searched_at for _, _, _, searched_at in parsed)
+
+    ranked: Dict[Tuple[str, Optional[Tuple[str, ...]]], Dict[str, Any]] = {}
+    for query, groups, timestamp, searched_at in parsed:
+        age_days = max(0.0, (now - searched_at).total_seconds() / 86400)
+        entry = ranked.setdefault((query, tuple(groups) if groups is not None else None),
+                                  {"query": query, "groups": groups, "score": 0.0, "count": 0, "last_searched": ""})
+        entry["score"] += 0.5 ** (age_days / half_life_days)
+        entry["count"] += 1
+        entry["last_searched"] = max(entry["last_searched"], timestamp)
+    ordered = sorted(ranked.values(), key=lambda entry: (-entry["score"], entry["query"], entry["groups"] or []))
+    for entry in ordered:
+        entry["score"] = round(entry["score"], 4)
+    return ordered
+
+
+class CachePrewarmer:
+    """Runs the hottest recent queries into the search cache within a time budget"""
+
+    def __init__(self, cache: SearchResultCache, collect_searches: Callable[[str], List[Dict[str, Any]]],
+                 search: Callable[[str, int, Optional[List[str]]], Awaitable[Dict[str, Any]]],
+                 embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 n_results: int = 3, max_queries: int = 200, window_days: float = 30.0,
+                 half_life_days: float = 7.0, batch_size: int = 32):
+        """
+        Args:
+            cache: Cache to fill
+            collect_searches: Returns the logged searches since an ISO timestamp
+            search: Coroutine running one search of (query, n_results, group IDs); it stores its result in the cache
+            embed: Batch embedding function; embeddings are precomputed first when given
+            n_results: Result count of the searches to warm, as requested by local_search
+            max_queries: Maximum queries warmed per run
+            window_days: Only searches from this many days back are mined
+            half_life_days: Recency half-life of the ranking
+            batch_size: Queries per embedding batch
+        """
+        self.cache = cache
+        self.collect_searches = collect_searches
+        self.search = search
+        self.embed = embed
+        self.n_results = n_results
+        self.max_queries = max_queries
+        self.window_days = window_days
+        self.half_life_days = half_life_days
+        self.batch_size = batch_size
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def window_start(self) -> str:
+        return datetime.fromtimestamp(time.time() - self.window_days * 86400).isoformat()
+
+    async def run(self, budget_seconds: float) -> Dict[str, Any]:
+        """
+        Warm the cache with the top ranked queries until done or out of budget
+
+        Returns:
+            Report of mined, embedded, warmed and skipped queries
+        """
+        started = time.perf_counter()
+        deadline = started + budget_seconds
+
+        def remaining() -> float:
+            return deadline - time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        searches = await loop.run_in_executor(None, self.collect_searches, self.window_start())
+        ranked = rank_queries(searches, self.half_life_days)[:self.max_queries]
+        # The same query may be ranked for several group sets but is embedded once
+        queries = list(dict.fromkeys(entry["query"] for entry in ranked))
+        report = {"mined_searches": len(searches), "candidates": len(ranked), "embedded": 0, "warmed": 0,
+                  "already_cached": 0, "failed": 0, "out_of_budget": 0}
+
+        # Batched embedding is much cheaper than one model call per query
+        if self.embed is not None:
+            missing = [query for query in queries if not self.cache.has_embedding(query)]
+            for i in range(0, len(missing), self.batch_size):
+                if remaining() <= 0:
+                    break
+                batch = missing[i:i + self.batch_size]
+                try:
+                    embeddings = await loop.run_in_executor(None, self.embed, batch)
+                except Exception as e:
+                    logger.warning(f"⚠️  Pre-warm embedding failed: {e}")
+                    break
+                for query, embedding in zip(batch, embeddings):
+                    self.cache.put_embedding(query, embedding)
+                report["embedded"] += len(batch)
+
+        for i, entry in enumerate(ranked):
+            if remaining() <= 0:
+                report["out_of_budget"] = len(ranked) - i
+                break
+            query, groups = entry["query"], entry["groups"]
+            if self.cache.contains(query, self.n_results, groups):
+                report["already_cached"] += 1
+                continue
+            try:
+                result = await self.search(query, self.n_results, groups)
+                report["warmed" if result.get("success") else "failed"] += 1
+            except Exception as e:
+                report["failed"] += 1
+                logger.warning(f"⚠️  Pre-warm search failed for {query!r}: {e}")
+
+        report["elapsed"] = round(time.perf_counter() - started, 3)
+        report["top_queries"] = ranked[:10]
+        report["finished_at"] = datetime.now().isoformat()
+        self.last_report = report
+        return report
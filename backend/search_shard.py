@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Search shard worker
+Serves one shard database created by shard_collection.py over HTTP so the
+main backend can scatter queries across several local processes
+Usage: python backend/search_shard.py --db-path backend/data/shards/shard_0 --port 8101
+"""
+
+import os
+import sys
+import argparse
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb_search_tool import ChromaDBSearchTool
+
+
+class ShardSearchRequest(BaseModel):
+    query: str
+    n_results: int = 3
+    query_embedding: Optional[List[float]] = None
+    groups: Optional[List[str]] = None
+
+
+def create_app(db_path: str, collection_name: str) -> FastAPI:
+    """Build the FastAPI app of one shard"""
+    app = FastAPI(title="Search Shard", version="1.0.0")
+    search_tool = ChromaDBSearchTool(db_path=db_path, collection_name=collection_name)
+
+    @app.get("/health")
+    async def health():
+        if not search_tool.collection:
+            raise HTTPException(status_code=503, detail="Shard collection not available")
+        return {"status": "healthy", "db_path": db_path, "chunks": search_tool.collection.count()}
+
+    @app.post("/search")
+    async def search(request: ShardSearchRequest):
+        return await run_in_threadpool(search_tool.search, request.query, request.n_results, request.query_embedding,
+                                       request.groups)
+
+    return app
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Serve one search shard')
+    parser.add_argument('--db-path', required=True, help='Shard ChromaDB persistence directory')
+    parser.add_argument('--collection', default="llm_reasoning_agents_papers", help='Chunk collection')
+    parser.add_argument('--host', default="127.0.0.1", help='Bind address')
+    parser.add_argument('--port', type=int, required=True, help='Port')
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(os.path.abspath(args.db_path), args.collection), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
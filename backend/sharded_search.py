@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Scatter-gather search over shard workers
+The query is embedded once, sent to every shard in parallel and the per-shard
+top-k lists are merged by raw distance, so scores stay comparable across shards
+Slow or dead shards are dropped after a timeout and the response is marked partial
+"""
+
+import time
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+
+class ShardedSearchCoordinator:
+    """Fans searches out to shard workers and merges their results"""
+
+    def __init__(self, shard_urls: List[str], timeout: float = 2.0,
+                 embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None):
+        """
+        Args:
+            shard_urls: Base URLs of the shard workers
+            timeout: Seconds to wait for each shard before returning partial results
+            embedding_function: Embeds the query once for all shards (shards embed it when None)
+        """
+        self.shard_urls = [url.rstrip("/") for url in shard_urls]
+        self.timeout = timeout
+        self.embedding_function = embedding_function
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self._failures = {url: 0 for url in self.shard_urls}
+        self._queries = 0
+        self._partial = 0
+
+    async def _query_shard(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.client.post(f"{url}/search", json=payload)
+        response.raise_for_status()
+        result = response.json()
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "shard search failed"))
+        return result
+
+    async def search(self, query: str, n_results: int = 5, groups: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Search all shards and merge their top results
+
+        Args:
+            query: Search query string
+            n_results: Number of results to return
+            groups: Only search papers of these document groups (all papers when None)
+
+        Returns:
+            Dictionary in ChromaDBSearchTool.search format, plus shard status
+        """
+        self._queries += 1
+        payload: Dict[str, Any] = {"query": query, "n_results": n_results}
+        if groups is not None:
+            payload["groups"] = groups
+        if self.embedding_function is not None:
+            loop = asyncio.get_running_loop()
+            embedding = (await loop.run_in_executor(None, self.embedding_function, [query]))[0]
+            payload["query_embedding"] = [float(x) for x in embedding]
+
+        started = time.perf_counter()
+        tasks = {asyncio.ensure_future(self._query_shard(url, payload)): url for url in self.shard_urls}
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+
+        failed = [tasks[task] for task in pending]
+        merged, min_similarity = [], None
+        for task in done:
+            if task.exception() is not None:
+                failed.append(tasks[task])
+                continue
+            merged.extend(task.result()["results"])
+            min_similarity = task.result().get("min_similarity", min_similarity)
+        for url in failed:
+            self._failures[url] += 1
+        if failed:
+            self._partial += 1
+
+        if len(failed) == len(self.shard_urls):
+            return {"success": False, "error": "No shard responded", "results": [],
+                    "shards": {"queried": len(self.shard_urls), "failed": failed, "partial": True}}
+
+        # Similarities are metric-correct, so shards merge even if their indexes report different distances
+        merged.sort(key=lambda result: -result["similarity_score"])
+        results = merged[:n_results]
+        return {
+            "success": True,
+            "query": query,
+            "results": results,
+            "total_found": len(results),
+            "min_similarity": min_similarity,
+            "shards": {
+                "queried": len(self.shard_urls),
+                "failed": failed,
+                "partial": bool(failed),
+                "latency_ms": round(1000 * (time.perf_counter() - started), 3)
+            }
+        }
+
+    async def health(self) -> Dict[str, Any]:
+        """Health of every shard"""
+        async def check(url: str):
+            try:
+                response = await self.client.get(f"{url}/health")
+                response.raise_for_status()
+                return url, response.json()
+            except Exception as e:
+                return url, {"status": "unavailable", "error": str(e)}
+        return dict(await asyncio.gather(*(check(url) for url in self.shard_urls)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shards": len(self.shard_urls),
+            "queries": self._queries,
+            "partial_responses": self._partial,
+            "failures": dict(self._failures),
+            "timeout_seconds": self.timeout
+        }
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Cross-mission cache of LLM literature summaries
+Summaries are keyed by what was summarized (one paper or a set of chunks), the
+prompt template and the model, so a new mission on an overlapping topic can
+reuse them instead of summarizing the same papers again
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SUMMARY_CACHE_PATH = os.path.join(BACKEND_DIR, "data", "summary_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def prompt_hash(prompt_template: str) -> str:
+    """Hash of a prompt template (the template, not the rendered prompt)"""
+    return hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()[:16]
+
+
+def subject_key(paper_id: Optional[str] = None, chunk_ids: Optional[List[str]] = None) -> str:
+    """Cache subject of a single paper or of an (unordered) set of chunks"""
+    if chunk_ids:
+        digest = hashlib.sha256("\n".join(sorted(set(chunk_ids))).encode("utf-8")).hexdigest()[:24]
+        return f"chunks:{digest}"
+    if paper_id:
+        return f"paper:{paper_id}"
+    raise ValueError("paper_id or chunk_ids is required")
+
+
+def paper_id_of_chunk(chunk_id: str) -> str:
+    """Paper ID of a chunk ID of the form {paper_id}_chunk_{n}_{hash}"""
+    return chunk_id.split("_chunk_")[0]
+
+
+class SummaryCache:
+    """SQLite-backed summary store with LRU eviction bounded by entries and bytes"""
+
+    def __init__(self, path: str = SUMMARY_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of cached summaries
+            max_bytes: Maximum total size of the cached summary texts
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "subject TEXT NOT NULL, prompt_hash TEXT NOT NULL, model TEXT NOT NULL, "
+                "summary TEXT NOT NULL, size INTEGER NOT NULL, metadata TEXT, "
+                "created_at REAL NOT NULL, last_used_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (subject, prompt_hash, model))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summary_papers ("
+                "subject TEXT NOT NULL, paper_id TEXT NOT NULL, PRIMARY KEY (subject, paper_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS summary_papers_by_paper ON summary_papers (paper_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS summaries_by_use ON summaries (last_used_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, subject: str, prompt_template_hash: str, model: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a summary and mark it as recently used
+
+        Returns:
+            Dictionary with summary, metadata and created_at, or None on a miss
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT summary, metadata, created_at, hits FROM summaries "
+                "WHERE subject = ? AND prompt_hash = ? AND model = ?",
+                (subject, prompt_template_hash, model)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            conn.execute(
+                "UPDATE summaries SET last_used_at = ?, hits = hits + 1 "
+                "WHERE subject = ? AND prompt_hash = ? AND model = ?",
+                (time.time(), subject, prompt_template_hash, model)
+            )
+            self._hits += 1
+            return {
+                "summary": row[0],
+                "metadata": json.loads(row[1]) if row[1] else {},
+                "created_at": row[2],
+                "hits": row[3] + 1
+            }
+
+    def put(self, subject: str, prompt_template_hash: str, model: str, summary: str,
+            paper_ids: List[str], metadata: Optional[Dict[str, Any]] = None):
+        """
+        Store a summary and evict least recently used entries beyond the limits
+
+        Args:
+            subject: Key from subject_key()
+            prompt_template_hash: Key from prompt_hash()
+            model: Model that produced the summary
+            summary: Summary text
+            paper_ids: Papers the summary was generated from (used for invalidation)
+            metadata: Optional caller data (mission, agent, token counts)
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries "
+                "(subject, prompt_hash, model, summary, size, metadata, created_at, last_used_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (subject, prompt_template_hash, model, summary, len(summary.encode("utf-8")),
+                 json.dumps(metadata or {}), now, now)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO summary_papers (subject, paper_id) VALUES (?, ?)",
+                [(subject, paper_id) for paper_id in set(paper_ids)]
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+        victims = []
+        for subject, prompt_template_hash, model, size in conn.execute(
+            "SELECT subject, prompt_hash, model, size FROM summaries ORDER BY last_used_at ASC"
+        ):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((subject, prompt_template_hash, model))
+            count -= 1
+            total_bytes -= size
+        conn.executemany("DELETE FROM summaries WHERE subject = ? AND prompt_hash = ? AND model = ?", victims)
+        self._delete_orphan_links(conn)
+        self._evictions += len(victims)
+
+    @staticmethod
+    def _delete_orphan_links(conn):
+        conn.execute("DELETE FROM summary_papers WHERE subject NOT IN (SELECT subject FROM summaries)")
+
+    def invalidate_paper(self, paper_id: str) -> int:
+        """
+        Drop every summary that was generated from a paper (called when it is re-ingested)
+
+        Returns:
+            Number of removed summaries
+        """
+        with self._lock, self._connect() as conn:
+            subjects = [row[0] for row in conn.execute(
+                "SELECT subject FROM summary_papers WHERE paper_id = ?", (paper_id,)
+            )]
+            removed = 0
+            for subject in subjects:
+                removed += conn.execute("DELETE FROM summaries WHERE subject = ?", (subject,)).rowcount
+            conn.execute("DELETE FROM summary_papers WHERE paper_id = ?", (paper_id,))
+            self._delete_orphan_links(conn)
+            self._invalidations += removed
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries").fetchone()
+        lookups = self._hits + self._misses
+        return {
+            "entries": count,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations
+        }
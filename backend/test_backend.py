@@ -1,15 +1,30 @@
 #!/usr/bin/env python3
 """
 Test script for FastAPI backend
+Each test returns True when it passed, False when it failed and None when it
+was skipped because the service or an optional dependency is unavailable.
+The indexing tests run in-process against temporary directories.
 """
 
+import os
+import re
+import sys
 import requests
 import json
 import time
-from typing import Dict, Any
+import hashlib
+import tempfile
+from typing import Dict, Any, Optional
 
 # Configuration
 BASE_URL = "http://localhost:8000"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# The suite runs on the server host, so written artifacts can be checked on disk
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+# The indexing modules live in the project root
+sys.path.append(os.path.dirname(BACKEND_DIR))
+sys.path.append(BACKEND_DIR)
 
 def test_health_endpoint() -> bool:
     """Test the health endpoint"""
@@ -28,6 +43,22 @@ def test_health_endpoint() -> bool:
         print(f"❌ Health check error: {e}")
         return False
 
+def test_ready_endpoint() -> bool:
+    """Test the readiness probe"""
+    print("\n🚦 Testing readiness endpoint...")
+    try:
+        response = requests.get(f"{BASE_URL}/ready")
+        data = response.json()
+        if response.status_code in (200, 503) and data["ready"] == (response.status_code == 200):
+            print(f"✅ Readiness: {data['stage']} {data['timings']}")
+            return True
+        else:
+            print(f"❌ Readiness check failed: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ Readiness check error: {e}")
+        return False
+
 def test_search_stats() -> bool:
     """Test the search stats endpoint"""
     print("\n📊 Testing search stats endpoint...")
@@ -44,6 +75,56 @@ def test_search_stats() -> bool:
         print(f"❌ Search stats error: {e}")
         return False
 
+def test_search_stats_etag() -> Optional[bool]:
+    """Test that unchanged search stats revalidate with 304 Not Modified"""
+    print("\n🏷️  Testing search stats ETag...")
+    try:
+        response = requests.get(f"{BASE_URL}/search/stats")
+        if response.status_code == 503:
+            print("⚠️  Search tool not initialized, skipping ETag check")
+            return None
+        etag = response.headers.get("ETag")
+        if not etag:
+            print("❌ Search stats have no ETag")
+            return False
+        revalidated = requests.get(f"{BASE_URL}/search/stats", headers={"If-None-Match": etag})
+        if revalidated.status_code != 304:
+            print(f"❌ Expected 304 for an unchanged ETag, got {revalidated.status_code}")
+            return False
+        print(f"✅ Search stats revalidated with ETag {etag}")
+        return True
+    except Exception as e:
+        print(f"❌ Search stats ETag error: {e}")
+        return False
+
+def test_structured_search() -> Optional[bool]:
+    """Test structured local search results with a field projection"""
+    print("\n🧱 Testing structured search results...")
+    tool_request = {
+        "agent_name": "Researcher",
+        "task": "local_search",
+        "query": "multi-agent systems",
+        "metadata": {"responseFormat": "structured", "fields": ["paper_id", "similarity_score"]}
+    }
+    try:
+        response = requests.post(f"{BASE_URL}/tool", json=tool_request, headers={"Accept-Encoding": "gzip"})
+        if response.status_code != 200:
+            print(f"❌ Structured search failed: {response.status_code}")
+            return False
+        data = response.json()
+        if "results" not in data:
+            print(f"⚠️  Search unavailable, skipping structured check: {data.get('error')}")
+            return None
+        if any(set(result) - {"paper_id", "similarity_score"} for result in data["results"]):
+            print(f"❌ Projection not applied: {data['results']}")
+            return False
+        print(f"✅ {data['total_found']} structured results, {response.headers.get('Content-Length')} bytes on the wire "
+              f"({response.headers.get('Content-Encoding', 'identity')})")
+        return True
+    except Exception as e:
+        print(f"❌ Structured search error: {e}")
+        return False
+
 def test_search_functionality() -> bool:
     """Test the search functionality"""
     print("\n🔍 Testing search functionality...")
@@ -65,6 +146,48 @@ def test_search_functionality() -> bool:
         print(f"❌ Search test error: {e}")
         return False
 
+def test_group_search() -> Optional[bool]:
+    """Test search restricted to a document group"""
+    print("\n🗂️  Testing group-restricted search...")
+    try:
+        response = requests.post(f"{BASE_URL}/search/test",
+                                 params={"query": "reasoning agents", "n_results": 2, "groups": "LLM_Reasoning_Agents"})
+        if response.status_code == 503:
+            print("⚠️  Search tool not initialized, skipping group search")
+            return None
+        if response.status_code == 200:
+            data = response.json()
+            if not data["success"]:
+                print(f"❌ Group search failed: {data['error']}")
+                return False
+            print(f"✅ Group search returned {data['total_found']} results")
+            return True
+        else:
+            print(f"❌ Group search failed: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ Group search error: {e}")
+        return False
+
+def test_similarity_scores() -> Optional[bool]:
+    """Test that similarity scores are cosine similarities whatever the collection's metric"""
+    print("\n📐 Testing metric-aware similarity scores...")
+    try:
+        response = requests.post(f"{BASE_URL}/search/test", params={"query": "reasoning agents", "n_results": 3})
+        if response.status_code == 503:
+            print("⚠️  Search tool not initialized, skipping similarity check")
+            return None
+        data = response.json()
+        scores = [result["similarity_score"] for result in data["results"]]
+        if any(not -1.0 <= score <= 1.0 for score in scores) or scores != sorted(scores, reverse=True):
+            print(f"❌ Similarity scores out of range or order: {scores}")
+            return False
+        print(f"✅ {data['metric']} distance, cutoff {data['min_similarity']}, scores {[round(s, 3) for s in scores]}")
+        return True
+    except Exception as e:
+        print(f"❌ Similarity score error: {e}")
+        return False
+
 def test_tool_endpoint() -> bool:
     """Test the tool endpoint with local search"""
     print("\n🔧 Testing tool endpoint...")
@@ -104,6 +227,63 @@ def test_tool_endpoint() -> bool:
         print(f"❌ Tool endpoint error: {e}")
         return False
 
+def test_reranked_search() -> Optional[bool]:
+    """Test local search with the lexical rerank stage"""
+    print("\n🥇 Testing reranked search...")
+    tool_request = {
+        "agent_name": "Researcher",
+        "task": "local_search",
+        "query": "chain of thought reasoning",
+        "metadata": {"rerank": "lexical", "rerankBudgetMs": 500}
+    }
+    try:
+        response = requests.post(f"{BASE_URL}/tool", json=tool_request)
+        if response.status_code != 200:
+            print(f"❌ Reranked search failed: {response.status_code}")
+            return False
+        data = response.json()
+        if not data["success"]:
+            print(f"⚠️  Search unavailable, skipping rerank check: {data.get('error')}")
+            return None
+        report = data["metadata"]["rerank"]
+        if report is None or report["scorer"] != "lexical":
+            print(f"❌ Rerank report missing: {data['metadata']}")
+            return False
+        print(f"✅ Reranked {report['candidates']} candidates in {report['elapsed_ms']} ms "
+              f"(fell back: {report['fell_back']})")
+        return True
+    except Exception as e:
+        print(f"❌ Reranked search error: {e}")
+        return False
+
+def test_profiling() -> bool:
+    """Test a short sampling session and the slow-request list"""
+    print("\n🔬 Testing profiling endpoints...")
+    headers = {"X-Admin-Token": os.environ["ADMIN_TOKEN"]} if os.getenv("ADMIN_TOKEN") else {}
+    try:
+        response = requests.post(f"{BASE_URL}/admin/profile", params={"mode": "sampling", "seconds": 1},
+                                 headers=headers)
+        if response.status_code != 200:
+            print(f"❌ Profiling session failed to start: {response.status_code} {response.text}")
+            return False
+        session_id = response.json()["session"]["id"]
+        requests.post(f"{BASE_URL}/search/test", params={"query": "profiling", "n_results": 2})
+        time.sleep(1.5)
+        download = requests.get(f"{BASE_URL}/admin/profile/{session_id}/download", headers=headers)
+        if download.status_code != 200:
+            print(f"❌ Profile download failed: {download.status_code}")
+            return False
+        slow = requests.get(f"{BASE_URL}/admin/slow-requests", headers=headers)
+        if slow.status_code != 200:
+            print(f"❌ Slow request list failed: {slow.status_code}")
+            return False
+        print(f"✅ Profile {session_id}: {len(download.content)} bytes of folded stacks, "
+              f"{slow.json()['stats']['kept']} slow requests kept")
+        return True
+    except Exception as e:
+        print(f"❌ Profiling error: {e}")
+        return False
+
 def test_web_search_placeholder() -> bool:
     """Test the web search placeholder"""
     print("\n🌐 Testing web search placeholder...")
@@ -135,6 +315,1108 @@ def test_web_search_placeholder() -> bool:
         print(f"❌ Web search test error: {e}")
         return False
 
+def test_tool_stats() -> bool:
+    """Test the tool statistics endpoint"""
+    print("\n📈 Testing tool stats endpoint...")
+    try:
+        response = requests.get(f"{BASE_URL}/tool/stats")
+        if response.status_code == 200:
+            data = response.json()
+            print(f"✅ Coalescing stats: {data['coalescing']}")
+            print(f"📊 Scheduler: {data['scheduler']['queued']} queued, {data['scheduler']['active']} active")
+            return True
+        else:
+            print(f"❌ Tool stats failed: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ Tool stats error: {e}")
+        return False
+
+def test_single_flight() -> Optional[bool]:
+    """Test that concurrent identical calls share one execution, its errors and survive cancellation"""
+    print("\n🪢 Testing single-flight coalescing...")
+    try:
+        import asyncio
+        from request_coalescing import SingleFlight
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping coalescing check")
+        return None
+
+    async def scenario():
+        flight = SingleFlight()
+        executions = []
+
+        async def compute():
+            executions.append("compute")
+            await asyncio.sleep(0.05)
+            return {"answer": len(executions)}
+
+        async def fail():
+            executions.append("fail")
+            await asyncio.sleep(0.05)
+            raise ValueError("search failed")
+
+        results = await asyncio.gather(*(flight.do("query", compute) for _ in range(10)))
+        errors = await asyncio.gather(*(flight.do("broken", fail) for _ in range(5)), return_exceptions=True)
+
+        # A caller that goes away does not cancel the computation the others wait for
+        callers = [asyncio.ensure_future(flight.do("slow", compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        survivors = await asyncio.gather(*callers[1:])
+        cancelled = callers[0].cancelled()
+
+        again = await flight.do("query", compute)
+        return flight, executions, results, errors, survivors, cancelled, again
+
+    try:
+        flight, executions, results, errors, survivors, cancelled, again = asyncio.run(scenario())
+        stats = flight.stats()
+        if executions != ["compute", "fail", "compute", "compute"] \
+                or len(results) != 10 or any(result is not results[0] for result in results) \
+                or not all(isinstance(error, ValueError) for error in errors) or len(errors) != 5 \
+                or not cancelled or survivors != [{"answer": 3}, {"answer": 3}] or again != {"answer": 4} \
+                or stats["executions"] != 4 or stats["coalesced"] != 15 or stats["failures"] != 1 \
+                or stats["in_flight"] != 0:
+            print(f"❌ Unexpected coalescing: {executions}, {stats}")
+            return False
+        print(f"✅ 19 calls ran {stats['executions']} times; errors shared, cancellation isolated")
+        return True
+    except Exception as e:
+        print(f"❌ Coalescing error: {e}")
+        return False
+
+def test_fair_scheduler() -> Optional[bool]:
+    """Test weighted fairness, the reserved interactive slot and that batch floods do not starve interactive calls"""
+    print("\n⚖️  Testing fair tool scheduler...")
+    try:
+        import asyncio
+        from tool_scheduler import FairToolScheduler
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping scheduler check")
+        return None
+
+    async def scenario():
+        started = []
+
+        def call(tag, seconds=0.005):
+            async def fn():
+                started.append(tag)
+                await asyncio.sleep(seconds)
+            return fn
+
+        # One slot: missions share it equally, however many agents each mission runs
+        scheduler = FairToolScheduler(max_concurrency=1, reserved_interactive_slots=0)
+        await asyncio.gather(*(scheduler.run(call(agent), mission, agent, "interactive")
+                               for _ in range(10) for mission, agent in (("A", "a1"), ("A", "a2"), ("B", "b1"))))
+        by_mission = list(started[:18])
+
+        # Interactive calls get their class weight's share (8:1) over batch calls
+        started.clear()
+        scheduler = FairToolScheduler(max_concurrency=1, reserved_interactive_slots=0)
+        await asyncio.gather(*(scheduler.run(call(priority), mission, "agent", priority)
+                               for _ in range(20) for mission, priority in (("A", "batch"), ("B", "interactive"))))
+        by_class = list(started[:18])
+
+        # A batch flood never takes the reserved slot, so an interactive call starts at once
+        started.clear()
+        scheduler = FairToolScheduler(max_concurrency=3, reserved_interactive_slots=1)
+        flood = [asyncio.ensure_future(scheduler.run(call("batch", 0.1), "A", "crawler", "batch")) for _ in range(20)]
+        await asyncio.sleep(0.02)
+        active_batch = scheduler.stats()["classes"]["batch"]["active"]
+        submitted = time.perf_counter()
+        await scheduler.run(call("interactive", 0.0), "B", "chat", "interactive")
+        interactive_wait = time.perf_counter() - submitted
+        batch_before = started.index("interactive")
+        for task in flood:
+            task.cancel()
+        await asyncio.gather(*flood, return_exceptions=True)
+        return by_mission, by_class, active_batch, interactive_wait, batch_before, scheduler.stats()
+
+    try:
+        by_mission, by_class, active_batch, interactive_wait, batch_before, stats = asyncio.run(scenario())
+        if by_mission.count("b1") < 8 or abs(by_mission.count("a1") - by_mission.count("a2")) > 1:
+            print(f"❌ Missions not served fairly: {by_mission}")
+            return False
+        if by_class.count("batch") != 2:
+            print(f"❌ Class weights not applied: {by_class}")
+            return False
+        if active_batch != 2 or batch_before != 2 or interactive_wait >= 0.1:
+            print(f"❌ Interactive call waited {interactive_wait:.3f}s behind {batch_before} batch calls "
+                  f"({active_batch} batch active)")
+            return False
+        if stats["active"] != 0 or stats["queued"] != 0:
+            print(f"❌ Cancelled calls left state behind: {stats}")
+            return False
+        print(f"✅ Fair across missions and classes; interactive call started in {1000 * interactive_wait:.1f} ms "
+              f"during a batch flood")
+        return True
+    except Exception as e:
+        print(f"❌ Scheduler error: {e}")
+        return False
+
+def test_search_prewarm() -> Optional[bool]:
+    """Test pre-warming the search cache from the logged searches"""
+    print("\n🔥 Testing search cache pre-warm...")
+    try:
+        response = requests.post(f"{BASE_URL}/search/prewarm", params={"budget_seconds": 5})
+        if response.status_code == 503:
+            print("⚠️  Search tool not initialized, skipping pre-warm")
+            return None
+        if response.status_code == 200:
+            data = response.json()
+            report = data["report"]
+            print(f"✅ Pre-warmed {report['warmed']} of {report['candidates']} queries in {report['elapsed']}s")
+            print(f"📊 Search cache: {data['cache']}")
+            return True
+        else:
+            print(f"❌ Pre-warm failed: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ Pre-warm error: {e}")
+        return False
+
+def test_query_log() -> Optional[bool]:
+    """Test that the query log buffers appends, stays within its caps and pre-warms within document groups"""
+    print("\n🗒️  Testing query log...")
+    try:
+        import asyncio
+        from search_cache import CachePrewarmer, QueryLog, SearchResultCache
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping query log check")
+        return None
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "query_log.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"timestamp": "2000-01-01T00:00:00", "query": "ancient", "documentGroupIds": None}) + "\n")
+            log = QueryLog(path, max_bytes=4000, max_age_days=30)
+            size = os.path.getsize(path)
+            log.append("graph agents", ["g2", "g1"])
+            log.append("graph agents", ["g1", "g2"])
+            log.append("graph agents")
+            # Appends do no I/O until flushed, but are already mined
+            unflushed = os.path.getsize(path), len(log.read())
+            log.flush()
+            records = log.read()
+            if unflushed != (size, 4) or len(records) != 3 \
+                    or "ancient" in {record["query"] for record in records} or log.compactions != 1:
+                print(f"❌ Unexpected buffering or age compaction: {unflushed}, {records}")
+                return False
+
+            for i in range(200):
+                log.append(f"query {i}")
+            log.flush()
+            if os.path.getsize(path) > log.max_bytes or log.read()[-1]["query"] != "query 199":
+                print(f"❌ Query log not kept under {log.max_bytes} bytes: {log.stats()}")
+                return False
+
+            searched = []
+
+            async def search(query, n_results, groups=None):
+                searched.append((query, groups))
+                return {"success": True}
+
+            cache = SearchResultCache()
+            cache.put("query 199", 3, {"success": True})
+            log = QueryLog(os.path.join(tmp, "groups.jsonl"))
+            log.append("graph agents", ["g2", "g1"])
+            log.append("graph agents")
+            log.append("query 199")
+            prewarmer = CachePrewarmer(cache, log.read, search)
+            report = asyncio.run(prewarmer.run(5))
+            if sorted(searched, key=str) != sorted([("graph agents", ["g1", "g2"]), ("graph agents", None)], key=str) \
+                    or report["already_cached"] != 1 or report["candidates"] != 3:
+                print(f"❌ Pre-warm ignored document groups: {searched}, {report}")
+                return False
+        print(f"✅ Appends buffered, log compacted by age and size, warmed {searched}")
+        return True
+    except Exception as e:
+        print(f"❌ Query log error: {e}")
+        return False
+
+def test_ingest_jobs() -> bool:
+    """Test the ingestion job endpoints"""
+    print("\n📥 Testing ingestion job endpoints...")
+    try:
+        response = requests.get(f"{BASE_URL}/ingest")
+        if response.status_code != 200:
+            print(f"❌ Ingest job list failed: {response.status_code}")
+            return False
+        print(f"✅ {len(response.json()['jobs'])} ingestion jobs known")
+        
+        response = requests.get(f"{BASE_URL}/ingest/ingest_unknown")
+        if response.status_code == 404:
+            print("✅ Unknown job correctly reported as missing")
+            return True
+        else:
+            print(f"❌ Unknown job returned: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ Ingest jobs error: {e}")
+        return False
+
+def test_summary_cache() -> bool:
+    """Test storing and looking up a cached summary"""
+    print("\n📚 Testing summary cache...")
+    try:
+        key = {"paper_id": "test_paper", "prompt_template": "Summarize {paper}", "model": "test-model"}
+        response = requests.put(f"{BASE_URL}/summaries", json={**key, "summary": "A test summary"})
+        if response.status_code != 200:
+            print(f"❌ Summary store failed: {response.status_code}")
+            return False
+        
+        response = requests.post(f"{BASE_URL}/summaries/lookup", json=key)
+        data = response.json()
+        requests.delete(f"{BASE_URL}/summaries/paper/test_paper")
+        if data.get("hit") and data.get("summary") == "A test summary":
+            print("✅ Stored summary returned from cache")
+            return True
+        else:
+            print(f"❌ Unexpected lookup result: {data}")
+            return False
+    except Exception as e:
+        print(f"❌ Summary cache error: {e}")
+        return False
+
+def test_llm_stats() -> bool:
+    """Test the LLM gateway statistics endpoint"""
+    print("\n🤖 Testing LLM gateway stats...")
+    try:
+        response = requests.get(f"{BASE_URL}/llm/stats")
+        if response.status_code == 200:
+            stats = response.json()["stats"]
+            print(f"✅ Gateway to {stats['provider_url']}: {stats['requests']} requests")
+            return True
+        else:
+            print(f"❌ LLM stats failed: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ LLM stats error: {e}")
+        return False
+
+def test_llm_gateway_cache() -> Optional[bool]:
+    """Test exact and semantic gateway cache hits, and generation when the embedder fails"""
+    print("\n🤖 Testing LLM gateway caches...")
+    try:
+        import asyncio
+        import httpx
+        import numpy as np
+        from llm_gateway import LLMGateway, SemanticResponseCache
+        from llm_stub import create_app
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping gateway cache check")
+        return None
+
+    def bag_of_words(texts):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        return vectors.tolist()
+
+    def broken(texts):
+        raise RuntimeError("embedding model unavailable")
+
+    async def run(embedding_function):
+        gateway = LLMGateway("http://stub/v1/chat/completions", "stub",
+                             semantic_cache=SemanticResponseCache(embedding_function))
+        await gateway.client.aclose()
+        gateway.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()))
+        try:
+            prompts = ["Summarize the paper on tool-using agents.", "Summarize the paper on tool-using agents.",
+                       "summarize the paper on tool using agents"]
+            responses = [await gateway.complete({"agent": "Test", "messages": [{"role": "user", "content": prompt}]})
+                         for prompt in prompts]
+            return [response["cache"] for response in responses], gateway.stats()
+        finally:
+            await gateway.close()
+
+    try:
+        cached, stats = asyncio.run(run(bag_of_words))
+        if cached != [None, "exact", "semantic"] or stats["agents"]["Test"]["semantic_hits"] != 1:
+            print(f"❌ Unexpected cache outcomes: {cached}")
+            return False
+        # A failing embedder only disables the semantic cache; the provider still answers
+        cached, stats = asyncio.run(run(broken))
+        if cached != [None, "exact", None] or stats["semantic_cache"]["embedding_errors"] != 2:
+            print(f"❌ Unexpected outcomes with a failing embedder: {cached}, {stats['semantic_cache']}")
+            return False
+        print("✅ Exact and semantic hits served from cache, generation kept working without the embedder")
+        return True
+    except Exception as e:
+        print(f"❌ Gateway cache error: {e}")
+        return False
+
+def test_checkpoints() -> bool:
+    """Test saving and resuming workflow checkpoints"""
+    print("\n💾 Testing checkpoint store...")
+    try:
+        thread_id = f"test_thread_{int(time.time())}"
+        requests.put(f"{BASE_URL}/checkpoints/{thread_id}", json={"state": {"topic": "test", "revision_cycles": 0}})
+        requests.put(f"{BASE_URL}/checkpoints/{thread_id}", json={"state": {"topic": "test", "revision_cycles": 1}})
+        latest = requests.get(f"{BASE_URL}/checkpoints/{thread_id}/latest").json()
+        first = requests.get(f"{BASE_URL}/checkpoints/{thread_id}/steps/0").json()
+        requests.delete(f"{BASE_URL}/checkpoints/{thread_id}")
+        if latest.get("step") == 1 and first.get("state", {}).get("revision_cycles") == 0:
+            print("✅ Latest and earlier checkpoints restored")
+            return True
+        else:
+            print(f"❌ Unexpected checkpoints: {latest}, {first}")
+            return False
+    except Exception as e:
+        print(f"❌ Checkpoint error: {e}")
+        return False
+
+def test_missions() -> bool:
+    """Test creating a mission and paging its chat"""
+    print("\n🗂️ Testing mission store...")
+    try:
+        mission = requests.post(f"{BASE_URL}/missions", json={"userId": "test-user", "title": "Test Mission"}).json()
+        for i in range(3):
+            requests.post(f"{BASE_URL}/missions/{mission['id']}/chat", json={"role": "user", "content": f"message {i}"})
+        page = requests.get(f"{BASE_URL}/missions/{mission['id']}/chat", params={"limit": 2}).json()
+        if [item["content"] for item in page["items"]] == ["message 2", "message 1"] and page["next_cursor"]:
+            print("✅ Chat messages paged newest first")
+            return True
+        else:
+            print(f"❌ Unexpected chat page: {page}")
+            return False
+    except Exception as e:
+        print(f"❌ Mission store error: {e}")
+        return False
+
+def test_save_results() -> bool:
+    """Test that a saved artifact is written and listed once, and that unknown missions are rejected"""
+    print("\n💾 Testing save_results...")
+    mission = None
+    try:
+        mission = requests.post(f"{BASE_URL}/missions", json={"userId": "test-user", "title": "Save Mission"}).json()
+        payload = {
+            "agent_name": "Test Agent",
+            "task": "save_results",
+            "query": f"# Test Result\n\nSaved at {time.time()}",
+            "metadata": {"missionId": mission["id"], "filename": "test_result.md"}
+        }
+        first = requests.post(f"{BASE_URL}/tool", json=payload).json()
+        second = requests.post(f"{BASE_URL}/tool", json=payload).json()
+        if not first["success"] or not second["metadata"]["artifact"].get("deduplicated"):
+            print(f"❌ Unexpected save results: {first}, {second}")
+            return False
+        # The file is written behind the acknowledgement
+        entries = []
+        for _ in range(20):
+            entries = requests.get(f"{BASE_URL}/missions/{mission['id']}/artifacts").json()["items"]
+            if entries:
+                break
+            time.sleep(0.1)
+        path = os.path.join(DATA_DIR, "idea_missions", mission["id"], first["metadata"]["artifact"]["path"])
+        if len(entries) != 1 or not os.path.isfile(path):
+            print(f"❌ Expected one manifest entry and {path}, got {entries}")
+            return False
+        bad = {**payload, "metadata": {"missionId": "../../../../tmp/evil", "filename": "evil.md"}}
+        rejected = requests.post(f"{BASE_URL}/tool", json=bad).json()
+        if rejected["success"]:
+            print(f"❌ Save to an invalid mission ID was accepted: {rejected}")
+            return False
+        print(f"✅ {first['result']}; duplicate deduplicated, invalid mission rejected")
+        return True
+    except Exception as e:
+        print(f"❌ Save results error: {e}")
+        return False
+    finally:
+        if mission:
+            requests.delete(f"{BASE_URL}/missions/{mission['id']}")
+
+def test_artifact_writer() -> Optional[bool]:
+    """Test that saves fail instead of hanging when the artifact writer is stopped or stuck"""
+    print("\n✍️  Testing artifact writer acknowledgements...")
+    try:
+        import asyncio
+        import threading
+        from artifact_writer import ArtifactWriter
+        from mission_store import MissionStore
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping artifact writer check")
+        return None
+
+    class StuckStore(MissionStore):
+        """Mission store whose duplicate lookup blocks the writer thread until released"""
+        def __init__(self, path):
+            super().__init__(path)
+            self.release = threading.Event()
+
+        def find_artifact_by_hash(self, mission_id, content_hash):
+            self.release.wait()
+            return super().find_artifact_by_hash(mission_id, content_hash)
+
+    async def save(writer, content):
+        try:
+            return await writer.save("mission_1", content, agent="tester")
+        except Exception as e:
+            return e
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = StuckStore(os.path.join(tmp, "missions.sqlite3"))
+            store.upsert_mission({"id": "mission_1", "userId": "tester", "createdAt": "2026-01-01T00:00:00"})
+            writer = ArtifactWriter(os.path.join(tmp, "missions"), store,
+                                    journal_path=os.path.join(tmp, "journal.jsonl"), ack_timeout=0.2)
+            not_started = asyncio.run(save(writer, "# Result"))
+            writer.start()
+            stuck = asyncio.run(save(writer, "# Result"))
+            stuck_stats = writer.stats()
+            store.release.set()
+            saved = [asyncio.run(save(writer, "# Result")) for _ in range(2)]
+            writer.stop()
+            stats = writer.stats()
+        if not isinstance(not_started, RuntimeError) or not isinstance(stuck, TimeoutError) \
+                or not stuck_stats["writer_alive"] or stats["writer_alive"] or stats["ack_timeouts"] != 1:
+            print(f"❌ Saves did not fail fast: {not_started!r}, {stuck!r}, {stuck_stats}")
+            return False
+        # The timed-out save is still journaled once released, so both later saves are duplicates
+        if any(isinstance(entry, Exception) for entry in saved) \
+                or not all(entry.get("deduplicated") for entry in saved) \
+                or stats["saves"] != 1 or stats["deduplicated"] != 2:
+            print(f"❌ Unexpected saves after release: {saved}, {stats}")
+            return False
+        print(f"✅ Stopped and stuck writers fail saves; {stats['saves']} save, {stats['deduplicated']} deduplicated")
+        return True
+    except Exception as e:
+        print(f"❌ Artifact writer error: {e}")
+        return False
+
+def test_artifact_search() -> bool:
+    """Test artifact search over a mission's artifacts"""
+    print("\n📝 Testing artifact search...")
+    try:
+        payload = {
+            "agent_name": "Test Agent",
+            "task": "artifact_search",
+            "query": "research plan milestones",
+            "metadata": {"missionId": "test_mission_without_artifacts"}
+        }
+        response = requests.post(f"{BASE_URL}/tool", json=payload)
+        data = response.json()
+        if response.status_code == 200 and data["success"]:
+            print(f"✅ Artifact search returned {data['metadata']['passages']} passages")
+            return True
+        else:
+            print(f"❌ Artifact search failed: {data}")
+            return False
+    except Exception as e:
+        print(f"❌ Artifact search error: {e}")
+        return False
+
+def test_chat_memory() -> Optional[bool]:
+    """Test that chat memory folds closed segments into the rolling summary and retrieves a relevant earlier turn"""
+    print("\n🧠 Testing chat memory...")
+    try:
+        from chat_memory import RECENT_TURNS
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping chat memory check")
+        return None
+
+    try:
+        segment_turns = requests.get(f"{BASE_URL}/tool/stats").json()["chat_memory"]["segment_turns"]
+        mission = requests.post(f"{BASE_URL}/missions", json={"userId": "test-user", "title": "Memory Mission"}).json()
+        # One closed segment beyond the verbatim recent turns is folded into the summary
+        messages = ["We chose chain-of-thought prompting for the math benchmark."] + \
+                   [f"Unrelated message {i} about scheduling." for i in range(segment_turns + RECENT_TURNS)]
+        for content in messages:
+            requests.post(f"{BASE_URL}/missions/{mission['id']}/chat", json={"role": "user", "content": content})
+        payload = {
+            "agent_name": "Test Agent",
+            "task": "chat_memory",
+            "query": "which prompting method for math",
+            "metadata": {"missionId": mission["id"], "n_results": 1, "recentTurns": 2}
+        }
+        data = requests.post(f"{BASE_URL}/tool", json=payload).json()
+        if not data["success"]:
+            print(f"❌ Chat memory failed: {data}")
+            return False
+
+        # Summaries are written in the background after a lookup
+        summary = None
+        for _ in range(20):
+            summary = requests.get(f"{BASE_URL}/missions/{mission['id']}/memory/search",
+                                   params={"query": "math"}).json()["summary"]
+            if summary:
+                break
+            time.sleep(0.1)
+        if not summary or not summary["summary"].strip() or summary["turns"] != segment_turns:
+            print(f"❌ No rolling summary after {len(messages)} turns: {summary}")
+            return False
+
+        stats = requests.get(f"{BASE_URL}/tool/stats").json()["chat_memory"]
+        if not stats["vector_search"] or stats["embedded"] < stats["turns"]:
+            print(f"⚠️  Chat turns not embedded, skipping recall check: {stats}")
+            return None
+        if "chain-of-thought" not in data["result"]:
+            print(f"❌ Relevant turn not recalled: {data}")
+            return False
+        print(f"✅ Relevant turn recalled from {data['metadata']['total_turns']} turns; "
+              f"{summary['turns']} turns summarized ({summary['method']})")
+        return True
+    except Exception as e:
+        print(f"❌ Chat memory error: {e}")
+        return False
+
+def test_quantized_recall() -> Optional[bool]:
+    """Test recall and memory of the quantized sidecar index against exact search"""
+    print("\n🗜️  Testing quantized index recall...")
+    try:
+        import numpy as np
+        from quantized_index import QuantizedVectorIndex, recall_memory_report
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping quantized index check")
+        return None
+    try:
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(2000, 64)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = [f"paper{i}_chunk_0_test" for i in range(len(vectors))]
+        # Random vectors are the worst case for binary codes, real embeddings recall far better
+        expected = {"none": (1.0, 1.0), "int8": (0.95, 3.5), "binary": (0.4, 30.0)}
+        with tempfile.TemporaryDirectory() as tmp:
+            for quantization, (min_recall, min_ratio) in expected.items():
+                index = QuantizedVectorIndex.build(os.path.join(tmp, quantization), ids, vectors, quantization,
+                                                   metric="cosine")
+                report = recall_memory_report(index, k=10, n_queries=50)
+                nearest = index.search(vectors[7], n_results=1)[0][0]
+                if report["recall_at_k"] < min_recall or report["compression_ratio"] < min_ratio or nearest != ids[7]:
+                    print(f"❌ {quantization}: recall {report['recall_at_k']}, {report['compression_ratio']}x, "
+                          f"nearest {nearest}")
+                    return False
+                print(f"✅ {quantization}: recall@10 {report['recall_at_k']}, {report['compression_ratio']}x smaller")
+        return True
+    except Exception as e:
+        print(f"❌ Quantized index error: {e}")
+        return False
+
+def test_ann_evaluation() -> Optional[bool]:
+    """Test the HNSW recall-vs-latency evaluation and the saved index settings"""
+    print("\n🎛️  Testing ANN parameter evaluation...")
+    try:
+        import numpy as np
+        from evaluate_ann import exact_ground_truth, evaluate_config, pick_best
+        from collection_config import collection_creation_metadata, load_index_settings, save_index_settings
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping ANN evaluation check")
+        return None
+    try:
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(1000, 32)).astype(np.float32)
+        queries = rng.normal(size=(30, 32)).astype(np.float32)
+        ids = [f"paper{i}_chunk_0_test" for i in range(len(embeddings))]
+        truth = exact_ground_truth(embeddings, queries, 10, "cosine")
+        results = [
+            evaluate_config(ids, embeddings, queries, truth, 10, {
+                "hnsw:space": "cosine", "hnsw:M": m, "hnsw:construction_ef": construction_ef, "hnsw:search_ef": search_ef
+            })
+            for m, construction_ef, search_ef in ((4, 10, 4), (16, 200, 200))
+        ]
+        exhaustive = results[1]
+        if exhaustive["recall_at_k"] < 0.95 or pick_best(results, 0.95) is not exhaustive \
+                or pick_best(results, 1.01)["recall_at_k"] != max(r["recall_at_k"] for r in results):
+            print(f"❌ Unexpected evaluation: {results}")
+            return False
+
+        with tempfile.TemporaryDirectory() as tmp:
+            save_index_settings(tmp, "papers", {"hnsw:M": 16, "hnsw:search_ef": 200})
+            save_index_settings(tmp, "papers", {"search:min_similarity": 0.5})
+            metadata = collection_creation_metadata(tmp, "papers", {"description": "test"})
+            if load_index_settings(tmp, "papers") != {"hnsw:M": 16, "hnsw:search_ef": 200, "search:min_similarity": 0.5} \
+                    or metadata != {"description": "test", "hnsw:M": 16, "hnsw:search_ef": 200, "hnsw:space": "cosine"}:
+                print(f"❌ Unexpected index settings: {metadata}")
+                return False
+        print(f"✅ recall@10 {results[0]['recall_at_k']} -> {exhaustive['recall_at_k']}, "
+              f"settings merged into collection metadata")
+        return True
+    except Exception as e:
+        print(f"❌ ANN evaluation error: {e}")
+        return False
+
+def test_paper_table_migration() -> Optional[bool]:
+    """Test moving paper-level fields out of chunk metadata into the paper table"""
+    print("\n🗃️  Testing compact chunk metadata migration...")
+    try:
+        import chromadb
+        from chromadb.config import Settings
+        from migrate_chunk_metadata import migrate_collection
+        from paper_store import CHUNK_FIELDS, PaperStore
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping migration check")
+        return None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            chunks = {"2401.00001": ["Agents plan with tools.", "They reflect on failures."],
+                      "2401.00002": ["Chain of thought helps math."]}
+            ids, documents, metadatas = [], [], []
+            for paper_id, texts in chunks.items():
+                source = os.path.join(tmp, f"{paper_id}.md")
+                with open(source, "w", encoding="utf-8") as f:
+                    f.write("# Title\n\n" + "\n\n".join(texts))
+                for chunk_id, text in enumerate(texts):
+                    ids.append(f"{paper_id}_chunk_{chunk_id}_test")
+                    documents.append(text)
+                    metadatas.append({"paper_id": paper_id, "chunk_id": chunk_id, "headers": "Title",
+                                      "filename": f"{paper_id}.md", "file_path": source, "source": "test",
+                                      "loaded_at": "2024-01-01T00:00:00"})
+
+            client = chromadb.PersistentClient(path=tmp, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+            collection = client.create_collection(name="papers")
+            embeddings = [[float(i), 1.0, 0.0] for i in range(len(ids))]
+            collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+            counts = migrate_collection(client, tmp, "papers")
+            migrated = client.get_collection(name="papers").get(include=["embeddings", "metadatas"])
+            papers = PaperStore(tmp).get_papers("papers")
+            original = {chunk_id: (document, embedding)
+                        for chunk_id, document, embedding in zip(ids, documents, embeddings)}
+            sources = {paper_id: open(row["file_path"], encoding="utf-8").read() for paper_id, row in papers.items()}
+            # Offsets recovered from the markdown point back at each chunk's text
+            offsets_ok = all(
+                sources[metadata["paper_id"]][metadata["start"]:metadata["end"]] == original[chunk_id][0]
+                for chunk_id, metadata in zip(migrated["ids"], migrated["metadatas"])
+            )
+            if counts != {"chunks": 3, "papers": 2} \
+                    or any(set(metadata) != set(CHUNK_FIELDS) for metadata in migrated["metadatas"]) \
+                    or not offsets_ok \
+                    or sorted(papers) != sorted(chunks) or papers["2401.00001"]["source"] != "test" \
+                    or [original[chunk_id][1] for chunk_id in migrated["ids"]] != migrated["embeddings"]:
+                print(f"❌ Unexpected migration: {counts}, {migrated['metadatas']}, {papers}")
+                return False
+            # Re-running keeps the already compact rows and their paper table entries
+            migrate_collection(client, tmp, "papers")
+            if PaperStore(tmp).get_papers("papers") != papers:
+                print("❌ Second migration changed the paper table")
+                return False
+        print(f"✅ {counts['chunks']} chunks compacted, {counts['papers']} papers moved to the paper table")
+        return True
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        return False
+
+def test_resumable_conversion() -> Optional[bool]:
+    """Test that PDF conversion resumes, retries failures and re-converts changed PDFs"""
+    print("\n📄 Testing resumable PDF conversion...")
+    try:
+        from convert_pdfs import StubConverter, convert_collection
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping conversion check")
+        return None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_dir = os.path.join(tmp, "papers", "pdfs")
+            markdown_dir = os.path.join(tmp, "papers", "markdown")
+            os.makedirs(pdf_dir)
+            os.makedirs(markdown_dir)
+            for paper_id in ("2401.00001", "2401.00002", "2401.00003"):
+                with open(os.path.join(pdf_dir, f"{paper_id}.pdf"), "wb") as f:
+                    f.write(f"%PDF-1.4 {paper_id}".encode())
+            # A file where the output directory belongs makes one conversion fail
+            blocker = os.path.join(markdown_dir, "2401.00003.md")
+            open(blocker, "w").close()
+
+            def run(**kwargs):
+                converted = []
+                counts = convert_collection("papers", StubConverter(), workers=2, on_converted=converted.append,
+                                            collections_dir=tmp, **kwargs)
+                return counts, converted
+
+            first, converted = run()
+            exhausted, _ = run(max_attempts=1)
+            os.remove(blocker)
+            retried, _ = run()
+            with open(os.path.join(pdf_dir, "2401.00001.pdf"), "ab") as f:
+                f.write(b" revised")
+            changed, _ = run()
+
+            # Markdown produced before the state file existed is adopted unless it is empty
+            existing = {}
+            for paper_id, content in (("2401.00004", "# Converted earlier\n"), ("2401.00005", "")):
+                with open(os.path.join(pdf_dir, f"{paper_id}.pdf"), "wb") as f:
+                    f.write(f"%PDF-1.4 {paper_id}".encode())
+                path = StubConverter.expected_markdown_path(f"{paper_id}.pdf", markdown_dir)
+                os.makedirs(os.path.dirname(path))
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                existing[paper_id] = path
+            adopted, reconverted = run()
+            with open(existing["2401.00004"], "r", encoding="utf-8") as f:
+                kept = f.read()
+            with open(os.path.join(tmp, "papers", "conversion_state.json"), "r", encoding="utf-8") as f:
+                state = json.load(f)
+            expected = [
+                {"total": 3, "skipped": 0, "converted": 2, "failed": 1},
+                {"total": 3, "skipped": 3, "converted": 0, "failed": 0},
+                {"total": 3, "skipped": 2, "converted": 1, "failed": 0},
+                {"total": 3, "skipped": 2, "converted": 1, "failed": 0},
+                {"total": 5, "skipped": 4, "converted": 1, "failed": 0},
+            ]
+            if [first, exhausted, retried, changed, adopted] != expected or len(converted) != 2 \
+                    or not all(os.path.isfile(path) for path in converted):
+                print(f"❌ Unexpected conversion runs: {[first, exhausted, retried, changed, adopted]}, {converted}")
+                return False
+            if reconverted != [existing["2401.00005"]] or kept != "# Converted earlier\n" \
+                    or state["2401.00004.pdf"]["status"] != "done" \
+                    or state["2401.00004.pdf"]["sha256"] != hashlib.sha256(b"%PDF-1.4 2401.00004").hexdigest():
+                print(f"❌ Existing markdown not adopted: {reconverted}, {state.get('2401.00004.pdf')}")
+                return False
+        print("✅ Finished PDFs skipped, failures retried, changed PDFs re-converted, existing markdown adopted")
+        return True
+    except Exception as e:
+        print(f"❌ Conversion error: {e}")
+        return False
+
+def test_handoff_groups() -> Optional[bool]:
+    """Test that papers handed off after conversion join their collection's document group"""
+    print("\n🏷️  Testing conversion handoff groups...")
+    try:
+        import numpy as np
+        from convert_pdfs import ChromaDBIngestHandoff
+        from document_groups import DocumentGroupIndex
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping handoff check")
+        return None
+
+    class HashEmbedding:
+        """Offline stand-in for the sentence embedding model"""
+        def __call__(self, input):
+            return [np.random.default_rng(abs(hash(text)) % 2 ** 32).normal(size=8).tolist() for text in input]
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            markdown_dir = os.path.join(tmp, "collections", "Test_Group", "markdown")
+            path = os.path.join(markdown_dir, "2401.00001.md", "2401.00001", "auto", "2401.00001.md")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# Agents\n\n## Abstract\n\nTool-using agents plan, act and reflect on failures.\n")
+
+            handoff = ChromaDBIngestHandoff("papers", "Test_Group", db_path=os.path.join(tmp, "chromadb"))
+            handoff.collection = handoff.client.get_collection(name="papers", embedding_function=HashEmbedding())
+            handoff(path)
+            groups = DocumentGroupIndex(handoff.db_path).load("papers")
+            if handoff.ingested != 1 or groups.group_sizes() != {"Test_Group": 1} \
+                    or "2401.00001" not in groups.ordinals:
+                print(f"❌ Unexpected groups after handoff: {groups.group_sizes()}")
+                return False
+        print("✅ Handed-off paper added to its collection's group")
+        return True
+    except Exception as e:
+        print(f"❌ Handoff error: {e}")
+        return False
+
+def test_group_search_fallback() -> Optional[bool]:
+    """Test group-restricted search of a collection without the sidecar index"""
+    print("\n🗂️  Testing group search without a sidecar index...")
+    try:
+        import numpy as np
+        import chromadb
+        from chromadb.config import Settings
+        from chromadb_search_tool import ChromaDBSearchTool
+        from document_groups import DocumentGroupIndex
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping group search fallback check")
+        return None
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "chromadb")
+            rng = np.random.default_rng(7)
+            client = chromadb.PersistentClient(path=db_path, settings=Settings(anonymized_telemetry=False))
+            collection = client.create_collection("papers", metadata={"hnsw:space": "cosine"})
+            paper_ids = ["2401.00001", "2401.00002", "2401.00003"]
+            ids = [f"{paper_id}_chunk_{i}_abcd" for paper_id in paper_ids for i in range(2)]
+            collection.add(ids=ids, embeddings=rng.normal(size=(len(ids), 8)).tolist(),
+                           documents=[f"Chunk {chunk_id}" for chunk_id in ids],
+                           metadatas=[{"paper_id": chunk_id.split("_chunk_")[0]} for chunk_id in ids])
+            groups = DocumentGroupIndex(db_path)
+            groups.add_papers("papers", "Group_A", paper_ids[:2])
+            groups.add_papers("papers", "Group_B", paper_ids[2:])
+
+            tool = ChromaDBSearchTool(db_path, "papers")
+            query_embedding = rng.normal(size=8).tolist()
+            in_b = tool.search("agents", 3, query_embedding=query_embedding, groups=["Group_B"])
+            in_both = tool.search("agents", 6, query_embedding=query_embedding, groups=["Group_A", "Group_B"])
+            unknown = tool.search("agents", 3, query_embedding=query_embedding, groups=["Unknown"])
+            if tool.quantized_index is not None or not in_b["success"] \
+                    or [result["paper_id"] for result in in_b["results"]] != [paper_ids[2]] * 2 \
+                    or in_both["total_found"] != 6 or not unknown["success"] or unknown["results"]:
+                print(f"❌ Unexpected group search results: {in_b}, {in_both['total_found']}, {unknown}")
+                return False
+        print("✅ Group search filtered by paper ID without a sidecar index")
+        return True
+    except Exception as e:
+        print(f"❌ Group search fallback error: {e}")
+        return False
+
+def test_watcher_debounce() -> Optional[bool]:
+    """Test that the markdown watcher batches a burst of writes into one re-index"""
+    print("\n👀 Testing markdown watcher debounce...")
+    try:
+        import shutil
+        from markdown_watcher import MarkdownWatcher, markdown_path_for
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping watcher check")
+        return None
+    calls = []
+    watcher = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = MarkdownWatcher(tmp, lambda changed, removed: calls.append((changed, removed)),
+                                      debounce=0.6, poll_interval=0.1, force_polling=True)
+            watcher.start()
+            time.sleep(0.3)
+            path = markdown_path_for(tmp, "2401.00001")
+            os.makedirs(os.path.dirname(path))
+            # MinerU writes a paper in several steps; only the quiet paper is re-indexed
+            for part in range(3):
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(f"Section {part}\n")
+                time.sleep(0.2)
+            with open(os.path.join(tmp, "notes.txt"), "w", encoding="utf-8") as f:
+                f.write("not a paper")
+            during_burst = list(calls)
+            time.sleep(1.5)
+            after_burst = list(calls)
+            shutil.rmtree(os.path.join(tmp, "2401.00001.md"))
+            time.sleep(1.5)
+            watcher.stop()
+
+            if during_burst or after_burst != [(["2401.00001"], [])] \
+                    or calls != [(["2401.00001"], []), ([], ["2401.00001"])]:
+                print(f"❌ Unexpected watcher batches: {calls} (during burst: {during_burst})")
+                return False
+        print(f"✅ Burst of writes re-indexed once, removal reported ({watcher.mode})")
+        return True
+    except Exception as e:
+        print(f"❌ Watcher error: {e}")
+        return False
+    finally:
+        if watcher:
+            watcher.stop()
+
+def test_watcher_retry() -> Optional[bool]:
+    """Test that papers whose re-index failed are dispatched again"""
+    print("\n🔁 Testing markdown watcher retry...")
+    try:
+        from markdown_watcher import MarkdownWatcher, markdown_path_for
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping watcher retry check")
+        return None
+    attempts = []
+
+    def flaky(changed, removed):
+        attempts.append((changed, removed))
+        if len(attempts) == 1:
+            raise ConnectionError("server unavailable")
+
+    watcher = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = MarkdownWatcher(tmp, flaky, debounce=0.3, poll_interval=0.1, force_polling=True, retry=0.5)
+            watcher.start()
+            time.sleep(0.3)
+            path = markdown_path_for(tmp, "2401.00001")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# Paper\n")
+            time.sleep(2.0)
+            watcher.stop()
+            if attempts != [(["2401.00001"], []), (["2401.00001"], [])] \
+                    or watcher.failures != 1 or watcher.dispatched != 1:
+                print(f"❌ Unexpected dispatches: {attempts} ({watcher.failures} failures)")
+                return False
+        print("✅ Failed re-index retried and dispatched once it succeeded")
+        return True
+    except Exception as e:
+        print(f"❌ Watcher retry error: {e}")
+        return False
+    finally:
+        if watcher:
+            watcher.stop()
+
+def test_snapshot_round_trip() -> Optional[bool]:
+    """Test exporting a collection snapshot and importing it into another database"""
+    print("\n📦 Testing collection snapshot round trip...")
+    try:
+        import numpy as np
+        import chromadb
+        from chromadb.config import Settings
+        from collection_snapshot import MANIFEST_FILE, export_snapshot, import_snapshot
+        from document_groups import DocumentGroupIndex
+        from paper_store import PaperStore
+        from quantized_index import QuantizedVectorIndex, quantized_index_dir
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping snapshot check")
+        return None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path, target_path, snapshot_dir = (os.path.join(tmp, name) for name in ("source", "target", "snapshot"))
+            settings = Settings(anonymized_telemetry=False, allow_reset=True)
+            source = chromadb.PersistentClient(path=source_path, settings=settings)
+            collection = source.create_collection(name="papers", metadata={"hnsw:space": "cosine"})
+            rng = np.random.default_rng(0)
+            ids = [f"2401.{i // 3:05d}_chunk_{i % 3}_test" for i in range(60)]
+            embeddings = rng.normal(size=(len(ids), 16)).astype(np.float32)
+            collection.add(ids=ids, embeddings=embeddings.tolist(), documents=[f"Chunk {i} ✓" for i in range(len(ids))],
+                           metadatas=[{"paper_id": chunk_id.split("_chunk_")[0]} for chunk_id in ids])
+            PaperStore(source_path).upsert_papers("papers", [{"paper_id": "2401.00000", "source": "test"}])
+            DocumentGroupIndex(source_path).add_papers("papers", "Test_Group", ["2401.00000", "2401.00001"])
+            manifest = export_snapshot(source, source_path, snapshot_dir, "papers")
+
+            target = chromadb.PersistentClient(path=target_path, settings=settings)
+            target.create_collection(name="papers").add(ids=["local"], embeddings=[[0.0] * 16], documents=["local"])
+            # Paper rows and the sidecar index of the local collection must not survive the import
+            PaperStore(target_path).upsert_papers("papers", [{"paper_id": "local", "source": "local"}])
+            QuantizedVectorIndex.build(quantized_index_dir(target_path, "papers"), ["local"], [[1.0] * 16], "int8")
+            # A snapshot that does not match its manifest leaves the live collection alone
+            with open(os.path.join(snapshot_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                broken = json.load(f)
+            broken["collections"][0]["count"] += 1
+            with open(os.path.join(snapshot_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(broken, f)
+            try:
+                import_snapshot(target, target_path, snapshot_dir)
+                print("❌ Mismatched snapshot was imported")
+                return False
+            except ValueError:
+                pass
+            if target.get_collection(name="papers").count() != 1:
+                print("❌ Failed import replaced the live collection")
+                return False
+            with open(os.path.join(snapshot_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+
+            import_snapshot(target, target_path, snapshot_dir)
+            restored = target.get_collection(name="papers")
+            stored = restored.get(ids=ids[:5], include=["embeddings", "documents"])
+            nearest = restored.query(query_embeddings=[embeddings[7].tolist()], n_results=1)["ids"][0][0]
+            groups = DocumentGroupIndex(target_path).load("papers").group_sizes()
+            if restored.count() != len(ids) or restored.metadata.get("snapshot_id") != manifest["snapshot_id"] \
+                    or not np.allclose(stored["embeddings"], embeddings[[ids.index(i) for i in stored["ids"]]]) \
+                    or stored["documents"][0] != f"Chunk {ids.index(stored['ids'][0])} ✓" or nearest != ids[7] \
+                    or PaperStore(target_path).get_papers("papers") != {"2401.00000": {"source": "test"}} \
+                    or groups != {"Test_Group": 2} \
+                    or QuantizedVectorIndex.load_if_exists(quantized_index_dir(target_path, "papers")) is not None \
+                    or [c.name for c in target.list_collections()] != ["papers"]:
+                print(f"❌ Unexpected restored collection: {restored.count()} records, groups {groups}, "
+                      f"papers {PaperStore(target_path).get_papers('papers')}")
+                return False
+        print(f"✅ Snapshot {manifest['snapshot_id']} restored with embeddings, papers and groups")
+        return True
+    except Exception as e:
+        print(f"❌ Snapshot error: {e}")
+        return False
+
+def test_shard_merge() -> Optional[bool]:
+    """Test partitioning a collection into shards and merging the shards' results"""
+    print("\n🧩 Testing sharded search...")
+    try:
+        import asyncio
+        import httpx
+        import chromadb
+        from chromadb.config import Settings
+        from shard_collection import shard_collection, shard_for, shard_db_path
+        from sharded_search import ShardedSearchCoordinator
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping shard check")
+        return None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = chromadb.PersistentClient(path=tmp, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+            ids = [f"2401.{i // 4:05d}_chunk_{i % 4}_test" for i in range(40)]
+            client.create_collection(name="papers").add(
+                ids=ids, embeddings=[[float(i), 1.0] for i in range(len(ids))],
+                metadatas=[{"paper_id": chunk_id.split("_chunk_")[0]} for chunk_id in ids]
+            )
+            shards = shard_collection(tmp, "papers", 3, os.path.join(tmp, "shards"), metadata_collection_name=None)
+            for shard in shards:
+                shard_client = chromadb.PersistentClient(path=shard_db_path(os.path.join(tmp, "shards"), shard["shard"]),
+                                                         settings=Settings(anonymized_telemetry=False, allow_reset=True))
+                stored = shard_client.get_collection(name="papers").get(include=["metadatas"])
+                if any(shard_for(m["paper_id"], 3) != shard["shard"] for m in stored["metadatas"]):
+                    print(f"❌ Shard {shard['shard']} holds papers of another shard")
+                    return False
+            if sum(shard["chunks"] for shard in shards) != len(ids):
+                print(f"❌ Shards hold {[shard['chunks'] for shard in shards]} of {len(ids)} chunks")
+                return False
+
+        # Two shards answer, one fails; the merge keeps the global top results
+        shard_results = {
+            "http://shard-0": [0.91, 0.42], "http://shard-1": [0.87, 0.80, 0.10]
+        }
+        payloads = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            base = f"{request.url.scheme}://{request.url.host}"
+            payloads.append(json.loads(request.content))
+            if base not in shard_results:
+                return httpx.Response(500)
+            return httpx.Response(200, json={"success": True, "min_similarity": 0.05, "results": [
+                {"id": f"{base}/{score}", "similarity_score": score} for score in shard_results[base]
+            ]})
+
+        async def search():
+            coordinator = ShardedSearchCoordinator(["http://shard-0", "http://shard-1", "http://shard-2"],
+                                                   embedding_function=lambda texts: [[0.5, 0.5] for _ in texts])
+            await coordinator.client.aclose()
+            coordinator.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await coordinator.search("agents", n_results=3)
+            finally:
+                await coordinator.close()
+
+        merged = asyncio.run(search())
+        if [r["similarity_score"] for r in merged["results"]] != [0.91, 0.87, 0.80] \
+                or merged["shards"]["failed"] != ["http://shard-2"] or not merged["shards"]["partial"] \
+                or any(payload.get("query_embedding") != [0.5, 0.5] for payload in payloads):
+            print(f"❌ Unexpected merged results: {merged}")
+            return False
+        print(f"✅ {len(ids)} chunks split by paper over {len(shards)} shards, partial results merged in order")
+        return True
+    except Exception as e:
+        print(f"❌ Shard error: {e}")
+        return False
+
+def test_synthetic_corpus() -> Optional[bool]:
+    """Test that the synthetic corpus is reproducible per seed and sized to the chunk target"""
+    print("\n🧪 Testing synthetic corpus generator...")
+    try:
+        from generate_synthetic_corpus import generate_corpus
+    except ImportError as e:
+        print(f"⚠️  {e}, skipping corpus check")
+        return None
+
+    def read_tree(root: str) -> Dict[str, bytes]:
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            reports = [generate_corpus("synthetic", 400, seed=seed, collections_dir=os.path.join(tmp, name),
+                                       mean_chunks_per_paper=20)
+                       for name, seed in (("first", 7), ("second", 7), ("other", 8))]
+            first, second, other = (read_tree(os.path.join(tmp, name)) for name in ("first", "second", "other"))
+            papers = [path for path in first if path.endswith(".md")]
+            if first != second or first == other or len(papers) != reports[0]["papers"] \
+                    or not 300 <= reports[0]["estimated_chunks"] <= 500:
+                print(f"❌ Unexpected corpus: {reports}")
+                return False
+        print(f"✅ {reports[0]['papers']} papers, ~{reports[0]['estimated_chunks']} chunks, identical for the same seed")
+        return True
+    except Exception as e:
+        print(f"❌ Synthetic corpus error: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🧪 FastAPI Backend Test Suite")
@@ -146,27 +1428,67 @@ def main():
     
     tests = [
         ("Health Check", test_health_endpoint),
+        ("Readiness", test_ready_endpoint),
         ("Search Stats", test_search_stats),
+        ("Search Stats ETag", test_search_stats_etag),
         ("Search Functionality", test_search_functionality),
+        ("Group Search", test_group_search),
+        ("Similarity Scores", test_similarity_scores),
         ("Tool Endpoint", test_tool_endpoint),
+        ("Reranked Search", test_reranked_search),
+        ("Structured Search", test_structured_search),
+        ("Profiling", test_profiling),
         ("Web Search Placeholder", test_web_search_placeholder),
+        ("Tool Stats", test_tool_stats),
+        ("Single-flight Coalescing", test_single_flight),
+        ("Fair Scheduler", test_fair_scheduler),
+        ("Search Cache Pre-warm", test_search_prewarm),
+        ("Query Log", test_query_log),
+        ("Ingest Jobs", test_ingest_jobs),
+        ("Summary Cache", test_summary_cache),
+        ("LLM Gateway Stats", test_llm_stats),
+        ("LLM Gateway Cache", test_llm_gateway_cache),
+        ("Checkpoints", test_checkpoints),
+        ("Missions", test_missions),
+        ("Artifact Search", test_artifact_search),
+        ("Chat Memory", test_chat_memory),
+        ("Save Results", test_save_results),
+        ("Artifact Writer", test_artifact_writer),
+        ("Quantized Index Recall", test_quantized_recall),
+        ("ANN Evaluation", test_ann_evaluation),
+        ("Paper Table Migration", test_paper_table_migration),
+        ("Resumable Conversion", test_resumable_conversion),
+        ("Handoff Groups", test_handoff_groups),
+        ("Group Search Fallback", test_group_search_fallback),
+        ("Watcher Debounce", test_watcher_debounce),
+        ("Watcher Retry", test_watcher_retry),
+        ("Snapshot Round Trip", test_snapshot_round_trip),
+        ("Shard Merge", test_shard_merge),
+        ("Synthetic Corpus", test_synthetic_corpus),
     ]
     
     passed = 0
+    skipped = 0
     total = len(tests)
     
     for test_name, test_func in tests:
         print(f"\n{'='*20} {test_name} {'='*20}")
-        if test_func():
+        outcome = test_func()
+        if outcome is None:
+            skipped += 1
+            print(f"⏭️  {test_name} skipped")
+        elif outcome:
             passed += 1
         else:
             print(f"❌ {test_name} failed")
     
     print(f"\n{'='*50}")
-    print(f"📊 Test Results: {passed}/{total} tests passed")
+    print(f"📊 Test Results: {passed}/{total} tests passed, {skipped} skipped")
     
     if passed == total:
         print("🎉 All tests passed! Backend is working correctly.")
+    elif passed + skipped == total:
+        print("⚠️  No test failed, but some were skipped.")
     else:
         print("⚠️  Some tests failed. Check the server logs for details.")
     
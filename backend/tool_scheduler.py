@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Fair, priority-aware scheduler for tool calls
+Calls are queued per (priority class, mission, agent) flow and dispatched with
+start-time fair queuing under a bounded number of concurrent backend calls
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+PRIORITY_CLASSES = ("interactive", "batch")
+DEFAULT_PRIORITY = "interactive"
+DEFAULT_CLASS_WEIGHTS = {"interactive": 8.0, "batch": 1.0}
+WAIT_SAMPLE_SIZE = 1000
+
+
+def _percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _Ticket:
+    """A queued tool call waiting for an execution slot"""
+
+    __slots__ = ("start_tag", "seq", "flow", "priority", "enqueued_at", "granted", "cancelled")
+
+    def __init__(self, start_tag: float, seq: int, flow: Tuple[str, str, str], priority: str):
+        self.start_tag = start_tag
+        self.seq = seq
+        self.flow = flow
+        self.priority = priority
+        self.enqueued_at = time.perf_counter()
+        self.granted = asyncio.get_running_loop().create_future()
+        self.cancelled = False
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.start_tag, self.seq) < (other.start_tag, other.seq)
+
+
+class FairToolScheduler:
+    """Weighted fair scheduler with priority classes and bounded concurrency"""
+
+    def __init__(self, max_concurrency: int = 4, class_weights: Optional[Dict[str, float]] = None,
+                 reserved_interactive_slots: int = 1):
+        """
+        Args:
+            max_concurrency: Maximum concurrent calls toward the search backend
+            class_weights: Share of service per priority class
+            reserved_interactive_slots: Slots batch calls may never occupy
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.class_weights = dict(class_weights or DEFAULT_CLASS_WEIGHTS)
+        self.reserved_interactive_slots = min(reserved_interactive_slots, self.max_concurrency - 1)
+
+        self._queue = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[Tuple[str, str, str], float] = {}
+        self._flow_depth: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._active = {priority: 0 for priority in PRIORITY_CLASSES}
+
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLE_SIZE) for priority in PRIORITY_CLASSES}
+        self._dispatched = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._max_wait = {priority: 0.0 for priority in PRIORITY_CLASSES}
+
+    @staticmethod
+    def normalize_priority(priority: Optional[str]) -> str:
+        """Map a requested priority onto a known class"""
+        priority = (priority or DEFAULT_PRIORITY).lower()
+        return priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+    def _flow_weight(self, flow: Tuple[str, str, str]) -> float:
+        # Agents of the same mission split the mission's share of their class
+        priority, mission_id, _ = flow
+        mission_flows = sum(
+            1 for (p, m, _), depth in self._flow_depth.items()
+            if p == priority and m == mission_id and depth > 0
+        )
+        return self.class_weights.get(priority, 1.0) / max(1, mission_flows)
+
+    def _can_start(self, priority: str) -> bool:
+        active = sum(self._active.values())
+        if active >= self.max_concurrency:
+            return False
+        if priority == "batch":
+            return active < self.max_concurrency - self.reserved_interactive_slots
+        return True
+
+    def _dispatch(self):
+        """Grant slots to the queued calls with the smallest start tags"""
+        deferred = []
+        while self._queue:
+            ticket = heapq.heappop(self._queue)
+            # A cancelled caller's future is cancelled before its own cleanup marks the ticket
+            if ticket.cancelled or ticket.granted.cancelled():
+                continue
+            if not self._can_start(ticket.priority):
+                deferred.append(ticket)
+                if sum(self._active.values()) >= self.max_concurrency:
+                    break
+                continue
+
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            self._flow_depth[ticket.flow] -= 1
+            if self._flow_depth[ticket.flow] <= 0:
+                del self._flow_depth[ticket.flow]
+            self._active[ticket.priority] += 1
+
+            wait = time.perf_counter() - ticket.enqueued_at
+            self._waits[ticket.priority].append(wait)
+            self._max_wait[ticket.priority] = max(self._max_wait[ticket.priority], wait)
+            self._dispatched[ticket.priority] += 1
+            ticket.granted.set_result(None)
+
+        for ticket in deferred:
+            heapq.heappush(self._queue, ticket)
+
+    def _release(self, priority: str):
+        self._active[priority] -= 1
+        self._dispatch()
+
+    async def run(self, fn: Callable[[], Awaitable[Any]], mission_id: str = "", agent_name: str = "",
+                  priority: Optional[str] = None) -> Any:
+        """
+        Run a tool call once the scheduler grants it a slot
+
+        Args:
+            fn: Zero-argument coroutine function performing the call
+            mission_id: Mission the call belongs to
+            agent_name: Agent issuing the call
+            priority: 'interactive' or 'batch'
+
+        Returns:
+            Result of fn
+        """
+        priority = self.normalize_priority(priority)
+        flow = (priority, mission_id or "", agent_name or "")
+
+        self._flow_depth[flow] += 1
+        start_tag = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+        self._flow_finish[flow] = start_tag + 1.0 / self._flow_weight(flow)
+        ticket = _Ticket(start_tag, next(self._seq), flow, priority)
+        heapq.heappush(self._queue, ticket)
+        self._dispatch()
+
+        try:
+            await ticket.granted
+        except asyncio.CancelledError:
+            if ticket.granted.done() and not ticket.granted.cancelled():
+                self._release(priority)
+            else:
+                ticket.cancelled = True
+                self._flow_depth[flow] -= 1
+                if self._flow_depth[flow] <= 0:
+                    del self._flow_depth[flow]
+            raise
+
+        try:
+            return await fn()
+        finally:
+            self._release(priority)
+            self._forget_idle_flow(flow)
+
+    def _forget_idle_flow(self, flow: Tuple[str, str, str]):
+        # Idle flows restart at the current virtual time, so their old tags can go
+        if flow not in self._flow_depth and self._flow_finish.get(flow, 0.0) <= self._virtual_time:
+            self._flow_finish.pop(flow, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and wait-time metrics"""
+        classes = {}
+        for priority in PRIORITY_CLASSES:
+            waits = self._waits[priority]
+            classes[priority] = {
+                "queued": sum(depth for (p, _, _), depth in self._flow_depth.items() if p == priority),
+                "active": self._active[priority],
+                "dispatched": self._dispatched[priority],
+                "weight": self.class_weights.get(priority, 1.0),
+                "wait_ms_mean": round(1000 * sum(waits) / len(waits), 3) if waits else 0.0,
+                "wait_ms_p95": round(1000 * _percentile(waits, 0.95), 3),
+                "wait_ms_max": round(1000 * self._max_wait[priority], 3)
+            }
+
+        flows = [
+            {"priority": p, "mission_id": m, "agent_name": a, "queued": depth}
+            for (p, m, a), depth in sorted(self._flow_depth.items())
+        ]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "reserved_interactive_slots": self.reserved_interactive_slots,
+            "active": sum(self._active.values()),
+            "queued": sum(self._flow_depth.values()),
+            "classes": classes,
+            "queues": flows
+        }
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Compact wire format for the search APIs
+Structured responses are projected to the requested fields, serialized with
+orjson when it is installed, compressed with zstd or gzip when the client
+accepts it and the body is large enough, and can carry an ETag so unchanged
+responses are answered with 304 Not Modified.
+"""
+
+import gzip
+import json
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Clients may ask for structured search results with this Accept type instead of metadata.responseFormat
+STRUCTURED_MEDIA_TYPE = "application/vnd.research-search+json"
+# Smaller bodies are sent uncompressed; compression would not pay for its CPU time
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def parse_fields(fields: Union[str, Iterable[str], None]) -> Optional[List[str]]:
+    """Projection from a comma-separated string or a list; None means all fields"""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return [field.strip() for field in fields if field and field.strip()] or None
+
+
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Keep only the projected fields of a record
+
+    Dotted fields select nested keys, e.g. paper_metadata.title keeps only the
+    title of the paper metadata. Missing fields are left out.
+    """
+    if fields is None:
+        return record
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        source, target = record, projected
+        *parents, leaf = field.split(".")
+        for parent in parents:
+            source = source.get(parent) if isinstance(source, dict) else None
+            if source is None:
+                break
+            target = target.setdefault(parent, {})
+        else:
+            if isinstance(source, dict) and leaf in source:
+                target[leaf] = source[leaf]
+    return projected
+
+
+def wants_structured(request: Request, metadata: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether a tool call asked for structured results, through metadata or the Accept header"""
+    if (metadata or {}).get("responseFormat") == "structured":
+        return True
+    return STRUCTURED_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported content coding the client accepts: zstd, then gzip"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    for coding in ("zstd", "gzip"):
+        if coding == "zstd" and zstandard is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def etag_of(content: Any) -> str:
+    """Weak ETag of the serialized content; weak because compressed and plain bodies share it"""
+    body = content if isinstance(content, bytes) else dumps(content)
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any((tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == opaque
+               for tag in if_none_match.split(","))
+
+
+def encoded_response(request: Request, content: Any, status_code: int = 200, etag: Optional[str] = None,
+                     min_size: int = COMPRESSION_MIN_BYTES) -> Response:
+    """
+    JSON response with fast serialization, negotiated compression and an optional ETag
+
+    Args:
+        request: Incoming request (Accept-Encoding and If-None-Match are read from it)
+        content: JSON-serializable content
+        status_code: Status of a full response
+        etag: ETag of the content; a matching If-None-Match is answered with 304
+        min_size: Bodies below this many bytes are not compressed
+
+    Returns:
+        The response
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None:
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+    body = dumps(content)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", "")) if len(body) >= min_size else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark over synthetic collections
+For each scale, generates a synthetic corpus, ingests it through the real
+loader scripts and measures ingest time, peak memory, on-disk index size and
+query latency. Every stage runs in its own process so peak memory is per stage.
+Usage: python benchmark_scale.py [--scales 10000,100000] [--queries 100] [--quantization int8]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from generate_synthetic_corpus import TOPIC_WORDS, generate_corpus
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, "backend", "data", "benchmarks")
+
+
+def _directory_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def run_stage(args: List[str], log_path: str) -> Dict[str, Any]:
+    """
+    Run one stage in a child process and measure it
+
+    Returns:
+        Wall time, peak RSS of the child and its exit code
+    """
+    started = time.perf_counter()
+    with open(log_path, "a", encoding="utf-8") as log:
+        process = subprocess.Popen([sys.executable] + args, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": round(peak_rss / 1e6, 1),
+        "exit_code": os.waitstatus_to_exitcode(status)
+    }
+
+
+def measure_queries(db_path: str, collection_name: str, num_queries: int, n_results: int = 3) -> Dict[str, Any]:
+    """Time searches through ChromaDBSearchTool (runs inside the query stage process)"""
+    import numpy as np
+    from chromadb_search_tool import ChromaDBSearchTool
+
+    search_tool = ChromaDBSearchTool(db_path=db_path, collection_name=collection_name)
+    rng = np.random.default_rng(0)
+    queries = [" ".join(rng.choice(TOPIC_WORDS, size=3)) for _ in range(num_queries)]
+
+    search_tool.search(queries[0], n_results)  # warm up the embedding model
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        result = search_tool.search(query, n_results)
+        latencies.append(1000 * (time.perf_counter() - started))
+        if not result["success"]:
+            raise RuntimeError(result.get("error"))
+
+    latencies.sort()
+    return {
+        "queries": num_queries,
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3),
+        "max_ms": round(latencies[-1], 3),
+        "chunks": search_tool.collection.count()
+    }
+
+
+def benchmark_scale(chunks: int, num_queries: int, quantization: Optional[str], seed: int,
+                    output_dir: str) -> Dict[str, Any]:
+    """Generate, ingest and query one synthetic collection"""
+    collection = f"Synthetic_{chunks}"
+    chunk_collection = f"synthetic_{chunks}_papers"
+    db_path = os.path.join(output_dir, f"chromadb_{chunks}")
+    log_path = os.path.join(output_dir, f"benchmark_{chunks}.log")
+    shutil.rmtree(db_path, ignore_errors=True)
+
+    print(f"\n📏 Scale: ~{chunks} chunks")
+    started = time.perf_counter()
+    corpus = generate_corpus(collection, chunks, seed)
+    generate_seconds = round(time.perf_counter() - started, 3)
+    print(f"   🧪 Generated {corpus['papers']} papers in {generate_seconds}s")
+
+    loader_args = ["load_to_chromadb.py", "--markdown-dir", corpus["markdown_dir"],
+                   "--collection", chunk_collection, "--db-path", db_path]
+    if quantization:
+        loader_args += ["--quantization", quantization]
+    ingest = run_stage(loader_args, log_path)
+    print(f"   📤 Chunks ingested in {ingest['seconds']}s (peak {ingest['peak_rss_mb']} MB)")
+
+    metadata = run_stage(
+        [os.path.join("backend", "fetcher", "arxiv_to_chromadb.py"), collection, "--db-path", db_path], log_path
+    )
+    print(f"   📋 Metadata ingested in {metadata['seconds']}s (peak {metadata['peak_rss_mb']} MB)")
+
+    query_output = os.path.join(output_dir, f"queries_{chunks}.json")
+    query = run_stage(
+        [os.path.abspath(__file__), "--query-stage", "--db-path", db_path, "--collection", chunk_collection,
+         "--queries", str(num_queries), "--output", query_output],
+        log_path
+    )
+    latencies = {}
+    if os.path.exists(query_output):
+        with open(query_output, "r", encoding="utf-8") as f:
+            latencies = json.load(f)
+    print(f"   🔍 Query p50 {latencies.get('p50_ms')} ms, p95 {latencies.get('p95_ms')} ms "
+          f"(peak {query['peak_rss_mb']} MB)")
+
+    return {
+        "target_chunks": chunks,
+        "papers": corpus["papers"],
+        "chunks": latencies.get("chunks"),
+        "quantization": quantization,
+        "generate_seconds": generate_seconds,
+        "ingest": ingest,
+        "metadata_ingest": metadata,
+        "query_stage": query,
+        "query_latency": latencies,
+        "index_bytes": _directory_bytes(db_path),
+        "log": log_path
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark ingest and search at increasing corpus scales')
+    parser.add_argument('--scales', default="10000,30000,100000", help='Comma-separated chunk counts')
+    parser.add_argument('--queries', type=int, default=100, help='Queries per scale')
+    parser.add_argument('--quantization', default=None, help='Quantized index mode passed to the loader')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR, help='Benchmark databases, logs and results')
+    parser.add_argument('--query-stage', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--db-path', help=argparse.SUPPRESS)
+    parser.add_argument('--collection', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.query_stage:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(measure_queries(args.db_path, args.collection, args.queries), f)
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print("🚀 Scale Benchmark")
+    print("=" * 60)
+
+    results = []
+    for chunks in [int(scale) for scale in args.scales.split(",") if scale.strip()]:
+        results.append(benchmark_scale(chunks, args.queries, args.quantization, args.seed, args.output_dir))
+
+    results_path = os.path.join(args.output_dir, f"scale_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print(f"{'chunks':>10} {'ingest s':>10} {'peak MB':>9} {'index MB':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for result in results:
+        print(f"{result['chunks'] or result['target_chunks']:>10} {result['ingest']['seconds']:>10} "
+              f"{result['ingest']['peak_rss_mb']:>9} {result['index_bytes'] / 1e6:>9.1f} "
+              f"{result['query_latency'].get('p50_ms', '-'):>8} {result['query_latency'].get('p95_ms', '-'):>8}")
+    print(f"\n💾 Results saved to: {results_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,19 @@ This can be used as a local search tool in your FastAPI backend
 
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils import embedding_functions
 from typing import List, Dict, Any, Optional
 import os
+import time
+
+import numpy as np
+
+from collection_config import (
+    DEFAULT_MIN_SIMILARITY, distance_metric_of, index_settings_of, min_similarity_of, similarity_from_distance
+)
+from document_groups import DocumentGroupIndex, GroupMembership
+from paper_store import PaperStore
+from quantized_index import QuantizedVectorIndex, quantized_index_dir
 
 class ChromaDBSearchTool:
     """ChromaDB search tool for research papers with metadata lookup"""
@@ -18,6 +29,15 @@ class ChromaDBSearchTool:
         self.client = None
         self.collection = None
         self.metadata_collection = None
+        self.embedding_function = None
+        self.quantized_index = None
+        self.metric = "l2"
+        self.min_similarity = DEFAULT_MIN_SIMILARITY
+        self.papers: Dict[str, Dict[str, Any]] = {}
+        self.groups: Optional[GroupMembership] = None
+        # Row masks (or, without a sidecar index, paper IDs) per group set, plus the paper ordinal
+        # of every sidecar row under "rows"
+        self._group_masks: Dict[Any, Any] = {}
         self._initialize()
     
     def _initialize(self):
@@ -27,8 +47,17 @@ class ChromaDBSearchTool:
                 path=self.db_path,
                 settings=Settings(anonymized_telemetry=False)
             )
-            self.collection = self.client.get_collection(name=self.collection_name)
-            print(f"✅ ChromaDB initialized: {self.collection_name}")
+            self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+            self.collection = self.client.get_collection(
+                name=self.collection_name,
+                embedding_function=self.embedding_function
+            )
+            self.metric = distance_metric_of(self.collection)
+            print(f"✅ ChromaDB initialized: {self.collection_name} ({self.metric} distance)")
+            self.min_similarity = min_similarity_of(self.db_path, self.collection_name)
+            self._load_quantized_index()
+            self._load_paper_table()
+            self._load_groups()
             
             # Try to initialize metadata collection
             try:
@@ -45,6 +74,113 @@ class ChromaDBSearchTool:
             self.collection = None
             self.metadata_collection = None
     
+    def _load_quantized_index(self):
+        """Load the quantized sidecar index if one was built at ingest time"""
+        try:
+            index = QuantizedVectorIndex.load_if_exists(quantized_index_dir(self.db_path, self.collection_name))
+            if index and index.count != self.collection.count():
+                print(f"⚠️  Quantized index is stale ({index.count} vs {self.collection.count()} chunks), using ChromaDB search")
+                index = None
+            self.quantized_index = index
+            if index:
+                print(f"✅ Quantized index loaded: {index.quantization} ({index.count} vectors)")
+        except Exception as e:
+            print(f"⚠️  Quantized index not available: {str(e)}")
+            self.quantized_index = None
+    
+    def _load_paper_table(self):
+        """Load paper-level fields that compact chunk rows do not repeat"""
+        try:
+            self.papers = PaperStore(self.db_path).get_papers(self.collection_name)
+        except Exception as e:
+            print(f"⚠️  Paper table not available: {str(e)}")
+    
+    def _load_groups(self):
+        """Load the document-group bitmaps maintained at ingest"""
+        try:
+            self.groups = DocumentGroupIndex(self.db_path).load(self.collection_name)
+        except Exception as e:
+            print(f"⚠️  Document groups not available: {str(e)}")
+            self.groups = None
+        # Row masks depend on both the bitmaps and the sidecar index rows
+        self._group_masks = {}
+
+    def _group_row_mask(self, quantized_index: QuantizedVectorIndex, group_ids: List[str]):
+        """Mask over the sidecar index rows of the papers in any of the groups"""
+        key = frozenset(group_ids)
+        cached = self._group_masks.get(key)
+        if cached is None or cached[0] is not quantized_index:
+            row_ordinals = self._group_masks.get("rows")
+            if row_ordinals is None or row_ordinals[0] is not quantized_index:
+                row_ordinals = self._group_masks["rows"] = (quantized_index,
+                                                            self.groups.row_ordinals(quantized_index.ids))
+            # The appended False is what rows of papers without an ordinal (-1) pick up
+            paper_mask = np.append(self.groups.paper_mask(group_ids), False)
+            cached = self._group_masks[key] = (quantized_index, paper_mask[row_ordinals[1]])
+        return cached[1]
+
+    def _group_filter(self, group_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """ChromaDB where filter on the papers in any of the groups (None when the groups are empty)"""
+        key = ("papers", frozenset(group_ids))
+        paper_ids = self._group_masks.get(key)
+        if paper_ids is None:
+            paper_ids = self._group_masks[key] = self.groups.paper_ids(group_ids)
+        if not paper_ids:
+            return None
+        return {"paper_id": paper_ids[0]} if len(paper_ids) == 1 else {"paper_id": {"$in": paper_ids}}
+
+    def refresh(self):
+        """
+        Reload the paper table and quantized index after new papers were ingested
+        
+        New state is loaded first and then swapped in, so searches that are
+        already running finish against the previous state.
+        """
+        if not self.collection:
+            return
+        self.min_similarity = min_similarity_of(self.db_path, self.collection_name)
+        self._load_quantized_index()
+        self._load_paper_table()
+        self._load_groups()
+        if self.metadata_collection is None:
+            try:
+                self.metadata_collection = self.client.get_collection(name="LLM_Reasoning_Agents_arxiv_metadata")
+            except Exception:
+                pass
+    
+    def _query_quantized(self, index: QuantizedVectorIndex, query_embedding: List[float], n_results: int,
+                         row_mask=None, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Query the quantized index and fetch documents in ChromaDB query format"""
+        started = time.perf_counter()
+        hits = index.search(query_embedding, n_results, row_mask=row_mask)
+        if timings is not None:
+            timings["vector_search"] = time.perf_counter() - started
+        if not hits:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+        ids = [chunk_id for chunk_id, _ in hits]
+        started = time.perf_counter()
+        fetched = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        if timings is not None:
+            timings["fetch_documents"] = time.perf_counter() - started
+        by_id = {
+            chunk_id: (fetched['documents'][i], fetched['metadatas'][i])
+            for i, chunk_id in enumerate(fetched['ids'])
+        }
+        
+        documents, metadatas, distances = [], [], []
+        for chunk_id, distance in hits:
+            if chunk_id in by_id:
+                documents.append(by_id[chunk_id][0])
+                metadatas.append(by_id[chunk_id][1])
+                distances.append(distance)
+        
+        return {
+            "ids": [[chunk_id for chunk_id, _ in hits if chunk_id in by_id]],
+            "documents": [documents],
+            "metadatas": [metadatas],
+            "distances": [distances]
+        }
+    
     def _lookup_paper_metadata(self, paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         """
         Lookup paper metadata from the arXiv metadata collection
@@ -95,16 +231,19 @@ class ChromaDBSearchTool:
             
         return metadata_dict
 
-    def search(self, query: str, n_results: int = 5) -> Dict[str, Any]:
+    def search(self, query: str, n_results: int = 5, query_embedding: Optional[List[float]] = None,
+               groups: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Search the collection for relevant document chunks and enrich with metadata
         
         Args:
             query: Search query string
             n_results: Number of results to return
+            query_embedding: Precomputed embedding of the query (embedded here when None)
+            groups: Only search papers of these document groups (all papers when None)
             
         Returns:
-            Dictionary with search results and enriched metadata
+            Dictionary with search results, enriched metadata and stage timings in seconds
         """
         if not self.collection:
             return {
@@ -114,11 +253,44 @@ class ChromaDBSearchTool:
             }
         
         try:
-            # Perform search
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
+            # Perform search against a consistent snapshot of the swappable state
+            quantized_index = self.quantized_index
+            papers = self.papers
+            # Distances are in the metric of whichever index answered the query
+            metric = quantized_index.metric if quantized_index else self.metric
+            timings: Dict[str, float] = {}
+            row_mask = None
+            where = None
+            if groups is not None:
+                if self.groups is None:
+                    return {
+                        "success": False,
+                        "error": "Group-restricted search needs the document group index, maintained at ingest",
+                        "results": []
+                    }
+                if quantized_index:
+                    # Group bitmaps select the rows to score, so top-k is exact within the groups
+                    row_mask = self._group_row_mask(quantized_index, groups)
+                else:
+                    # Without a sidecar index ChromaDB filters on the groups' papers
+                    where = self._group_filter(groups)
+                    if where is None:
+                        return {"success": True, "query": query, "results": [], "total_found": 0,
+                                "metric": metric, "min_similarity": self.min_similarity, "timings": timings}
+            if query_embedding is None:
+                started = time.perf_counter()
+                query_embedding = self.embedding_function([query])[0]
+                timings["embed_query"] = time.perf_counter() - started
+            if quantized_index:
+                results = self._query_quantized(quantized_index, query_embedding, n_results, row_mask, timings)
+            else:
+                started = time.perf_counter()
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_results,
+                    where=where
+                )
+                timings["vector_search"] = time.perf_counter() - started
             
             # Format results
             formatted_results = []
@@ -126,26 +298,31 @@ class ChromaDBSearchTool:
             
             if results['documents'] and results['documents'][0]:
                 for i, doc in enumerate(results['documents'][0]):
-                    metadata = results['metadatas'][0][i] if results['metadatas'] and results['metadatas'][0] else {}
+                    chunk_metadata = results['metadatas'][0][i] if results['metadatas'] and results['metadatas'][0] else {}
                     distance = results['distances'][0][i] if results['distances'] and results['distances'][0] else 0
                     
-                    paper_id = metadata.get('paper_id', 'unknown')
+                    # Join the compact chunk record with its paper row
+                    paper_id = chunk_metadata.get('paper_id', 'unknown')
+                    metadata = {**papers.get(paper_id, {}), **chunk_metadata}
                     if paper_id != 'unknown':
                         paper_ids.append(paper_id)
                     
                     formatted_results.append({
                         "content": doc,
                         "metadata": metadata,
-                        "similarity_score": 1 - distance,  # Convert distance to similarity
+                        "similarity_score": similarity_from_distance(distance, metric),
+                        "distance": distance,
                         "paper_id": paper_id,
-                        "filename": metadata.get('filename', 'unknown'),
+                        "filename": metadata.get('filename', f"{paper_id}.md"),
                         "chunk_id": metadata.get('chunk_id', 'unknown'),
-                        "headers": metadata.get('headers', ''),
-                        "chunk_size": metadata.get('chunk_size', 0)
+                        "headers": metadata.get('section', metadata.get('headers', '')),
+                        "chunk_size": metadata.get('chunk_size', len(doc))
                     })
             
             # Lookup metadata for found papers
+            started = time.perf_counter()
             paper_metadata = self._lookup_paper_metadata(paper_ids)
+            timings["metadata_lookup"] = time.perf_counter() - started
             
             # Enrich results with metadata
             for result in formatted_results:
@@ -167,7 +344,10 @@ class ChromaDBSearchTool:
                 "success": True,
                 "query": query,
                 "results": formatted_results,
-                "total_found": len(formatted_results)
+                "total_found": len(formatted_results),
+                "metric": metric,
+                "min_similarity": self.min_similarity,
+                "timings": timings
             }
             
         except Exception as e:
@@ -184,11 +364,19 @@ class ChromaDBSearchTool:
         
         try:
             count = self.collection.count()
-            return {
+            stats = {
                 "total_documents": count,
                 "collection_name": self.collection_name,
-                "db_path": self.db_path
+                "db_path": self.db_path,
+                "index_settings": index_settings_of(self.collection),
+                "metric": self.metric,
+                "min_similarity": self.min_similarity
             }
+            if self.quantized_index:
+                stats["quantized_index"] = self.quantized_index.memory_report()
+            if self.groups is not None:
+                stats["document_groups"] = self.groups.group_sizes()
+            return stats
         except Exception as e:
             return {"error": str(e)}
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Per-collection index settings for ChromaDB
+Settings are stored next to the database and applied when a collection is created,
+together with the collection's distance metric and calibrated similarity cutoff
+"""
+
+import os
+import json
+from typing import Dict, Any, Optional
+
+INDEX_SETTINGS_FILE = "index_settings.json"
+
+# HNSW parameters understood by ChromaDB collection metadata
+HNSW_KEYS = ("hnsw:M", "hnsw:construction_ef", "hnsw:search_ef")
+
+# Distance metric of a collection; ChromaDB uses l2 when a collection is created without one
+SPACE_KEY = "hnsw:space"
+DISTANCE_METRICS = ("cosine", "ip", "l2")
+DEFAULT_DISTANCE_METRIC = "cosine"
+
+# Results below this cosine similarity are not passed to agents; calibrated per collection
+MIN_SIMILARITY_KEY = "search:min_similarity"
+# Same cutoff as the former "1 - distance > 0.1" on l2 distances of unit-norm embeddings
+DEFAULT_MIN_SIMILARITY = 0.55
+
+
+def _settings_path(db_path: str) -> str:
+    return os.path.join(db_path, INDEX_SETTINGS_FILE)
+
+
+def load_all_index_settings(db_path: str) -> Dict[str, Dict[str, Any]]:
+    """Load the settings of every configured collection"""
+    path = _settings_path(db_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index_settings(db_path: str, collection_name: str) -> Dict[str, Any]:
+    """
+    Load the index settings chosen for a collection
+
+    Args:
+        db_path: ChromaDB persistence directory
+        collection_name: Name of the collection
+
+    Returns:
+        Dictionary of collection metadata keys (empty if nothing is configured)
+    """
+    return dict(load_all_index_settings(db_path).get(collection_name, {}))
+
+
+def save_index_settings(db_path: str, collection_name: str, settings: Dict[str, Any]) -> str:
+    """
+    Save index settings for a collection, merging with existing keys
+
+    Args:
+        db_path: ChromaDB persistence directory
+        collection_name: Name of the collection
+        settings: Collection metadata keys to store
+
+    Returns:
+        Path of the settings file
+    """
+    os.makedirs(db_path, exist_ok=True)
+    all_settings = load_all_index_settings(db_path)
+    all_settings.setdefault(collection_name, {}).update(settings)
+
+    path = _settings_path(db_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(all_settings, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def collection_creation_metadata(db_path: str, collection_name: str,
+                                 metadata: Optional[Dict[str, Any]] = None,
+                                 metric: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the metadata for a new collection including its configured index settings
+
+    Args:
+        db_path: ChromaDB persistence directory
+        collection_name: Name of the collection
+        metadata: Descriptive metadata for the collection
+        metric: Distance metric ('cosine', 'ip' or 'l2'); None uses the configured or default metric
+
+    Returns:
+        Metadata to pass to create_collection
+    """
+    merged = dict(metadata or {})
+    merged.update({key: value for key, value in load_index_settings(db_path, collection_name).items()
+                   if key.startswith("hnsw:")})
+    if metric is not None:
+        if metric not in DISTANCE_METRICS:
+            raise ValueError(f"Unsupported distance metric: {metric}")
+        merged[SPACE_KEY] = metric
+    merged.setdefault(SPACE_KEY, DEFAULT_DISTANCE_METRIC)
+    return merged
+
+
+def index_settings_of(collection) -> Dict[str, Any]:
+    """Index settings a collection was created with"""
+    metadata = collection.metadata or {}
+    return {key: value for key, value in metadata.items() if key.startswith("hnsw:")}
+
+
+def distance_metric_of(collection) -> str:
+    """Distance metric a collection was created with"""
+    return (collection.metadata or {}).get(SPACE_KEY, "l2")
+
+
+def similarity_from_distance(distance: float, metric: str) -> float:
+    """
+    Cosine similarity of a ChromaDB distance, for unit-norm embeddings
+
+    ChromaDB returns 1 - cos for 'cosine', 1 - dot for 'ip' and the squared
+    Euclidean distance (2 - 2 cos for unit vectors) for 'l2'
+    """
+    if metric == "l2":
+        return 1.0 - distance / 2.0
+    return 1.0 - distance
+
+
+def min_similarity_of(db_path: str, collection_name: str) -> float:
+    """Calibrated similarity cutoff of a collection, or the default when it was never calibrated"""
+    return float(load_index_settings(db_path, collection_name).get(MIN_SIMILARITY_KEY, DEFAULT_MIN_SIMILARITY))
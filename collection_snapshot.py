@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Export and import precomputed collection snapshots
+A snapshot holds chunk texts, compact metadata, the paper table, document-group
+bitmaps, index settings and the stored embeddings of a chunk collection (and
+optionally its arXiv metadata collection), so a new node can be stood up without
+re-embedding anything
+Usage: python collection_snapshot.py export OUTPUT_DIR [--collection NAME] [--metadata-collection NAME]
+       python collection_snapshot.py import SNAPSHOT_DIR [--db-path PATH]
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import chromadb
+from chromadb.config import Settings
+
+from collection_config import (
+    INDEX_SETTINGS_FILE, distance_metric_of, load_all_index_settings, load_index_settings, save_index_settings
+)
+from document_groups import GROUP_STORE_FILE, DocumentGroupIndex
+from paper_store import PaperStore
+from quantized_index import QuantizedVectorIndex, quantized_index_dir
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "chromadb")
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+BATCH_SIZE = 500
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _export_collection(collection, target_dir: str) -> Dict[str, Any]:
+    """
+    Write one collection as memory-mappable arrays
+
+    Layout: embeddings.npy (float32, N x dim), ids.json, documents.bin (UTF-8
+    texts back to back) with document_offsets.npy (N + 1 byte offsets), and
+    metadatas.jsonl (one record per line, in id order).
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    total = collection.count()
+    ids: List[str] = []
+    offsets = [0]
+    embeddings = None
+    dim = None
+
+    with open(os.path.join(target_dir, "documents.bin"), "wb") as documents, \
+         open(os.path.join(target_dir, "metadatas.jsonl"), "w", encoding="utf-8") as metadatas:
+        for offset in range(0, total, BATCH_SIZE):
+            batch = collection.get(limit=BATCH_SIZE, offset=offset,
+                                   include=["embeddings", "documents", "metadatas"])
+            vectors = np.asarray(batch["embeddings"], dtype=np.float32)
+            if embeddings is None:
+                dim = vectors.shape[1]
+                embeddings = np.lib.format.open_memmap(
+                    os.path.join(target_dir, "embeddings.npy"), mode="w+", dtype=np.float32, shape=(total, dim)
+                )
+            embeddings[len(ids):len(ids) + len(vectors)] = vectors
+
+            for document, metadata in zip(batch["documents"], batch["metadatas"]):
+                encoded = (document or "").encode("utf-8")
+                documents.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+                metadatas.write(json.dumps(metadata or {}) + "\n")
+            ids.extend(batch["ids"])
+
+    if embeddings is not None:
+        embeddings.flush()
+        del embeddings
+    else:
+        np.save(os.path.join(target_dir, "embeddings.npy"), np.zeros((0, 0), dtype=np.float32))
+
+    np.save(os.path.join(target_dir, "document_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    with open(os.path.join(target_dir, "ids.json"), "w", encoding="utf-8") as f:
+        json.dump(ids, f)
+
+    return {"name": collection.name, "metadata": collection.metadata, "count": len(ids), "dim": dim}
+
+
+def export_snapshot(client, db_path: str, output_dir: str, collection_name: str,
+                    metadata_collection_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Package a chunk collection into a versioned, checksummed snapshot directory
+
+    Args:
+        client: ChromaDB client
+        db_path: ChromaDB persistence directory (holds the paper table)
+        output_dir: Snapshot directory to create (must not exist)
+        collection_name: Chunk collection to export
+        metadata_collection_name: arXiv metadata collection to include
+
+    Returns:
+        Snapshot manifest
+    """
+    if os.path.exists(output_dir):
+        raise FileExistsError(f"Snapshot directory already exists: {output_dir}")
+    tmp_dir = f"{output_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    names = [collection_name] + ([metadata_collection_name] if metadata_collection_name else [])
+    collections = []
+    for name in names:
+        print(f"📦 Exporting {name}...")
+        collections.append(_export_collection(client.get_collection(name=name), os.path.join(tmp_dir, "collections", name)))
+
+    papers = PaperStore(db_path).get_papers(collection_name)
+    with open(os.path.join(tmp_dir, "papers.json"), "w", encoding="utf-8") as f:
+        json.dump(papers, f)
+
+    groups_path = os.path.join(db_path, GROUP_STORE_FILE)
+    if os.path.exists(groups_path):
+        DocumentGroupIndex(tmp_dir).copy_collection(collection_name, groups_path)
+
+    settings = {name: load_index_settings(db_path, name) for name in names}
+    with open(os.path.join(tmp_dir, INDEX_SETTINGS_FILE), "w", encoding="utf-8") as f:
+        json.dump({name: values for name, values in settings.items() if values}, f, indent=2)
+
+    index = QuantizedVectorIndex.load_if_exists(quantized_index_dir(db_path, collection_name))
+
+    checksums = {}
+    for root, _, files in os.walk(tmp_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            checksums[os.path.relpath(path, tmp_dir)] = _sha256(path)
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "snapshot_id": f"{collection_name}-{datetime.now().strftime('%Y%m%dT%H%M%S')}",
+        "created_at": datetime.now().isoformat(),
+        "chunk_collection": collection_name,
+        "collections": collections,
+        "papers": len(papers),
+        "quantization": index.quantization if index else None,
+        "checksums": checksums
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(tmp_dir, output_dir)
+    return manifest
+
+
+def read_manifest(snapshot_dir: str, verify: bool = True) -> Dict[str, Any]:
+    """
+    Read a snapshot manifest, optionally verifying every file checksum
+
+    Raises:
+        ValueError: If the format is unsupported or a checksum does not match
+    """
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+    if verify:
+        for relative_path, expected in manifest["checksums"].items():
+            if _sha256(os.path.join(snapshot_dir, relative_path)) != expected:
+                raise ValueError(f"Checksum mismatch for {relative_path}")
+    return manifest
+
+
+def _ids_digest(ids: List[str]) -> str:
+    """Order-independent digest of a collection's IDs"""
+    return hashlib.sha256("\n".join(sorted(ids)).encode("utf-8")).hexdigest()
+
+
+def _staging_name(name: str) -> str:
+    return f"{name}_snapshot_tmp"
+
+
+def _import_collection(client, source_dir: str, info: Dict[str, Any], snapshot_id: str):
+    """
+    Recreate one collection from its snapshot arrays without re-embedding
+
+    The copy is written under a staging name and checked against the snapshot
+    (record count and ID digest); the live collection is left untouched.
+
+    Raises:
+        ValueError: If the staged copy does not match the snapshot
+    """
+    staging_name = _staging_name(info["name"])
+    try:
+        client.delete_collection(staging_name)
+    except Exception:
+        pass
+    metadata = dict(info.get("metadata") or {})
+    metadata["snapshot_id"] = snapshot_id
+    collection = client.create_collection(name=staging_name, metadata=metadata)
+
+    with open(os.path.join(source_dir, "ids.json"), "r", encoding="utf-8") as f:
+        ids = json.load(f)
+    embeddings = np.load(os.path.join(source_dir, "embeddings.npy"), mmap_mode="r")
+    offsets = np.load(os.path.join(source_dir, "document_offsets.npy"), mmap_mode="r")
+    documents = np.memmap(os.path.join(source_dir, "documents.bin"), dtype=np.uint8, mode="r") \
+        if offsets[-1] > 0 else np.zeros(0, dtype=np.uint8)
+
+    with open(os.path.join(source_dir, "metadatas.jsonl"), "r", encoding="utf-8") as metadatas:
+        for start in range(0, len(ids), BATCH_SIZE):
+            end = min(start + BATCH_SIZE, len(ids))
+            collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end].tolist(),
+                documents=[
+                    bytes(documents[offsets[i]:offsets[i + 1]]).decode("utf-8") for i in range(start, end)
+                ],
+                metadatas=[json.loads(next(metadatas)) or None for _ in range(start, end)]
+            )
+
+    stored = collection.get(include=[])["ids"]
+    if len(stored) != info["count"] or _ids_digest(stored) != _ids_digest(ids):
+        client.delete_collection(staging_name)
+        raise ValueError(f"Imported {info['name']} has {len(stored)} of {info['count']} records, "
+                         f"keeping the current collection")
+    return collection
+
+
+def _swap_in(client, staged, name: str):
+    """Replace the live collection with a verified staged copy"""
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    staged.modify(name=name)
+    return client.get_collection(name=name)
+
+
+def _remove_sidecar(index_dir: str):
+    """Remove a sidecar index; it is moved aside first so readers never load a half-deleted index"""
+    retired_dir = f"{index_dir}.retired"
+    shutil.rmtree(retired_dir, ignore_errors=True)
+    os.replace(index_dir, retired_dir)
+    shutil.rmtree(retired_dir, ignore_errors=True)
+
+
+def import_snapshot(client, db_path: str, snapshot_dir: str, verify: bool = True) -> Dict[str, Any]:
+    """
+    Load a snapshot into a ChromaDB database, replacing its collections
+
+    All collections are imported under staging names and verified first; the
+    live collections are only swapped out once every copy is complete. The
+    paper table and the sidecar index are replaced along with them, so nothing
+    of the previous collection survives the import.
+
+    Args:
+        client: ChromaDB client
+        db_path: ChromaDB persistence directory
+        snapshot_dir: Snapshot created by export_snapshot
+        verify: Check file checksums before importing
+
+    Returns:
+        Snapshot manifest
+    """
+    manifest = read_manifest(snapshot_dir, verify)
+    chunk_collection_name = manifest["chunk_collection"]
+
+    # Every collection is staged and verified before any live collection is replaced
+    staged = []
+    try:
+        for info in manifest["collections"]:
+            print(f"📥 Importing {info['name']} ({info['count']} records)...")
+            staged.append((info["name"], _import_collection(
+                client, os.path.join(snapshot_dir, "collections", info["name"]), info, manifest["snapshot_id"]
+            )))
+    except Exception:
+        for name, _ in staged:
+            client.delete_collection(_staging_name(name))
+        raise
+
+    chunk_collection = None
+    for name, collection in staged:
+        collection = _swap_in(client, collection, name)
+        if name == chunk_collection_name:
+            chunk_collection = collection
+
+    with open(os.path.join(snapshot_dir, "papers.json"), "r", encoding="utf-8") as f:
+        papers = json.load(f)
+    PaperStore(db_path).replace_papers(
+        chunk_collection_name, [{"paper_id": paper_id, **row} for paper_id, row in papers.items()]
+    )
+
+    # Snapshots written before group bitmaps and index settings were included have neither file
+    if os.path.exists(os.path.join(snapshot_dir, GROUP_STORE_FILE)):
+        DocumentGroupIndex(db_path).copy_collection(chunk_collection_name, os.path.join(snapshot_dir, GROUP_STORE_FILE))
+    for name, settings in load_all_index_settings(snapshot_dir).items():
+        save_index_settings(db_path, name, settings)
+
+    index_dir = quantized_index_dir(db_path, chunk_collection_name)
+    info = next(i for i in manifest["collections"] if i["name"] == chunk_collection_name)
+    if manifest.get("quantization") and chunk_collection is not None and info["count"]:
+        with open(os.path.join(snapshot_dir, "collections", chunk_collection_name, "ids.json"), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        embeddings = np.load(os.path.join(snapshot_dir, "collections", chunk_collection_name, "embeddings.npy"), mmap_mode="r")
+        QuantizedVectorIndex.build(index_dir, ids, embeddings, manifest["quantization"],
+                                   metric=distance_metric_of(chunk_collection))
+    elif os.path.exists(index_dir):
+        # The local sidecar indexes the replaced collection's rows
+        _remove_sidecar(index_dir)
+
+    return manifest
+
+
+def restore_if_needed(client, db_path: str, snapshot_dir: str) -> bool:
+    """
+    Import a snapshot when the collection is missing or came from another snapshot
+
+    Collections that were built locally (no snapshot_id) are never replaced.
+
+    Returns:
+        True if the snapshot was imported
+    """
+    manifest = read_manifest(snapshot_dir, verify=False)
+    try:
+        current = client.get_collection(name=manifest["chunk_collection"])
+    except Exception:
+        current = None
+    if current is not None:
+        current_id = (current.metadata or {}).get("snapshot_id")
+        if current_id is None:
+            print(f"⚠️  {manifest['chunk_collection']} was built locally, not restoring {manifest['snapshot_id']}")
+            return False
+        if current_id == manifest["snapshot_id"]:
+            return False
+    import_snapshot(client, db_path, snapshot_dir)
+    return True
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Export or import precomputed collection snapshots')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Write a snapshot of a collection')
+    export_parser.add_argument('output', help='Snapshot directory to create')
+    export_parser.add_argument('--collection', default="llm_reasoning_agents_papers", help='Chunk collection')
+    export_parser.add_argument('--metadata-collection', default="LLM_Reasoning_Agents_arxiv_metadata",
+                               help='arXiv metadata collection to include ("" to skip)')
+    export_parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+
+    import_parser = subparsers.add_parser('import', help='Load a snapshot into a database')
+    import_parser.add_argument('snapshot', help='Snapshot directory')
+    import_parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+    import_parser.add_argument('--skip-verify', action='store_true', help='Do not verify checksums')
+    args = parser.parse_args()
+
+    client = chromadb.PersistentClient(
+        path=args.db_path,
+        settings=Settings(anonymized_telemetry=False, allow_reset=True)
+    )
+
+    if args.command == 'export':
+        metadata_collection = args.metadata_collection or None
+        if metadata_collection:
+            try:
+                client.get_collection(name=metadata_collection)
+            except Exception:
+                print(f"⚠️  Metadata collection not found, skipping: {metadata_collection}")
+                metadata_collection = None
+        manifest = export_snapshot(client, args.db_path, args.output, args.collection, metadata_collection)
+        print(f"✅ Snapshot {manifest['snapshot_id']} written to {args.output}")
+    else:
+        manifest = import_snapshot(client, args.db_path, args.snapshot, verify=not args.skip_verify)
+        print(f"✅ Snapshot {manifest['snapshot_id']} imported into {args.db_path}")
+
+    for info in manifest["collections"]:
+        print(f"   📚 {info['name']}: {info['count']} records")
+    print(f"   📋 {manifest['papers']} papers")
+
+
+if __name__ == "__main__":
+    main()
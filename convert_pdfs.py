@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Parallel, resumable PDF to Markdown conversion for a collection
+Converts PDFs with a process pool sized to the machine, remembers finished and
+failed PDFs by content hash, and can hand finished markdown straight to ChromaDB
+Usage: python convert_pdfs.py [--collection NAME] [--workers N] [--converter {mineru,stub}] [--ingest]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+COLLECTIONS_DIR = os.path.join(PROJECT_ROOT, "backend", "data", "collections")
+STATE_FILE = "conversion_state.json"
+DEFAULT_WORKER_MEMORY_GB = 3.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class PdfConverter(ABC):
+    """Converts one PDF into a MinerU-style {paper_id}.md/{paper_id}/auto/{paper_id}.md tree"""
+
+    name = "base"
+
+    @abstractmethod
+    def convert(self, pdf_path: str, output_dir: str) -> str:
+        """
+        Convert a PDF
+
+        Args:
+            pdf_path: PDF to convert
+            output_dir: Collection markdown directory
+
+        Returns:
+            Path of the produced markdown file
+        """
+
+    @staticmethod
+    def expected_markdown_path(pdf_path: str, output_dir: str) -> str:
+        paper_id = os.path.splitext(os.path.basename(pdf_path))[0]
+        return os.path.join(output_dir, f"{paper_id}.md", paper_id, "auto", f"{paper_id}.md")
+
+
+class MinerUConverter(PdfConverter):
+    """Runs the MinerU CLI in a subprocess"""
+
+    name = "mineru"
+
+    def __init__(self, device: str = "cpu", timeout: Optional[float] = None):
+        self.device = device
+        self.timeout = timeout
+
+    def convert(self, pdf_path: str, output_dir: str) -> str:
+        paper_id = os.path.splitext(os.path.basename(pdf_path))[0]
+        target = os.path.join(output_dir, f"{paper_id}.md")
+        completed = subprocess.run(
+            ["mineru", "-p", pdf_path, "-o", target, "-d", self.device],
+            capture_output=True,
+            text=True,
+            timeout=self.timeout
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip()[-500:] or f"mineru exited with {completed.returncode}")
+
+        markdown_path = self.expected_markdown_path(pdf_path, output_dir)
+        if not os.path.exists(markdown_path):
+            raise RuntimeError(f"mineru produced no markdown at {markdown_path}")
+        return markdown_path
+
+
+class StubConverter(PdfConverter):
+    """Writes placeholder markdown without parsing the PDF (for tests and dry runs)"""
+
+    name = "stub"
+
+    def convert(self, pdf_path: str, output_dir: str) -> str:
+        paper_id = os.path.splitext(os.path.basename(pdf_path))[0]
+        markdown_path = self.expected_markdown_path(pdf_path, output_dir)
+        os.makedirs(os.path.dirname(markdown_path), exist_ok=True)
+        with open(markdown_path, "w", encoding="utf-8") as f:
+            f.write(f"# {paper_id}\n\n## Abstract\n\nStub conversion of {os.path.basename(pdf_path)}.\n")
+        return markdown_path
+
+
+CONVERTERS = {
+    MinerUConverter.name: MinerUConverter,
+    StubConverter.name: StubConverter
+}
+
+
+def file_sha256(path: str) -> str:
+    """Content hash of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Available physical memory, or None when it cannot be determined"""
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_worker_count(worker_memory_gb: float = DEFAULT_WORKER_MEMORY_GB) -> int:
+    """Size the pool to the available cores and memory"""
+    cores = os.cpu_count() or 1
+    memory = available_memory_bytes()
+    if memory is None:
+        return cores
+    by_memory = int(memory // (worker_memory_gb * 1024 ** 3))
+    return max(1, min(cores, by_memory))
+
+
+class ConversionState:
+    """JSON state file tracking each PDF's content hash and conversion outcome"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def needs_conversion(self, pdf_name: str, sha256: str, max_attempts: int) -> bool:
+        entry = self.entries.get(pdf_name)
+        if not entry or entry.get("sha256") != sha256:
+            return True
+        if entry.get("status") == "done":
+            return not os.path.exists(entry.get("markdown", ""))
+        return entry.get("attempts", 0) < max_attempts
+
+    def adopt(self, pdf_name: str, sha256: str, markdown: str):
+        """Mark a PDF done whose markdown was produced outside this state file (e.g. by the old convert_pdfs.sh)"""
+        self.entries[pdf_name] = {
+            "sha256": sha256,
+            "status": "done",
+            "attempts": 0,
+            "markdown": markdown,
+            "error": None,
+            "seconds": None,
+            "updated_at": datetime.now().isoformat()
+        }
+
+    def record(self, pdf_name: str, sha256: str, status: str, markdown: Optional[str] = None,
+               error: Optional[str] = None, seconds: Optional[float] = None):
+        previous = self.entries.get(pdf_name, {})
+        attempts = previous.get("attempts", 0) if previous.get("sha256") == sha256 else 0
+        self.entries[pdf_name] = {
+            "sha256": sha256,
+            "status": status,
+            "attempts": attempts + 1,
+            "markdown": markdown,
+            "error": error,
+            "seconds": round(seconds, 2) if seconds is not None else None,
+            "updated_at": datetime.now().isoformat()
+        }
+        self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _convert_one(converter: PdfConverter, pdf_path: str, output_dir: str) -> Dict[str, Any]:
+    """Worker entry point; never raises so failures are recorded in the state file"""
+    started = time.perf_counter()
+    try:
+        markdown = converter.convert(pdf_path, output_dir)
+        return {"pdf": pdf_path, "status": "done", "markdown": markdown, "error": None,
+                "seconds": time.perf_counter() - started}
+    except Exception as e:
+        return {"pdf": pdf_path, "status": "failed", "markdown": None, "error": str(e),
+                "seconds": time.perf_counter() - started}
+
+
+def convert_collection(collection_name: str, converter: PdfConverter, workers: Optional[int] = None,
+                       max_files: Optional[int] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                       on_converted: Optional[Callable[[str], None]] = None,
+                       collections_dir: str = COLLECTIONS_DIR) -> Dict[str, int]:
+    """
+    Convert a collection's PDFs that are new, changed or due for a retry
+
+    Args:
+        collection_name: Collection directory under collections_dir
+        converter: Converter used by the workers (must be picklable)
+        workers: Pool size (sized to cores and memory when None)
+        max_files: Convert at most this many PDFs in this run
+        max_attempts: Attempts per PDF before it is no longer retried
+        on_converted: Called in this process with each finished markdown path
+        collections_dir: Root directory of all collections
+
+    Returns:
+        Counters for converted, failed, skipped and total PDFs
+    """
+    collection_dir = os.path.join(collections_dir, collection_name)
+    pdf_dir = os.path.join(collection_dir, "pdfs")
+    output_dir = os.path.join(collection_dir, "markdown")
+    os.makedirs(output_dir, exist_ok=True)
+
+    state = ConversionState(os.path.join(collection_dir, STATE_FILE))
+    pdf_paths = sorted(
+        os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.lower().endswith(".pdf")
+    ) if os.path.isdir(pdf_dir) else []
+
+    hashes = {path: file_sha256(path) for path in pdf_paths}
+    # Markdown already on disk for a PDF the state file has never seen is kept, not re-converted
+    adopted = 0
+    for path in pdf_paths:
+        markdown = PdfConverter.expected_markdown_path(path, output_dir)
+        if os.path.basename(path) not in state.entries and os.path.isfile(markdown) \
+                and os.path.getsize(markdown) > 0:
+            state.adopt(os.path.basename(path), hashes[path], markdown)
+            adopted += 1
+    if adopted:
+        state.save()
+        print(f"📎 Adopted {adopted} existing markdown files")
+    pending = [p for p in pdf_paths if state.needs_conversion(os.path.basename(p), hashes[p], max_attempts)]
+    if max_files is not None:
+        pending = pending[:max_files]
+
+    counts = {"total": len(pdf_paths), "skipped": len(pdf_paths) - len(pending), "converted": 0, "failed": 0}
+    if not pending:
+        return counts
+
+    workers = workers or default_worker_count()
+    workers = min(workers, len(pending))
+    print(f"⚙️  Converting {len(pending)} PDFs with {workers} workers ({converter.name})")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_convert_one, converter, path, output_dir) for path in pending]
+        for future in as_completed(futures):
+            outcome = future.result()
+            pdf_name = os.path.basename(outcome["pdf"])
+            state.record(pdf_name, hashes[outcome["pdf"]], outcome["status"],
+                         outcome["markdown"], outcome["error"], outcome["seconds"])
+            if outcome["status"] == "done":
+                counts["converted"] += 1
+                print(f"✅ Success: {pdf_name} ({outcome['seconds']:.1f}s)")
+                if on_converted:
+                    on_converted(outcome["markdown"])
+            else:
+                counts["failed"] += 1
+                print(f"❌ Failed: {pdf_name}: {outcome['error']}")
+
+    return counts
+
+
+class ChromaDBIngestHandoff:
+    """Ingests each finished markdown file into the collection's chunk store"""
+
+    def __init__(self, collection_name: str, group_id: str, db_path: Optional[str] = None):
+        """
+        Args:
+            collection_name: Chunk collection to ingest into
+            group_id: Document group of the papers (the collection directory they are converted in)
+            db_path: ChromaDB persistence directory
+        """
+        import chromadb
+        from chromadb.config import Settings
+        import load_to_chromadb
+
+        self.loader = load_to_chromadb
+        self.db_path = db_path or load_to_chromadb.CHROMA_DB_PATH
+        self.collection_name = collection_name
+        self.group_id = group_id
+        self.client = chromadb.PersistentClient(
+            path=self.db_path,
+            settings=Settings(anonymized_telemetry=False, allow_reset=True)
+        )
+        self.collection = load_to_chromadb.get_or_create_chunk_collection(self.client, self.db_path, collection_name)
+        self.ingested = 0
+        self.changed = []
+
+    def __call__(self, markdown_path: str):
+        counts = self.loader.ingest_markdown_files([markdown_path], self.collection, self.db_path, self.collection_name,
+                                                   on_paper_changed=self.changed.append, group_ids=[self.group_id])
+        self.ingested += counts["papers"]
+
+    def finish(self):
+        """Update the quantized index (if configured) and similarity cutoff once all papers are in"""
+        if not self.changed:
+            return
+        self.loader.update_quantized_index(self.collection, self.db_path, self.collection_name, self.changed)
+        self.loader.calibrate_similarity_threshold(self.collection, self.db_path, self.collection_name)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Convert a collection of PDFs to Markdown in parallel')
+    parser.add_argument('--collection', default="LLM_Reasoning_Agents", help='Collection directory name')
+    parser.add_argument('--converter', choices=sorted(CONVERTERS), default=MinerUConverter.name, help='Conversion backend')
+    parser.add_argument('--device', default="cpu", help='MinerU device')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: sized to cores and memory)')
+    parser.add_argument('--max-files', type=int, default=None, help='Convert at most this many PDFs')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS, help='Attempts per PDF before giving up')
+    parser.add_argument('--ingest', action='store_true', help='Load finished markdown into ChromaDB as it completes')
+    parser.add_argument('--chroma-collection', default="llm_reasoning_agents_papers", help='Chunk collection for --ingest')
+    args = parser.parse_args()
+
+    converter = MinerUConverter(device=args.device) if args.converter == MinerUConverter.name else StubConverter()
+
+    print("🚀 Starting PDF to Markdown conversion...")
+    print(f"📚 Collection: {args.collection}")
+
+    handoff = ChromaDBIngestHandoff(args.chroma_collection, args.collection) if args.ingest else None
+    started = time.perf_counter()
+    counts = convert_collection(args.collection, converter, args.workers, args.max_files,
+                                args.max_attempts, on_converted=handoff)
+    if handoff:
+        handoff.finish()
+
+    print("🎉 Conversion complete!")
+    print(f"📊 {counts['converted']} converted, {counts['failed']} failed, "
+          f"{counts['skipped']} skipped of {counts['total']} PDFs in {time.perf_counter() - started:.1f}s")
+    if handoff:
+        print(f"📤 {handoff.ingested} papers ingested into {args.chroma_collection}")
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Document-group membership index for chunk collections
+Every paper of a collection gets a stable ordinal, and every document group
+(e.g. LLM_Reasoning_Agents) a bitmap over those ordinals. Bitmaps are updated
+at ingest and turned into row masks over the sidecar vector index, so searches
+restricted to a few groups only score the rows of those groups.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+GROUP_STORE_FILE = "document_groups.sqlite3"
+
+
+def paper_id_of_chunk(chunk_id: str) -> str:
+    """Paper ID of a chunk ID of the form {paper_id}_chunk_{n}_{hash}"""
+    return chunk_id.split("_chunk_")[0]
+
+
+class GroupMembership:
+    """In-memory snapshot of a collection's paper ordinals and group bitmaps"""
+
+    def __init__(self, ordinals: Dict[str, int], bitmaps: Dict[str, np.ndarray]):
+        self.ordinals = ordinals
+        self.size = max(ordinals.values(), default=-1) + 1
+        # Packed bitmaps are padded to whole bytes and may predate the newest papers
+        self.bitmaps = {group_id: np.pad(bitmap[:self.size], (0, max(0, self.size - len(bitmap))))
+                        for group_id, bitmap in bitmaps.items()}
+
+    def paper_mask(self, group_ids: Iterable[str]) -> np.ndarray:
+        """Boolean mask over paper ordinals of the union of the groups (unknown groups are empty)"""
+        mask = np.zeros(self.size, dtype=bool)
+        for group_id in group_ids:
+            bitmap = self.bitmaps.get(group_id)
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def paper_ids(self, group_ids: Iterable[str]) -> List[str]:
+        """Paper IDs in any of the groups"""
+        mask = self.paper_mask(group_ids)
+        return sorted(paper_id for paper_id, ordinal in self.ordinals.items() if mask[ordinal])
+
+    def row_ordinals(self, chunk_ids: List[str]) -> np.ndarray:
+        """Paper ordinal of every chunk row (-1 for papers without an ordinal)"""
+        return np.fromiter((self.ordinals.get(paper_id_of_chunk(chunk_id), -1) for chunk_id in chunk_ids),
+                           dtype=np.int64, count=len(chunk_ids))
+
+    def group_sizes(self) -> Dict[str, int]:
+        return {group_id: int(bitmap.sum()) for group_id, bitmap in self.bitmaps.items()}
+
+
+class DocumentGroupIndex:
+    """SQLite-backed paper ordinals and packed group bitmaps, keyed by collection"""
+
+    def __init__(self, db_path: str):
+        self.path = os.path.join(db_path, GROUP_STORE_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(db_path, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS paper_ordinals ("
+                "collection TEXT NOT NULL, paper_id TEXT NOT NULL, ordinal INTEGER NOT NULL, "
+                "PRIMARY KEY (collection, paper_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS group_bitmaps ("
+                "collection TEXT NOT NULL, group_id TEXT NOT NULL, bitmap BLOB NOT NULL, "
+                "PRIMARY KEY (collection, group_id))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read_bitmap(conn, collection_name: str, group_id: str) -> np.ndarray:
+        row = conn.execute("SELECT bitmap FROM group_bitmaps WHERE collection = ? AND group_id = ?",
+                           (collection_name, group_id)).fetchone()
+        return np.unpackbits(np.frombuffer(row[0], dtype=np.uint8)).astype(bool) if row else np.zeros(0, dtype=bool)
+
+    @staticmethod
+    def _write_bitmap(conn, collection_name: str, group_id: str, bitmap: np.ndarray):
+        if bitmap.any():
+            conn.execute("INSERT OR REPLACE INTO group_bitmaps (collection, group_id, bitmap) VALUES (?, ?, ?)",
+                         (collection_name, group_id, np.packbits(bitmap).tobytes()))
+        else:
+            conn.execute("DELETE FROM group_bitmaps WHERE collection = ? AND group_id = ?",
+                         (collection_name, group_id))
+
+    def add_papers(self, collection_name: str, group_id: str, paper_ids: List[str]):
+        """
+        Add papers to a group, assigning ordinals to papers seen for the first time
+
+        Args:
+            collection_name: Chunk collection the papers are stored in
+            group_id: Document group, e.g. the collection directory they were ingested from
+            paper_ids: Papers to add
+        """
+        if not paper_ids:
+            return
+        with self._lock, self._connect() as conn:
+            ordinals = dict(conn.execute("SELECT paper_id, ordinal FROM paper_ordinals WHERE collection = ?",
+                                         (collection_name,)))
+            next_ordinal = max(ordinals.values(), default=-1) + 1
+            for paper_id in paper_ids:
+                if paper_id not in ordinals:
+                    ordinals[paper_id] = next_ordinal
+                    conn.execute("INSERT INTO paper_ordinals (collection, paper_id, ordinal) VALUES (?, ?, ?)",
+                                 (collection_name, paper_id, next_ordinal))
+                    next_ordinal += 1
+            bitmap = self._read_bitmap(conn, collection_name, group_id)
+            if len(bitmap) < next_ordinal:
+                bitmap = np.concatenate([bitmap, np.zeros(next_ordinal - len(bitmap), dtype=bool)])
+            bitmap[[ordinals[paper_id] for paper_id in paper_ids]] = True
+            self._write_bitmap(conn, collection_name, group_id, bitmap)
+
+    def remove_papers(self, collection_name: str, paper_ids: List[str], group_id: Optional[str] = None):
+        """Remove papers from one group, or from every group when group_id is None"""
+        if not paper_ids:
+            return
+        with self._lock, self._connect() as conn:
+            ordinals = [row[0] for paper_id in paper_ids for row in conn.execute(
+                "SELECT ordinal FROM paper_ordinals WHERE collection = ? AND paper_id = ?",
+                (collection_name, paper_id)
+            )]
+            group_ids = [group_id] if group_id is not None else [row[0] for row in conn.execute(
+                "SELECT group_id FROM group_bitmaps WHERE collection = ?", (collection_name,)
+            )]
+            for group in group_ids:
+                bitmap = self._read_bitmap(conn, collection_name, group)
+                bitmap[[ordinal for ordinal in ordinals if ordinal < len(bitmap)]] = False
+                self._write_bitmap(conn, collection_name, group, bitmap)
+
+    def copy_collection(self, collection_name: str, source_path: str):
+        """Replace a collection's ordinals and bitmaps with the ones stored in another group file"""
+        with self._lock, self._connect() as conn:
+            conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+            for table in ("paper_ordinals", "group_bitmaps"):
+                conn.execute(f"DELETE FROM main.{table} WHERE collection = ?", (collection_name,))
+                conn.execute(f"INSERT INTO main.{table} SELECT * FROM source.{table} WHERE collection = ?",
+                             (collection_name,))
+
+    def load(self, collection_name: str) -> GroupMembership:
+        """Snapshot of a collection's ordinals and bitmaps"""
+        with self._connect() as conn:
+            ordinals = dict(conn.execute("SELECT paper_id, ordinal FROM paper_ordinals WHERE collection = ?",
+                                         (collection_name,)))
+            bitmaps = {
+                group_id: np.unpackbits(np.frombuffer(blob, dtype=np.uint8)).astype(bool)
+                for group_id, blob in conn.execute(
+                    "SELECT group_id, bitmap FROM group_bitmaps WHERE collection = ?", (collection_name,)
+                )
+            }
+        return GroupMembership(ordinals, bitmaps)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Recall-vs-latency evaluation of HNSW parameters for a ChromaDB collection
+Usage: python evaluate_ann.py [--collection NAME] [--M 8,16,32] [--construction-ef 100,200]
+                              [--search-ef 10,50,100] [--k 10] [--apply --target-recall 0.95]
+"""
+
+import os
+import glob
+import json
+import time
+import argparse
+import itertools
+from typing import List, Dict, Any
+
+import numpy as np
+import chromadb
+from chromadb.config import Settings
+from chromadb.utils import embedding_functions
+
+from collection_config import HNSW_KEYS, save_index_settings, index_settings_of
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(PROJECT_ROOT, "backend", "data")
+CHROMA_DB_PATH = os.path.join(DATA_DIR, "chromadb")
+ADD_BATCH_SIZE = 1000
+
+
+def load_query_set(data_dir: str = DATA_DIR) -> List[str]:
+    """
+    Collect evaluation queries from workflow states and mission activity logs
+
+    Args:
+        data_dir: Backend data directory
+
+    Returns:
+        Deduplicated list of query strings
+    """
+    queries = []
+
+    state_files = glob.glob(os.path.join(data_dir, "collections", "*", "intermediate_states", "*_queries_generated.json"))
+    for path in state_files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                queries.extend(json.load(f).get("search_queries", []))
+        except Exception as e:
+            print(f"⚠️  Skipping {path}: {str(e)}")
+
+    activity_files = glob.glob(os.path.join(data_dir, "idea_missions", "*", "activity.json"))
+    for path in activity_files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for event in json.load(f):
+                    if event.get("operation") == "idea.search.semantic.execute":
+                        queries.append(event.get("args", {}).get("query", ""))
+        except Exception as e:
+            print(f"⚠️  Skipping {path}: {str(e)}")
+
+    seen = set()
+    unique_queries = []
+    for query in queries:
+        normalized = " ".join(query.split()).lower()
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            unique_queries.append(query)
+    return unique_queries
+
+
+def exact_ground_truth(embeddings: np.ndarray, queries: np.ndarray, k: int, space: str = "l2") -> np.ndarray:
+    """
+    Compute exact top-k neighbours by brute force
+
+    Args:
+        embeddings: Corpus embeddings (N x dim)
+        queries: Query embeddings (Q x dim)
+        k: Number of neighbours
+        space: ChromaDB distance space ('l2', 'cosine' or 'ip')
+
+    Returns:
+        Array of row indices (Q x k)
+    """
+    if space == "cosine":
+        corpus = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        q = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        distances = -(q @ corpus.T)
+    elif space == "ip":
+        distances = -(queries @ embeddings.T)
+    else:
+        distances = (
+            (queries ** 2).sum(axis=1)[:, None]
+            - 2 * queries @ embeddings.T
+            + (embeddings ** 2).sum(axis=1)[None, :]
+        )
+    return np.argsort(distances, axis=1, kind="stable")[:, :k]
+
+
+def evaluate_config(ids: List[str], embeddings: np.ndarray, query_embeddings: np.ndarray,
+                    truth: np.ndarray, k: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a throwaway collection with the given settings and measure it
+
+    Args:
+        ids: Chunk IDs of the corpus
+        embeddings: Corpus embeddings
+        query_embeddings: Query embeddings
+        truth: Exact neighbour row indices per query
+        k: Recall cutoff
+        settings: Collection metadata (hnsw:* keys)
+
+    Returns:
+        Measurement dictionary
+    """
+    client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False, allow_reset=True))
+    name = "ann_eval_" + "_".join(str(v) for v in settings.values())
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+
+    build_start = time.perf_counter()
+    collection = client.create_collection(name=name, metadata=settings)
+    for start in range(0, len(ids), ADD_BATCH_SIZE):
+        collection.add(
+            ids=ids[start:start + ADD_BATCH_SIZE],
+            embeddings=embeddings[start:start + ADD_BATCH_SIZE].tolist()
+        )
+    build_seconds = time.perf_counter() - build_start
+
+    row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+    latencies = []
+    recalls = []
+    for query, expected in zip(query_embeddings, truth):
+        query_start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - query_start) * 1000)
+        found = {row_of[chunk_id] for chunk_id in result["ids"][0]}
+        recalls.append(len(found & set(expected.tolist())) / len(expected))
+
+    client.delete_collection(name)
+    return {
+        **settings,
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        "build_seconds": round(build_seconds, 3)
+    }
+
+
+def pick_best(results: List[Dict[str, Any]], target_recall: float) -> Dict[str, Any]:
+    """Fastest configuration meeting the recall target, or the most accurate one"""
+    qualifying = [r for r in results if r["recall_at_k"] >= target_recall]
+    if qualifying:
+        return min(qualifying, key=lambda r: (r["latency_ms_p95"], r["build_seconds"]))
+    return max(results, key=lambda r: (r["recall_at_k"], -r["latency_ms_p95"]))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Evaluate HNSW parameters by recall@k vs latency')
+    parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+    parser.add_argument('--collection', default="llm_reasoning_agents_papers", help='Collection to evaluate')
+    parser.add_argument('--k', type=int, default=10, help='Recall cutoff')
+    parser.add_argument('--M', type=_int_list, default=[8, 16, 32], help='Comma-separated hnsw:M values')
+    parser.add_argument('--construction-ef', type=_int_list, default=[100, 200], help='Comma-separated hnsw:construction_ef values')
+    parser.add_argument('--search-ef', type=_int_list, default=[10, 50, 100], help='Comma-separated hnsw:search_ef values')
+    parser.add_argument('--max-queries', type=int, default=200, help='Maximum number of evaluation queries')
+    parser.add_argument('--output', help='Write the full report as JSON to this path')
+    parser.add_argument('--apply', action='store_true', help='Save the chosen settings for collection creation')
+    parser.add_argument('--target-recall', type=float, default=0.95, help='Recall target used to choose settings')
+    args = parser.parse_args()
+
+    print("🚀 ANN Parameter Evaluation")
+    print("=" * 60)
+
+    client = chromadb.PersistentClient(path=args.db_path, settings=Settings(anonymized_telemetry=False))
+    collection = client.get_collection(name=args.collection)
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    print(f"📚 Collection: {args.collection} ({collection.count()} chunks, space={space})")
+    print(f"⚙️  Current settings: {index_settings_of(collection) or 'ChromaDB defaults'}")
+
+    stored = collection.get(include=["embeddings"])
+    ids = stored["ids"]
+    embeddings = np.asarray(stored["embeddings"], dtype=np.float32)
+    if not ids:
+        print("❌ Collection is empty")
+        return
+
+    queries = load_query_set()[:args.max_queries]
+    if not queries:
+        print("❌ No queries found in intermediate_states or activity logs")
+        return
+    print(f"🔍 Loaded {len(queries)} evaluation queries")
+
+    embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    query_embeddings = np.asarray(embedding_function(queries), dtype=np.float32)
+
+    k = min(args.k, len(ids))
+    truth_start = time.perf_counter()
+    truth = exact_ground_truth(embeddings, query_embeddings, k, space)
+    print(f"🎯 Exact ground truth computed in {time.perf_counter() - truth_start:.2f}s")
+
+    results = []
+    for m, construction_ef, search_ef in itertools.product(args.M, args.construction_ef, args.search_ef):
+        settings = {
+            "hnsw:space": space,
+            "hnsw:M": m,
+            "hnsw:construction_ef": construction_ef,
+            "hnsw:search_ef": search_ef
+        }
+        result = evaluate_config(ids, embeddings, query_embeddings, truth, k, settings)
+        results.append(result)
+        print(f"   M={m:<3} construction_ef={construction_ef:<4} search_ef={search_ef:<4} "
+              f"recall@{k}={result['recall_at_k']:.3f}  p50={result['latency_ms_p50']:.2f}ms  "
+              f"p95={result['latency_ms_p95']:.2f}ms  build={result['build_seconds']:.2f}s")
+
+    best = pick_best(results, args.target_recall)
+    print(f"\n🏆 Chosen settings (target recall {args.target_recall}): "
+          f"M={best['hnsw:M']}, construction_ef={best['hnsw:construction_ef']}, search_ef={best['hnsw:search_ef']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "collection": args.collection,
+                "space": space,
+                "k": k,
+                "queries": len(queries),
+                "results": results,
+                "chosen": best
+            }, f, indent=2)
+        print(f"💾 Report written to: {args.output}")
+
+    if args.apply:
+        settings = {key: best[key] for key in HNSW_KEYS}
+        path = save_index_settings(args.db_path, args.collection, settings)
+        print(f"✅ Settings saved to {path}")
+        print("💡 They are applied when the collection is next created (delete it and re-run the loader)")
+
+
+if __name__ == "__main__":
+    main()
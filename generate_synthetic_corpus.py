@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic paper collection for scale and regression testing
+Writes MinerU-style markdown trees ({paper_id}.md/{paper_id}/auto/{paper_id}.md)
+and an arxiv_metadata.csv in the same layout as the real collections, so the
+corpus can be ingested with load_to_chromadb.py and arxiv_to_chromadb.py.
+Every paper is generated from its own seed, so output is reproducible.
+Usage: python generate_synthetic_corpus.py --chunks 10000 [--collection NAME] [--seed N]
+"""
+
+import os
+import csv
+import math
+import argparse
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+COLLECTIONS_DIR = os.path.join(PROJECT_ROOT, "backend", "data", "collections")
+
+# Markdown characters per chunk measured with the loader's 1000-char chunks and 200-char overlap
+CHARS_PER_CHUNK = 710
+MEAN_CHUNKS_PER_PAPER = 40
+
+CSV_FIELDS = [
+    'arxiv_id', 'title', 'abstract', 'authors', 'published_date',
+    'updated_date', 'categories', 'arxiv_url', 'pdf_url', 'doi',
+    'comment', 'journal_ref', 'fetched_at'
+]
+
+TOPIC_WORDS = (
+    "agent agents reasoning planning plan tool tools memory retrieval language model models large "
+    "policy reward reinforcement learning chain thought verification critic debate reflection "
+    "multi-agent collaboration environment task tasks benchmark evaluation accuracy performance "
+    "prompt prompting instruction tuning fine-tuning inference search tree graph knowledge "
+    "decomposition subgoal feedback self-consistency hallucination grounding embodied robot "
+    "code generation mathematical proof program execution simulation game dialogue role "
+    "coordination communication protocol architecture module framework pipeline dataset "
+    "training trajectory demonstration exploration uncertainty calibration preference alignment"
+).split()
+
+FUNCTION_WORDS = (
+    "the of and to in a is that for we with as on by this are our an be from which can these "
+    "it its their such each both while when than into over under between across through"
+).split()
+
+FIRST_NAMES = ("Wei", "Ana", "Rahul", "Yuki", "Omar", "Lena", "Chen", "Sofia", "Daniel", "Priya",
+               "Jonas", "Mei", "Carlos", "Aisha", "Ivan", "Hana", "Lucas", "Fatima", "Noah", "Jin")
+LAST_NAMES = ("Zhang", "Silva", "Gupta", "Tanaka", "Haddad", "Novak", "Li", "Rossi", "Kim", "Patel",
+              "Berg", "Wang", "Lopez", "Khan", "Petrov", "Sato", "Martin", "Ahmed", "Smith", "Park")
+CATEGORIES = ("cs.AI", "cs.CL", "cs.LG", "cs.MA", "cs.RO", "cs.IR", "stat.ML")
+SECTIONS = ("Introduction", "Related Work", "Method", "Experiments", "Analysis", "Limitations", "Conclusion")
+
+
+def _rare_vocabulary(rng: np.random.Generator, size: int = 5000) -> List[str]:
+    """Pseudo-words for the long tail of the vocabulary"""
+    syllables = ["ka", "ro", "mi", "ten", "sa", "lu", "vor", "qi", "den", "ex", "pla", "tri", "zon", "bel"]
+    return ["".join(rng.choice(syllables, size=rng.integers(2, 5))) for _ in range(size)]
+
+
+class PaperGenerator:
+    """Generates the markdown and metadata of one synthetic paper"""
+
+    def __init__(self, seed: int, rare_words: List[str]):
+        """
+        Args:
+            seed: Corpus seed, combined with the paper number for each paper
+            rare_words: Long-tail vocabulary shared by all papers
+        """
+        self.seed = seed
+        self.rare_words = np.array(rare_words)
+        self.topic_words = np.array(TOPIC_WORDS)
+        self.function_words = np.array(FUNCTION_WORDS)
+        # Zipf-like weights over topic words so some terms dominate, like real corpora
+        ranks = np.arange(1, len(TOPIC_WORDS) + 1)
+        self.topic_weights = (1.0 / ranks) / (1.0 / ranks).sum()
+
+    def _sentences(self, rng: np.random.Generator, focus: np.ndarray, count: int) -> List[str]:
+        """Draw all words of several sentences at once (vectorized for large corpora)"""
+        lengths = rng.integers(12, 28, size=count)
+        total = int(lengths.sum())
+        draw = rng.random(total)
+        words = np.where(
+            draw < 0.45, self.function_words[rng.integers(len(self.function_words), size=total)],
+            np.where(
+                draw < 0.65, focus[rng.integers(len(focus), size=total)],
+                np.where(
+                    draw < 0.95, self.topic_words[rng.choice(len(self.topic_words), size=total, p=self.topic_weights)],
+                    self.rare_words[rng.integers(len(self.rare_words), size=total)]
+                )
+            )
+        )
+        sentences = []
+        start = 0
+        for length in lengths:
+            sentence = " ".join(words[start:start + length])
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+            start += length
+        return sentences
+
+    def _paragraph(self, rng: np.random.Generator, focus: np.ndarray) -> str:
+        return " ".join(self._sentences(rng, focus, int(rng.integers(3, 8))))
+
+    def _table(self, rng: np.random.Generator) -> str:
+        rows = ["<table><tr><td>Method</td><td>Accuracy</td><td>Cost</td></tr>"]
+        for i in range(int(rng.integers(3, 7))):
+            rows.append(f"<tr><td>Baseline-{i}</td><td>{rng.uniform(40, 95):.1f}</td><td>{rng.uniform(0.1, 9):.2f}</td></tr>")
+        rows.append("</table>")
+        return "".join(rows)
+
+    def generate(self, index: int, paper_id: str, target_chars: int) -> Dict[str, Any]:
+        """
+        Generate one paper
+
+        Args:
+            index: Paper number within the corpus
+            paper_id: arXiv-style identifier
+            target_chars: Approximate markdown length
+
+        Returns:
+            Dictionary with 'markdown' and the CSV 'metadata' row
+        """
+        rng = np.random.default_rng([self.seed, index])
+        focus = rng.choice(self.topic_words, size=6, replace=False)
+        title = " ".join(w.capitalize() for w in rng.choice(TOPIC_WORDS, size=int(rng.integers(4, 9)))).strip()
+        authors = [f"{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {LAST_NAMES[rng.integers(len(LAST_NAMES))]}"
+                   for _ in range(int(rng.integers(2, 8)))]
+        abstract = self._paragraph(rng, focus)
+
+        references = ["# References"] + [
+            f"[{i + 1}] {authors[i % len(authors)]}. {sentence}"
+            for i, sentence in enumerate(self._sentences(rng, focus, int(rng.integers(5, 20))))
+        ]
+        parts = [f"# {title.upper()}", ", ".join(authors), "# ABSTRACT", abstract]
+        length = sum(len(p) for p in parts + references)
+        section = 0
+        while length < target_chars:
+            name = SECTIONS[section % len(SECTIONS)]
+            parts.append(f"# {section + 1} {name}")
+            for sub in range(int(rng.integers(1, 4))):
+                if length >= target_chars:
+                    break
+                if rng.random() < 0.5:
+                    parts.append(f"## {section + 1}.{sub + 1} {focus[sub % len(focus)].capitalize()} {name.lower()}")
+                for _ in range(int(rng.integers(2, 6))):
+                    parts.append(self._paragraph(rng, focus))
+                    length += len(parts[-1])
+                    if length >= target_chars:
+                        break
+                draw = rng.random()
+                if draw < 0.15:
+                    parts.append(self._table(rng))
+                elif draw < 0.25:
+                    parts.append(f"![](images/{rng.bytes(16).hex()}.jpg)")
+                elif draw < 0.35:
+                    parts.append(f"$$\n\\mathcal{{L}} = \\sum_{{t=1}}^{{T}} r_t - {rng.uniform(0, 1):.2f} \\cdot KL\n$$")
+            section += 1
+
+        parts.extend(references)
+
+        published = datetime(2023, 1, 1) + timedelta(days=int(rng.integers(0, 900)))
+        categories = sorted(set(rng.choice(CATEGORIES, size=int(rng.integers(1, 4)))))
+        metadata = {
+            'arxiv_id': paper_id,
+            'title': title,
+            'abstract': abstract,
+            'authors': " | ".join(authors),
+            'published_date': published.strftime("%Y-%m-%d"),
+            'updated_date': published.strftime("%Y-%m-%d"),
+            'categories': " | ".join(categories),
+            'arxiv_url': f"http://arxiv.org/abs/{paper_id}",
+            'pdf_url': f"http://arxiv.org/pdf/{paper_id}",
+            'doi': '',
+            'comment': 'Synthetic paper',
+            'journal_ref': '',
+            'fetched_at': datetime(2025, 1, 1).isoformat()
+        }
+        return {"markdown": "\n\n".join(parts) + "\n", "metadata": metadata}
+
+
+def synthetic_paper_id(index: int) -> str:
+    """Unique arXiv-style ID; the 9xxx month prefix never collides with real papers"""
+    return f"{9000 + index // 100000:04d}.{index % 100000:05d}"
+
+
+def generate_corpus(collection_name: str, target_chunks: int, seed: int = 0,
+                    collections_dir: str = COLLECTIONS_DIR,
+                    mean_chunks_per_paper: int = MEAN_CHUNKS_PER_PAPER) -> Dict[str, Any]:
+    """
+    Write a synthetic collection
+
+    Existing papers with the same IDs are overwritten, so re-running with the
+    same arguments reproduces the corpus byte for byte.
+
+    Args:
+        collection_name: Collection directory under collections_dir
+        target_chunks: Approximate number of chunks the loader will produce
+        seed: Corpus seed
+        collections_dir: Root directory of all collections
+        mean_chunks_per_paper: Average paper length in chunks
+
+    Returns:
+        Counts of papers and characters written
+    """
+    collection_dir = os.path.join(collections_dir, collection_name)
+    markdown_dir = os.path.join(collection_dir, "markdown")
+    os.makedirs(markdown_dir, exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    generator = PaperGenerator(seed, _rare_vocabulary(rng))
+    num_papers = max(1, math.ceil(target_chunks / mean_chunks_per_paper))
+    # Log-normal paper lengths: most papers are average, a few are very long
+    chunks_per_paper = rng.lognormal(mean=math.log(mean_chunks_per_paper), sigma=0.5, size=num_papers)
+    chunks_per_paper *= target_chunks / chunks_per_paper.sum()
+
+    total_chars = 0
+    with open(os.path.join(collection_dir, "arxiv_metadata.csv"), "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for index in range(num_papers):
+            paper_id = synthetic_paper_id(index)
+            paper = generator.generate(index, paper_id, int(max(1, chunks_per_paper[index]) * CHARS_PER_CHUNK))
+
+            paper_dir = os.path.join(markdown_dir, f"{paper_id}.md", paper_id, "auto")
+            os.makedirs(paper_dir, exist_ok=True)
+            with open(os.path.join(paper_dir, f"{paper_id}.md"), "w", encoding="utf-8") as f:
+                f.write(paper["markdown"])
+            writer.writerow(paper["metadata"])
+
+            total_chars += len(paper["markdown"])
+            if (index + 1) % 1000 == 0:
+                print(f"   📝 {index + 1}/{num_papers} papers")
+
+    return {
+        "collection": collection_name,
+        "papers": num_papers,
+        "characters": total_chars,
+        "estimated_chunks": total_chars // CHARS_PER_CHUNK,
+        "markdown_dir": markdown_dir
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Generate a synthetic MinerU-style paper collection')
+    parser.add_argument('--chunks', type=int, required=True, help='Approximate number of chunks (e.g. 10000 to 1000000)')
+    parser.add_argument('--collection', default=None, help='Collection directory name (default: Synthetic_<chunks>)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--collections-dir', default=COLLECTIONS_DIR, help='Root directory of all collections')
+    args = parser.parse_args()
+
+    collection = args.collection or f"Synthetic_{args.chunks}"
+    print(f"🧪 Generating {collection} (~{args.chunks} chunks, seed {args.seed})...")
+    counts = generate_corpus(collection, args.chunks, args.seed, args.collections_dir)
+
+    print(f"✅ {counts['papers']} papers, {counts['characters'] / 1e6:.1f}M characters "
+          f"(~{counts['estimated_chunks']} chunks)")
+    print(f"📁 Markdown: {counts['markdown_dir']}")
+    print("💡 Ingest with:")
+    print(f"   python load_to_chromadb.py --markdown-dir {counts['markdown_dir']} --collection {collection.lower()}_papers")
+    print(f"   python backend/fetcher/arxiv_to_chromadb.py {collection}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,52 @@
 #!/usr/bin/env python3
 """
 Script to load converted Markdown files into ChromaDB collection
-Usage: python load_to_chromadb.py
+Usage: python load_to_chromadb.py [--quantization {none,int8,binary}] [--metric {cosine,ip,l2}]
+                                  [--markdown-dir DIR] [--collection NAME] [--db-path PATH] [--group ID ...]
 """
 
 import os
+import json
+import argparse
 import glob
 import re
 import hashlib
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 from pathlib import Path
 
 import chromadb
 from chromadb.config import Settings
+import numpy as np
 from langchain.text_splitter import MarkdownTextSplitter
 
+from collection_config import (
+    DISTANCE_METRICS, MIN_SIMILARITY_KEY, collection_creation_metadata, distance_metric_of, save_index_settings
+)
+from document_groups import DocumentGroupIndex, paper_id_of_chunk
+from paper_store import PaperStore, compact_chunk_metadata
+from quantized_index import (
+    QUANTIZATION_MODES, QuantizedVectorIndex, quantized_index_dir, recall_memory_report
+)
+
+# Configuration
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+MARKDOWN_DIR = os.path.join(PROJECT_ROOT, "backend", "data", "collections", "LLM_Reasoning_Agents", "markdown")
+COLLECTION_NAME = "llm_reasoning_agents_papers"
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "chromadb")
+
+# Chunking configuration
+CHUNK_SIZE = 1000  # characters
+CHUNK_OVERLAP = 200  # characters
+
+# Similarity cutoff calibration: chunks sampled, and the percentile of similarities between different papers
+CALIBRATION_SAMPLE = 2000
+CALIBRATION_PERCENTILE = 95
+# The sample is read as this many windows at random offsets, so calibration never scans the collection
+CALIBRATION_WINDOWS = 20
+# Papers per where-filter when fetching the embeddings of changed papers
+PAPER_FETCH_BATCH = 100
+
 def chunk_markdown_document(content: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Dict[str, Any]]:
     """
     Chunk markdown document using LangChain's MarkdownTextSplitter
@@ -39,194 +70,445 @@ def chunk_markdown_document(content: str, chunk_size: int = 1000, chunk_overlap:
     
     # Convert to our format with metadata
     chunk_data = []
+    search_from = 0
     for i, chunk_text in enumerate(chunks):
         # Extract headers from the chunk
         headers = re.findall(r'^(#{1,6}\s+.+)$', chunk_text, re.MULTILINE)
         
+        # Locate the chunk in the source; chunks are in order but may overlap
+        stripped = chunk_text.strip()
+        start = content.find(stripped, search_from)
+        if start >= 0:
+            search_from = start + 1
+        
         chunk_metadata = {
             "chunk_id": i,
             "chunk_size": len(chunk_text),
             "headers": headers,
-            "section_type": "content"
+            "section_type": "content",
+            "start": start,
+            "end": start + len(stripped) if start >= 0 else -1
         }
         
         chunk_data.append({
-            "content": chunk_text.strip(),
+            "content": stripped,
             "metadata": chunk_metadata
         })
     
     return chunk_data
 
-def load_markdown_to_chromadb():
-    """Load all Markdown files from the markdown directory into ChromaDB"""
+def build_quantized_index(collection, db_path: str, collection_name: str, quantization: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Build the quantized sidecar index for a collection and report recall vs memory
     
-    # Configuration
-    MARKDOWN_DIR = "backend/data/collections/LLM_Reasoning_Agents/markdown"
-    COLLECTION_NAME = "llm_reasoning_agents_papers"
-    CHROMA_DB_PATH = "backend/data/chromadb"
+    Args:
+        collection: ChromaDB collection holding the chunk embeddings
+        db_path: ChromaDB persistence directory
+        collection_name: Name of the collection
+        quantization: 'none', 'int8' or 'binary'; None keeps the collection's current setting
+        
+    Returns:
+        Recall-vs-memory report, or None when no quantized index is configured
+    """
+    index_dir = quantized_index_dir(db_path, collection_name)
+    if quantization is None:
+        existing = QuantizedVectorIndex.load_if_exists(index_dir)
+        if not existing:
+            return None
+        quantization = existing.quantization
     
-    # Chunking configuration
-    CHUNK_SIZE = 1000  # characters
-    CHUNK_OVERLAP = 200  # characters
+    print(f"🧮 Building {quantization} quantized index...")
+    stored = collection.get(include=["embeddings"])
+    index = QuantizedVectorIndex.build(index_dir, stored["ids"], stored["embeddings"], quantization,
+                                       metric=distance_metric_of(collection))
+    report = recall_memory_report(index)
     
-    # Create ChromaDB directory if it doesn't exist
-    os.makedirs(CHROMA_DB_PATH, exist_ok=True)
+    with open(os.path.join(index_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
     
-    print("🚀 Initializing ChromaDB...")
-    print("✅ Using LangChain MarkdownTextSplitter for intelligent chunking")
+    print(f"📊 Quantization report ({quantization}):")
+    print(f"   💾 float32: {report['float32_bytes'] / 1e6:.2f} MB -> resident: {report['resident_bytes'] / 1e6:.2f} MB "
+          f"({report['compression_ratio']}x)")
+    print(f"   🎯 recall@{report['k']}: {report['recall_at_k']} over {report['queries']} queries")
+    return report
+
+def update_quantized_index(collection, db_path: str, collection_name: str,
+                           paper_ids: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Replace the rows of changed papers in the quantized sidecar index
+
+    Only the current chunks of the given papers are read from the collection;
+    every other row is copied from the previous version. Falls back to a full
+    rebuild when the index no longer matches the collection.
     
-    # Initialize ChromaDB client
-    client = chromadb.PersistentClient(
-        path=CHROMA_DB_PATH,
-        settings=Settings(
-            anonymized_telemetry=False,
-            allow_reset=True
-        )
-    )
+    Args:
+        collection: ChromaDB collection holding the chunk embeddings
+        db_path: ChromaDB persistence directory
+        collection_name: Name of the collection
+        paper_ids: Papers that were added, re-chunked or removed
+        
+    Returns:
+        Row counts of the update (or the full rebuild's report), None when no quantized index is configured
+    """
+    index = QuantizedVectorIndex.load_if_exists(quantized_index_dir(db_path, collection_name))
+    if not index or not paper_ids:
+        return None
+    if index.metric != distance_metric_of(collection):
+        return build_quantized_index(collection, db_path, collection_name)
     
-    # Get or create collection
-    try:
-        collection = client.get_collection(name=COLLECTION_NAME)
-        print(f"📚 Using existing collection: {COLLECTION_NAME}")
-    except:
-        collection = client.create_collection(
-            name=COLLECTION_NAME,
-            metadata={"description": "LLM Reasoning Agents research papers converted from PDF to Markdown"}
-        )
-        print(f"📚 Created new collection: {COLLECTION_NAME}")
+    changed = set(paper_ids)
+    add_ids, add_embeddings = [], []
+    for start in range(0, len(paper_ids), PAPER_FETCH_BATCH):
+        batch = paper_ids[start:start + PAPER_FETCH_BATCH]
+        stored = collection.get(where={"paper_id": {"$in": batch}}, include=["embeddings"])
+        add_ids.extend(stored["ids"])
+        add_embeddings.extend(stored["embeddings"])
+    removed = [chunk_id for chunk_id in index.ids if paper_id_of_chunk(chunk_id) in changed]
+    updated = index.apply_changes(removed, add_ids, add_embeddings)
+    if updated.count != collection.count():
+        # Rows of papers changed outside these updates; the index has drifted from the collection
+        print(f"⚠️  Quantized index has {updated.count} rows for {collection.count()} chunks, rebuilding")
+        return build_quantized_index(collection, db_path, collection_name)
+    print(f"🧮 Quantized index updated: -{len(removed)} +{len(add_ids)} rows ({updated.count} total)")
+    return {"removed": len(removed), "added": len(add_ids), "count": updated.count}
+
+def calibrate_similarity_threshold(collection, db_path: str, collection_name: str,
+                                   sample_size: int = CALIBRATION_SAMPLE, seed: int = 0) -> Optional[float]:
+    """
+    Calibrate the similarity cutoff of a collection from its own embeddings
     
-    # Find all paper directories
-    paper_dirs = [d for d in os.listdir(MARKDOWN_DIR) if os.path.isdir(os.path.join(MARKDOWN_DIR, d))]
+    Chunks of different papers are treated as unrelated, so the high percentile
+    of their cosine similarities is the level a match has to beat to mean more
+    than sharing the corpus' vocabulary. The cutoff is stored with the index settings.
+    The sample is read in windows at random offsets, so the cost is bounded by
+    sample_size however large the collection is.
     
-    if not paper_dirs:
-        print(f"❌ No paper directories found in {MARKDOWN_DIR}")
-        return
+    Args:
+        collection: ChromaDB collection holding the chunk embeddings
+        db_path: ChromaDB persistence directory
+        collection_name: Name of the collection
+        sample_size: Maximum number of chunks sampled
+        seed: Random seed for sampling
+        
+    Returns:
+        The calibrated cutoff, or None when the collection has too few papers
+    """
+    total = collection.count()
+    if total < 2:
+        return None
+    rng = np.random.default_rng(seed)
+    if total <= sample_size:
+        offsets, window = [0], total
+    else:
+        window = max(1, sample_size // CALIBRATION_WINDOWS)
+        offsets = np.unique(rng.integers(0, total - window + 1, size=CALIBRATION_WINDOWS))
+    embeddings, papers = [], []
+    for offset in offsets:
+        stored = collection.get(limit=window, offset=int(offset), include=["embeddings", "metadatas"])
+        embeddings.extend(stored["embeddings"])
+        papers.extend((metadata or {}).get("paper_id", "") for metadata in stored["metadatas"])
+    # Overlapping windows return some chunks twice; a chunk is never unrelated to itself
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1.0, norms)
+    papers = np.array(papers)
     
-    print(f"📁 Found {len(paper_dirs)} paper directories")
+    similarities = vectors @ vectors.T
+    unrelated = papers[:, None] != papers[None, :]
+    if not unrelated.any():
+        return None
+    threshold = round(float(np.percentile(similarities[unrelated], CALIBRATION_PERCENTILE)), 4)
+    save_index_settings(db_path, collection_name, {MIN_SIMILARITY_KEY: threshold})
+    print(f"🎚️  Similarity cutoff: {threshold} (p{CALIBRATION_PERCENTILE} of unrelated chunks, {len(vectors)} sampled)")
+    return threshold
+
+def find_markdown_files(markdown_dir: str, paper_ids: Optional[List[str]] = None) -> List[str]:
+    """
+    Find MinerU markdown outputs in a collection's markdown directory
+    
+    Args:
+        markdown_dir: Directory containing {paper_id}.md/{paper_id}/auto/{paper_id}.md trees
+        paper_ids: Only return these papers (all papers when None)
+        
+    Returns:
+        List of markdown file paths
+    """
+    if not os.path.isdir(markdown_dir):
+        print(f"❌ Markdown directory not found: {markdown_dir}")
+        return []
+    
+    # Find all paper directories
+    paper_dirs = sorted(d for d in os.listdir(markdown_dir) if os.path.isdir(os.path.join(markdown_dir, d)))
     
-    # Find markdown files within each paper directory
     markdown_files = []
     for paper_dir in paper_dirs:
         # Extract paper ID from folder name (remove .md extension)
         paper_id = paper_dir.replace('.md', '')
+        if paper_ids is not None and paper_id not in paper_ids:
+            continue
         # Expected path: {paper_dir}/{paper_id}/auto/{paper_id}.md
-        expected_md_path = os.path.join(MARKDOWN_DIR, paper_dir, paper_id, "auto", f"{paper_id}.md")
+        expected_md_path = os.path.join(markdown_dir, paper_dir, paper_id, "auto", f"{paper_id}.md")
         if os.path.exists(expected_md_path):
             markdown_files.append(expected_md_path)
         else:
             print(f"⚠️  Expected markdown file not found: {expected_md_path}")
     
-    if not markdown_files:
-        print(f"❌ No markdown files found in paper directories")
-        return
+    return markdown_files
+
+def paper_id_from_path(file_path: str) -> str:
+    """Paper ID of a markdown file at .../markdown/{paper_id}.md/{paper_id}/auto/{paper_id}.md"""
+    path_parts = os.path.normpath(file_path).split(os.sep)
+    return path_parts[-4].replace('.md', '')  # Get the outer folder name without .md
+
+def prepare_paper_chunks(file_path: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> Optional[Dict[str, Any]]:
+    """
+    Chunk one paper and build its chunk rows and paper row
     
-    print(f"📄 Found {len(markdown_files)} markdown files in paper directories")
-    print(f"🔪 Chunking with size: {CHUNK_SIZE} chars, overlap: {CHUNK_OVERLAP} chars")
-    print("🔄 Loading files into ChromaDB...")
+    Args:
+        file_path: Path to the paper's markdown file
+        chunk_size: Target chunk size in characters
+        chunk_overlap: Overlap between chunks in characters
+        
+    Returns:
+        Dictionary with paper_id, ids, documents, metadatas and paper, or None for empty files
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
     
-    # Prepare data for batch insertion
+    if not content.strip():
+        return None
+    
+    paper_id = paper_id_from_path(file_path)
+    filename = f"{paper_id}.md"
+    
+    ids = []
     documents = []
     metadatas = []
-    ids = []
+    for chunk_data in chunk_markdown_document(content, chunk_size, chunk_overlap):
+        chunk_content = chunk_data["content"]
+        chunk_metadata = chunk_data["metadata"]
+        
+        # Create unique ID for this chunk
+        chunk_hash = hashlib.md5(chunk_content.encode()).hexdigest()[:8]
+        ids.append(f"{paper_id}_chunk_{chunk_metadata['chunk_id']}_{chunk_hash}")
+        documents.append(chunk_content)
+        
+        # Prepare compact per-chunk metadata
+        metadatas.append(compact_chunk_metadata(
+            paper_id,
+            chunk_metadata["chunk_id"],
+            chunk_metadata["start"],
+            chunk_metadata["end"],
+            " | ".join(chunk_metadata["headers"][-3:])  # Last 3 headers
+        ))
+    
+    # Paper-level fields are stored once in the paper table
+    paper = {
+        "paper_id": paper_id,
+        "filename": filename,
+        "file_path": os.path.abspath(file_path),
+        "source": "pdf_conversion",
+        "conversion_tool": "mineru",
+        "chunking_tool": "langchain",
+        "folder_structure": "paper_directory",
+        "loaded_at": datetime.now().isoformat()
+    }
     
-    total_chunks = 0
+    return {"paper_id": paper_id, "ids": ids, "documents": documents, "metadatas": metadatas, "paper": paper}
+
+def get_or_create_chunk_collection(client, db_path: str, collection_name: str, metric: Optional[str] = None):
+    """
+    Get the chunk collection, creating it with its configured index settings
+    
+    The distance metric is fixed when a collection is created; an existing
+    collection with a different metric has to be migrated with migrate_distance_metric.py
+    """
+    try:
+        collection = client.get_collection(name=collection_name)
+        print(f"📚 Using existing collection: {collection_name}")
+        if metric is not None and distance_metric_of(collection) != metric:
+            print(f"⚠️  {collection_name} uses the {distance_metric_of(collection)} metric, not {metric}; "
+                  f"run migrate_distance_metric.py to change it")
+    except Exception:
+        collection = client.create_collection(
+            name=collection_name,
+            metadata=collection_creation_metadata(
+                db_path,
+                collection_name,
+                {"description": "LLM Reasoning Agents research papers converted from PDF to Markdown"},
+                metric=metric
+            )
+        )
+        print(f"📚 Created new collection: {collection_name} ({distance_metric_of(collection)} distance)")
+    return collection
+
+def group_of_markdown_dir(markdown_dir: str) -> str:
+    """Document group of a collections/{group}/markdown directory"""
+    return os.path.basename(os.path.dirname(os.path.normpath(markdown_dir)))
+
+def ingest_markdown_files(markdown_files: List[str], collection, db_path: str, collection_name: str,
+                          chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP,
+                          progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          on_paper_changed: Optional[Callable[[str], None]] = None,
+                          group_ids: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Chunk, embed and insert papers into a collection
+    
+    Each paper is reconciled against the chunks already stored for it: new
+    chunks are added, unchanged chunks are kept (not re-embedded) and chunks
+    that no longer exist in the paper are deleted.
+    
+    Args:
+        markdown_files: Markdown files to ingest
+        collection: Target ChromaDB collection
+        db_path: ChromaDB persistence directory (holds the paper table)
+        collection_name: Name of the collection
+        chunk_size: Target chunk size in characters
+        chunk_overlap: Overlap between chunks in characters
+        progress: Optional callback receiving counters after each paper
+        on_paper_changed: Optional callback receiving the ID of each paper whose chunks changed
+        group_ids: Document groups the ingested papers are added to
+        
+    Returns:
+        Counters for papers, added, unchanged and deleted chunks
+    """
+    paper_store = PaperStore(db_path)
+    ingested = []
+    counts = {"papers": 0, "chunks_added": 0, "chunks_unchanged": 0, "chunks_deleted": 0, "failed": 0}
     
     for file_path in markdown_files:
         try:
-            # Read markdown content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if not content.strip():
+            prepared = prepare_paper_chunks(file_path, chunk_size, chunk_overlap)
+            if not prepared:
                 print(f"⚠️  Skipping empty file: {os.path.basename(file_path)}")
                 continue
             
-            # Extract paper ID from the folder structure
-            # Path format: .../markdown/{paper_id}.md/{paper_id}/auto/{paper_id}.md
-            path_parts = file_path.split(os.sep)
-            paper_id = path_parts[-4].replace('.md', '')  # Get the outer folder name without .md
-            filename = f"{paper_id}.md"
+            print(f"📄 {prepared['paper']['filename']}: {len(prepared['ids'])} chunks created")
+            
+            existing_ids = set(collection.get(where={"paper_id": prepared["paper_id"]}, include=[])["ids"])
+            new_ids = set(prepared["ids"])
+            
+            stale_ids = sorted(existing_ids - new_ids)
+            if stale_ids:
+                collection.delete(ids=stale_ids)
             
-            # Chunk the document
-            chunks = chunk_markdown_document(content, CHUNK_SIZE, CHUNK_OVERLAP)
+            to_add = [i for i, chunk_id in enumerate(prepared["ids"]) if chunk_id not in existing_ids]
+            if to_add:
+                collection.add(
+                    documents=[prepared["documents"][i] for i in to_add],
+                    metadatas=[prepared["metadatas"][i] for i in to_add],
+                    ids=[prepared["ids"][i] for i in to_add]
+                )
             
-            print(f"📄 {filename}: {len(chunks)} chunks created")
+            paper_store.upsert_papers(collection_name, [prepared["paper"]])
+            ingested.append(prepared["paper_id"])
+            if on_paper_changed and (to_add or stale_ids):
+                on_paper_changed(prepared["paper_id"])
             
-            # Process each chunk
-            for chunk_data in chunks:
-                chunk_content = chunk_data["content"]
-                chunk_metadata = chunk_data["metadata"]
-                
-                # Create unique ID for this chunk
-                chunk_hash = hashlib.md5(chunk_content.encode()).hexdigest()[:8]
-                unique_id = f"{paper_id}_chunk_{chunk_metadata['chunk_id']}_{chunk_hash}"
-                
-                # Prepare metadata
-                metadata = {
-                    "filename": filename,
-                    "paper_id": paper_id,
-                    "chunk_id": chunk_metadata["chunk_id"],
-                    "chunk_size": chunk_metadata["chunk_size"],
-                    "headers": " | ".join(chunk_metadata["headers"][-3:]),  # Last 3 headers
-                    "section_type": chunk_metadata["section_type"],
-                    "source": "pdf_conversion",
-                    "conversion_tool": "mineru",
-                    "chunking_tool": "langchain",
-                    "folder_structure": "paper_directory",
-                    "word_count": len(chunk_content.split()),
-                    "loaded_at": datetime.now().isoformat(),
-                    "file_path": file_path
-                }
-                
-                # Add to batch
-                documents.append(chunk_content)
-                metadatas.append(metadata)
-                ids.append(unique_id)
-                total_chunks += 1
+            counts["papers"] += 1
+            counts["chunks_added"] += len(to_add)
+            counts["chunks_unchanged"] += len(new_ids) - len(to_add)
+            counts["chunks_deleted"] += len(stale_ids)
             
         except Exception as e:
             print(f"❌ Error processing {file_path}: {str(e)}")
-            continue
+            counts["failed"] += 1
+        
+        if progress:
+            progress(dict(counts))
+    
+    if group_ids:
+        group_index = DocumentGroupIndex(db_path)
+        for group_id in group_ids:
+            group_index.add_papers(collection_name, group_id, ingested)
+    return counts
+
+def remove_papers(paper_ids: List[str], collection, db_path: str, collection_name: str) -> int:
+    """
+    Delete all chunks and the paper rows of papers that no longer exist
+    
+    Args:
+        paper_ids: Papers to remove
+        collection: ChromaDB collection
+        db_path: ChromaDB persistence directory (holds the paper table)
+        collection_name: Name of the collection
+        
+    Returns:
+        Number of deleted chunks
+    """
+    paper_store = PaperStore(db_path)
+    deleted = 0
+    for paper_id in paper_ids:
+        chunk_ids = collection.get(where={"paper_id": paper_id}, include=[])["ids"]
+        if chunk_ids:
+            collection.delete(ids=chunk_ids)
+            deleted += len(chunk_ids)
+        paper_store.delete_paper(collection_name, paper_id)
+        print(f"🗑️  Removed {paper_id}: {len(chunk_ids)} chunks")
+    DocumentGroupIndex(db_path).remove_papers(collection_name, paper_ids)
+    return deleted
+
+def load_markdown_to_chromadb(quantization: Optional[str] = None, markdown_dir: str = MARKDOWN_DIR,
+                              collection_name: str = COLLECTION_NAME, db_path: str = CHROMA_DB_PATH,
+                              paper_ids: Optional[List[str]] = None, group_ids: Optional[List[str]] = None,
+                              metric: Optional[str] = None):
+    """
+    Load all Markdown files from the markdown directory into ChromaDB
     
-    if not documents:
-        print("❌ No valid documents to insert")
+    Args:
+        quantization: Embedding quantization for the collection ('none', 'int8', 'binary');
+            None keeps the setting chosen at the previous ingest
+        markdown_dir: Directory with the MinerU markdown outputs
+        collection_name: Chunk collection to load into
+        db_path: ChromaDB persistence directory
+        paper_ids: Only load these papers (all papers when None)
+        group_ids: Document groups of the papers (default: the collection directory holding markdown_dir)
+        metric: Distance metric of a new collection ('cosine', 'ip', 'l2'; default cosine)
+    """
+    # Create ChromaDB directory if it doesn't exist
+    os.makedirs(db_path, exist_ok=True)
+    
+    print("🚀 Initializing ChromaDB...")
+    print("✅ Using LangChain MarkdownTextSplitter for intelligent chunking")
+    
+    # Initialize ChromaDB client
+    client = chromadb.PersistentClient(
+        path=db_path,
+        settings=Settings(
+            anonymized_telemetry=False,
+            allow_reset=True
+        )
+    )
+    
+    # Get or create collection
+    collection = get_or_create_chunk_collection(client, db_path, collection_name, metric)
+    
+    markdown_files = find_markdown_files(markdown_dir, paper_ids)
+    if not markdown_files:
+        print(f"❌ No markdown files found in {markdown_dir}")
         return
     
-    # Insert documents into ChromaDB
+    print(f"📄 Found {len(markdown_files)} markdown files in paper directories")
+    print(f"🔪 Chunking with size: {CHUNK_SIZE} chars, overlap: {CHUNK_OVERLAP} chars")
+    print("🔄 Loading files into ChromaDB...")
+    
     try:
-        print(f"📤 Inserting {len(documents)} chunks into ChromaDB...")
-        
-        # Check if documents already exist to avoid duplicates
-        existing_ids = []
-        if collection.count() > 0:
-            # Get existing IDs (this is a simplified check)
-            existing_ids = [id for id in ids if collection.get(ids=[id])['ids']]
+        counts = ingest_markdown_files(markdown_files, collection, db_path, collection_name,
+                                       group_ids=group_ids or [group_of_markdown_dir(markdown_dir)])
         
-        # Filter out existing documents
-        new_documents = []
-        new_metadatas = []
-        new_ids = []
+        print(f"✅ Successfully inserted {counts['chunks_added']} new chunks")
+        if counts["chunks_unchanged"]:
+            print(f"ℹ️  {counts['chunks_unchanged']} chunks already exist in collection")
+        if counts["chunks_deleted"]:
+            print(f"🗑️  Removed {counts['chunks_deleted']} stale chunks")
         
-        for i, doc_id in enumerate(ids):
-            if doc_id not in existing_ids:
-                new_documents.append(documents[i])
-                new_metadatas.append(metadatas[i])
-                new_ids.append(doc_id)
-        
-        if new_documents:
-            collection.add(
-                documents=new_documents,
-                metadatas=new_metadatas,
-                ids=new_ids
-            )
-            print(f"✅ Successfully inserted {len(new_documents)} new chunks")
-        else:
-            print("ℹ️  All chunks already exist in collection")
+        build_quantized_index(collection, db_path, collection_name, quantization)
+        calibrate_similarity_threshold(collection, db_path, collection_name)
         
         # Print collection statistics
         total_count = collection.count()
         print(f"📊 Collection now contains {total_count} chunks")
-        print(f"📄 Average chunks per paper: {total_count / len(paper_dirs):.1f}")
+        print(f"📄 Average chunks per paper: {total_count / max(1, counts['papers']):.1f}")
         
         # Show some sample queries
         print("\n🔍 Sample queries you can try:")
@@ -239,27 +521,24 @@ def load_markdown_to_chromadb():
         return
     
     print("\n🎉 ChromaDB loading complete!")
-    print(f"📁 Database location: {CHROMA_DB_PATH}")
-    print(f"📚 Collection name: {COLLECTION_NAME}")
+    print(f"📁 Database location: {db_path}")
+    print(f"📚 Collection name: {collection_name}")
     print(f"🔪 Chunking strategy: {CHUNK_SIZE} chars with {CHUNK_OVERLAP} overlap")
     print(f"🛠️  Chunking tool: LangChain MarkdownTextSplitter")
 
-def test_collection():
+def test_collection(collection_name: str = COLLECTION_NAME, db_path: str = CHROMA_DB_PATH):
     """Test the collection with a sample query"""
     
-    CHROMA_DB_PATH = "backend/data/chromadb"
-    COLLECTION_NAME = "llm_reasoning_agents_papers"
-    
     try:
         # Use the same settings as the main function to avoid conflicts
         client = chromadb.PersistentClient(
-            path=CHROMA_DB_PATH,
+            path=db_path,
             settings=Settings(
                 anonymized_telemetry=False,
                 allow_reset=True
             )
         )
-        collection = client.get_collection(name=COLLECTION_NAME)
+        collection = client.get_collection(name=collection_name)
         
         print("\n🧪 Testing collection with sample query...")
         
@@ -277,8 +556,8 @@ def test_collection():
             if results['metadatas'] and results['metadatas'][0]:
                 first_metadata = results['metadatas'][0][0]
                 print(f"📋 Sample chunk: {first_metadata.get('paper_id', 'Unknown')} - Chunk {first_metadata.get('chunk_id', 'Unknown')}")
-                print(f"📝 Headers: {first_metadata.get('headers', 'None')}")
-                print(f"🛠️  Chunking tool: {first_metadata.get('chunking_tool', 'Unknown')}")
+                print(f"📝 Section: {first_metadata.get('section', first_metadata.get('headers', 'None'))}")
+                print(f"📍 Offsets: {first_metadata.get('start', '?')}-{first_metadata.get('end', '?')}")
         else:
             print("ℹ️  No results found for test query")
             
@@ -286,15 +565,34 @@ def test_collection():
         print(f"❌ Error testing collection: {str(e)}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load converted Markdown files into ChromaDB')
+    parser.add_argument('--quantization', choices=QUANTIZATION_MODES, default=None,
+                        help='Store embeddings quantized for search (default: keep the current setting)')
+    parser.add_argument('--metric', choices=DISTANCE_METRICS, default=None,
+                        help='Distance metric of a new collection (default: cosine)')
+    parser.add_argument('--markdown-dir', default=MARKDOWN_DIR, help='Directory with MinerU markdown outputs')
+    parser.add_argument('--collection', default=COLLECTION_NAME, help='Chunk collection name')
+    parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+    parser.add_argument('--group', dest='groups', action='append',
+                        help='Document group of the papers, repeatable (default: the collection directory name)')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("📚 ChromaDB Markdown Loader (LangChain)")
     print("=" * 60)
     
     # Load documents
-    load_markdown_to_chromadb()
+    load_markdown_to_chromadb(
+        quantization=args.quantization,
+        markdown_dir=args.markdown_dir,
+        collection_name=args.collection,
+        db_path=args.db_path,
+        group_ids=args.groups,
+        metric=args.metric
+    )
     
     # Test the collection
-    test_collection()
+    test_collection(args.collection, args.db_path)
     
     print("\n" + "=" * 60)
     print("✨ Script completed!")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Migrate an existing chunk collection to the compact metadata schema
+Paper-level fields move to the paper table and chunk rows keep only
+paper_id, chunk_id, offsets and section. Embeddings are copied, not recomputed.
+Usage: python migrate_chunk_metadata.py [--collection NAME] [--db-path PATH]
+"""
+
+import os
+import argparse
+from typing import Dict, Any, Optional
+
+import chromadb
+from chromadb.config import Settings
+
+from paper_store import PAPER_FIELDS, CHUNK_FIELDS, PaperStore, compact_chunk_metadata
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "chromadb")
+BATCH_SIZE = 500
+
+
+def _read_source(file_path: str, cache: Dict[str, Optional[str]]) -> Optional[str]:
+    """Read a paper's markdown once so chunk offsets can be recovered"""
+    if file_path not in cache:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                cache[file_path] = f.read()
+        except Exception:
+            cache[file_path] = None
+    return cache[file_path]
+
+
+def _compact(document: str, metadata: Dict[str, Any], source: Optional[str]) -> Dict[str, Any]:
+    start = source.find(document) if source else -1
+    return compact_chunk_metadata(
+        metadata.get("paper_id", "unknown"),
+        metadata.get("chunk_id", -1),
+        start,
+        start + len(document) if start >= 0 else -1,
+        metadata.get("section", metadata.get("headers", ""))
+    )
+
+
+def migrate_collection(client, db_path: str, collection_name: str) -> Dict[str, int]:
+    """
+    Rewrite a collection with compact chunk metadata
+
+    The compact rows are written to a temporary collection first; the original
+    is only replaced once the copy is complete.
+
+    Args:
+        client: ChromaDB client
+        db_path: ChromaDB persistence directory (holds the paper table)
+        collection_name: Collection to migrate
+
+    Returns:
+        Counts of migrated chunks and papers
+    """
+    source_collection = client.get_collection(name=collection_name)
+    temp_name = f"{collection_name}_compact_tmp"
+    try:
+        client.delete_collection(temp_name)
+    except Exception:
+        pass
+    target = client.create_collection(name=temp_name, metadata=source_collection.metadata)
+
+    papers: Dict[str, Dict[str, Any]] = {}
+    sources: Dict[str, Optional[str]] = {}
+    total = source_collection.count()
+    migrated = 0
+
+    for offset in range(0, total, BATCH_SIZE):
+        batch = source_collection.get(
+            limit=BATCH_SIZE,
+            offset=offset,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        compact = []
+        for document, metadata in zip(batch["documents"], batch["metadatas"]):
+            paper_id = metadata.get("paper_id", "unknown")
+            if paper_id not in papers:
+                papers[paper_id] = {"paper_id": paper_id}
+                papers[paper_id].update({f: metadata[f] for f in PAPER_FIELDS if f in metadata})
+
+            if set(metadata) <= set(CHUNK_FIELDS):
+                compact.append(metadata)
+            else:
+                compact.append(_compact(document, metadata, _read_source(metadata.get("file_path", ""), sources)))
+
+        target.add(
+            ids=batch["ids"],
+            embeddings=batch["embeddings"],
+            documents=batch["documents"],
+            metadatas=compact
+        )
+        migrated += len(batch["ids"])
+        print(f"   🔄 {migrated}/{total} chunks")
+
+    # Papers that were already compact keep their existing paper rows
+    store = PaperStore(db_path)
+    existing = store.get_papers(collection_name)
+    new_rows = [row for paper_id, row in papers.items() if len(row) > 1 or paper_id not in existing]
+    store.upsert_papers(collection_name, new_rows)
+
+    client.delete_collection(collection_name)
+    target.modify(name=collection_name)
+    return {"chunks": migrated, "papers": len(papers)}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Migrate chunk metadata to the compact schema')
+    parser.add_argument('--collection', default="llm_reasoning_agents_papers", help='Collection to migrate')
+    parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+    args = parser.parse_args()
+
+    print("🚀 Compact Chunk Metadata Migration")
+    print("=" * 60)
+    print(f"📚 Collection: {args.collection}")
+
+    client = chromadb.PersistentClient(
+        path=args.db_path,
+        settings=Settings(anonymized_telemetry=False, allow_reset=True)
+    )
+    counts = migrate_collection(client, args.db_path, args.collection)
+
+    print(f"✅ Migrated {counts['chunks']} chunks from {counts['papers']} papers")
+    print(f"📋 Paper table: {os.path.join(args.db_path, 'papers.sqlite3')}")
+
+
+if __name__ == "__main__":
+    main()
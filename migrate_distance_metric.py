@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Migrate an existing collection to another distance metric
+ChromaDB fixes a collection's metric when it is created, so the collection is
+copied into a new one with the requested hnsw:space. Embeddings are copied
+(unit-normalized, not recomputed), then the quantized sidecar index is rebuilt
+and the similarity cutoff recalibrated.
+Usage: python migrate_distance_metric.py [--collection NAME] [--metric {cosine,ip,l2}] [--db-path PATH]
+"""
+
+import os
+import argparse
+from typing import Dict, Any
+
+import numpy as np
+import chromadb
+from chromadb.config import Settings
+
+from collection_config import DISTANCE_METRICS, DEFAULT_DISTANCE_METRIC, SPACE_KEY, distance_metric_of
+from quantized_index import QuantizedVectorIndex, quantized_index_dir
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "chromadb")
+BATCH_SIZE = 500
+
+
+def _normalize(embeddings) -> np.ndarray:
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def migrate_collection(client, db_path: str, collection_name: str,
+                       metric: str = DEFAULT_DISTANCE_METRIC) -> Dict[str, Any]:
+    """
+    Rewrite a collection with a new distance metric
+
+    The copy is written to a temporary collection first; the original is only
+    replaced once the copy is complete.
+
+    Args:
+        client: ChromaDB client
+        db_path: ChromaDB persistence directory
+        collection_name: Collection to migrate
+        metric: Target metric ('cosine', 'ip' or 'l2')
+
+    Returns:
+        Previous and new metric and the number of migrated chunks
+    """
+    if metric not in DISTANCE_METRICS:
+        raise ValueError(f"Unsupported distance metric: {metric}")
+    source_collection = client.get_collection(name=collection_name)
+    previous = distance_metric_of(source_collection)
+    if previous == metric:
+        return {"previous_metric": previous, "metric": metric, "chunks": 0}
+
+    temp_name = f"{collection_name}_metric_tmp"
+    try:
+        client.delete_collection(temp_name)
+    except Exception:
+        pass
+    target = client.create_collection(name=temp_name,
+                                      metadata={**(source_collection.metadata or {}), SPACE_KEY: metric})
+
+    total = source_collection.count()
+    migrated = 0
+    for offset in range(0, total, BATCH_SIZE):
+        batch = source_collection.get(
+            limit=BATCH_SIZE,
+            offset=offset,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        if not batch["ids"]:
+            break
+        # Unit vectors make ip and cosine agree and l2 a monotone function of both
+        target.add(
+            ids=batch["ids"],
+            embeddings=_normalize(batch["embeddings"]).tolist(),
+            documents=batch["documents"],
+            metadatas=batch["metadatas"]
+        )
+        migrated += len(batch["ids"])
+        print(f"   🔄 {migrated}/{total} chunks")
+
+    client.delete_collection(collection_name)
+    target.modify(name=collection_name)
+    return {"previous_metric": previous, "metric": metric, "chunks": migrated}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Migrate a collection to another distance metric')
+    parser.add_argument('--collection', default="llm_reasoning_agents_papers", help='Collection to migrate')
+    parser.add_argument('--metric', choices=DISTANCE_METRICS, default=DEFAULT_DISTANCE_METRIC,
+                        help='Target distance metric')
+    parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='ChromaDB persistence directory')
+    args = parser.parse_args()
+
+    print("🚀 Distance Metric Migration")
+    print("=" * 60)
+    print(f"📚 Collection: {args.collection}")
+
+    client = chromadb.PersistentClient(
+        path=args.db_path,
+        settings=Settings(anonymized_telemetry=False, allow_reset=True)
+    )
+    result = migrate_collection(client, args.db_path, args.collection, args.metric)
+    if not result["chunks"]:
+        print(f"ℹ️  {args.collection} already uses the {args.metric} metric")
+        return
+    print(f"✅ Migrated {result['chunks']} chunks from {result['previous_metric']} to {result['metric']}")
+
+    # The loader pulls in langchain, so it is only imported once the copy is done
+    import load_to_chromadb
+    collection = client.get_collection(name=args.collection)
+    if QuantizedVectorIndex.load_if_exists(quantized_index_dir(args.db_path, args.collection)):
+        load_to_chromadb.build_quantized_index(collection, args.db_path, args.collection)
+    load_to_chromadb.calibrate_similarity_threshold(collection, args.db_path, args.collection)
+    print("🔄 Restart the backend (or run an ingest job) to pick up the new metric")
+
+
+if __name__ == "__main__":
+    main()
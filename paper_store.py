@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Paper-level metadata table shared by all chunks of a paper
+Chunk rows in ChromaDB only keep a compact record (paper_id, chunk_id, offsets,
+section); fields that are constant per paper live here and are joined in memory
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import List, Dict, Any
+
+PAPER_STORE_FILE = "papers.sqlite3"
+
+# Fields stored once per paper instead of once per chunk
+PAPER_FIELDS = (
+    "filename", "file_path", "source", "conversion_tool",
+    "chunking_tool", "folder_structure", "loaded_at"
+)
+
+# Keys of the compact per-chunk metadata record
+CHUNK_FIELDS = ("paper_id", "chunk_id", "start", "end", "section")
+
+
+def compact_chunk_metadata(paper_id: str, chunk_id: int, start: int, end: int, section: str) -> Dict[str, Any]:
+    """Build the compact metadata record stored with every chunk"""
+    return {
+        "paper_id": paper_id,
+        "chunk_id": chunk_id,
+        "start": start,
+        "end": end,
+        "section": section
+    }
+
+
+class PaperStore:
+    """SQLite-backed table of per-paper metadata, keyed by collection and paper ID"""
+
+    def __init__(self, db_path: str):
+        self.path = os.path.join(db_path, PAPER_STORE_FILE)
+        os.makedirs(db_path, exist_ok=True)
+        with self._connect() as conn:
+            columns = ", ".join(f"{field} TEXT" for field in PAPER_FIELDS)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS papers ("
+                f"collection TEXT NOT NULL, paper_id TEXT NOT NULL, {columns}, "
+                f"PRIMARY KEY (collection, paper_id))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert_papers(self, collection_name: str, papers: List[Dict[str, Any]]):
+        """
+        Insert or replace paper rows
+
+        Args:
+            collection_name: Chunk collection the papers belong to
+            papers: Dictionaries with 'paper_id' and any of PAPER_FIELDS
+        """
+        with self._connect() as conn:
+            self._insert_papers(conn, collection_name, papers)
+
+    def replace_papers(self, collection_name: str, papers: List[Dict[str, Any]]):
+        """
+        Replace all paper rows of a collection in one transaction
+
+        Args:
+            collection_name: Chunk collection the papers belong to
+            papers: Dictionaries with 'paper_id' and any of PAPER_FIELDS
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM papers WHERE collection = ?", (collection_name,))
+            self._insert_papers(conn, collection_name, papers)
+
+    @staticmethod
+    def _insert_papers(conn, collection_name: str, papers: List[Dict[str, Any]]):
+        columns = ("collection", "paper_id") + PAPER_FIELDS
+        placeholders = ", ".join("?" for _ in columns)
+        rows = [
+            (collection_name, paper["paper_id"]) + tuple(paper.get(field) for field in PAPER_FIELDS)
+            for paper in papers
+        ]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO papers ({', '.join(columns)}) VALUES ({placeholders})",
+            rows
+        )
+
+    def get_papers(self, collection_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Load all paper rows of a collection
+
+        Args:
+            collection_name: Chunk collection name
+
+        Returns:
+            Dictionary mapping paper_id to its paper-level fields
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"SELECT paper_id, {', '.join(PAPER_FIELDS)} FROM papers WHERE collection = ?",
+                (collection_name,)
+            )
+            return {
+                row[0]: {field: value for field, value in zip(PAPER_FIELDS, row[1:]) if value is not None}
+                for row in cursor.fetchall()
+            }
+
+    def delete_paper(self, collection_name: str, paper_id: str):
+        """Remove a paper row"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM papers WHERE collection = ? AND paper_id = ?", (collection_name, paper_id))
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Quantized embedding storage for ChromaDB collections
+Keeps int8 or binary codes in memory for a fast first pass and rescores
+the top candidates against full-precision vectors memory-mapped from disk.
+Distances are reported in the collection's metric, so they compare directly
+with ChromaDB's own results.
+"""
+
+import os
+import json
+import time
+import shutil
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+INDEX_METRICS = ("cosine", "ip", "l2")
+# Tolerance on vector norms for treating stored embeddings as unit-normalized
+NORMALIZED_TOLERANCE = 1e-3
+INDEX_FORMAT_VERSION = 1
+DEFAULT_OVERSAMPLE = 10
+# Rows scored per block so the first pass never materializes a float copy of all codes
+SCORING_BLOCK_ROWS = 65536
+CURRENT_FILE = "CURRENT"
+
+# Number of set bits for every byte value, used for Hamming distances
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def quantized_index_dir(db_path: str, collection_name: str) -> str:
+    """Directory holding the quantized sidecar index of a collection"""
+    return os.path.join(db_path, "quantized", collection_name)
+
+
+def _prune_versions(index_dir: str, keep: str, retain: int = 2):
+    """Remove old index versions, keeping the newest few (open mmaps stay valid on POSIX)"""
+    versions = sorted(
+        (name for name in os.listdir(index_dir) if name.startswith("v") and name != keep),
+        key=lambda name: int(name[1:]) if name[1:].isdigit() else 0
+    )
+    for name in versions[:max(0, len(versions) - (retain - 1))]:
+        shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+
+def _quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 scalar quantization"""
+    scales = np.abs(embeddings).max(axis=1)
+    scales[scales == 0] = 1.0
+    codes = np.round(embeddings / scales[:, None] * 127.0).astype(np.int8)
+    return codes, (scales / 127.0).astype(np.float32)
+
+
+def _quantize_binary(embeddings: np.ndarray) -> np.ndarray:
+    """Sign-bit quantization packed into uint8 words"""
+    return np.packbits(embeddings > 0, axis=1)
+
+
+def _is_normalized(vectors: np.ndarray) -> bool:
+    norms = np.linalg.norm(vectors, axis=1)
+    return bool(len(vectors)) and bool(np.all(np.abs(norms - 1.0) <= NORMALIZED_TOLERANCE))
+
+
+def _squared_l2(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Squared L2 distances, matching ChromaDB's default 'l2' space"""
+    diff = vectors - query[None, :]
+    return np.einsum("ij,ij->i", diff, diff)
+
+
+class QuantizedVectorIndex:
+    """Sidecar index with quantized codes in RAM and float32 vectors on disk"""
+
+    def __init__(self, index_dir: str, root_dir: Optional[str] = None):
+        self.index_dir = index_dir
+        # Collection index directory holding CURRENT; new versions are written there
+        self.root_dir = root_dir or index_dir
+        with open(os.path.join(index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(index_dir, "ids.json"), "r", encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)
+
+        self.quantization = self.manifest["quantization"]
+        self.dim = self.manifest["dim"]
+        # Indexes built before metric support always scored by squared L2
+        self.metric = self.manifest.get("metric", "l2")
+        self.normalized = self.manifest.get("normalized", False)
+
+        # Full-precision vectors stay on disk and are paged in only for rescoring
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.codes = None
+        self.scales = None
+        if self.quantization == "int8":
+            self.codes = np.load(os.path.join(index_dir, "codes.npy"))
+            self.scales = np.load(os.path.join(index_dir, "scales.npy"))
+        elif self.quantization == "binary":
+            self.codes = np.load(os.path.join(index_dir, "codes.npy"))
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load_if_exists(cls, index_dir: str) -> Optional["QuantizedVectorIndex"]:
+        """Load the current version of the index, or return None if none was built"""
+        current_path = os.path.join(index_dir, CURRENT_FILE)
+        if not os.path.exists(current_path):
+            # Indexes built before versioning keep their files directly in index_dir
+            return cls(index_dir) if os.path.exists(os.path.join(index_dir, "manifest.json")) else None
+        with open(current_path, "r", encoding="utf-8") as f:
+            version_dir = os.path.join(index_dir, f.read().strip())
+        return cls(version_dir, index_dir)
+
+    @classmethod
+    def build(cls, index_dir: str, ids: List[str], embeddings: Any, quantization: str,
+              metric: str = "l2") -> "QuantizedVectorIndex":
+        """
+        Build and persist a new version of a quantized index
+
+        Each build writes a fresh version directory and then atomically repoints
+        CURRENT at it, so readers that memory-mapped the previous version keep
+        working while the index is rebuilt.
+
+        Args:
+            index_dir: Index directory of the collection
+            ids: Chunk IDs in the same order as embeddings
+            embeddings: Full-precision embeddings (N x dim)
+            quantization: One of 'none', 'int8' or 'binary'
+            metric: Distance metric of the collection ('cosine', 'ip' or 'l2')
+
+        Returns:
+            The loaded index
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        if metric not in INDEX_METRICS:
+            raise ValueError(f"Unsupported distance metric: {metric}")
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("embeddings must be a 2-D array with one row per id")
+        codes, scales = cls._quantize(vectors, quantization)
+        return cls._write_version(index_dir, list(ids), vectors, codes, scales, quantization, metric,
+                                  _is_normalized(vectors))
+
+    @staticmethod
+    def _quantize(vectors: np.ndarray, quantization: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        if quantization == "int8":
+            return _quantize_int8(vectors)
+        if quantization == "binary":
+            return _quantize_binary(vectors), None
+        return None, None
+
+    def apply_changes(self, remove_ids: List[str], add_ids: List[str], add_embeddings: Any) -> "QuantizedVectorIndex":
+        """
+        Write a new version with some rows removed and others added
+
+        Kept rows are copied with their existing codes; only the added rows are
+        quantized, so updating a few papers does not re-read the collection.
+
+        Args:
+            remove_ids: Chunk IDs to drop (unknown IDs are ignored)
+            add_ids: Chunk IDs to append, replacing rows with the same ID
+            add_embeddings: Full-precision embeddings of add_ids
+
+        Returns:
+            The loaded new version
+        """
+        added = np.asarray(add_embeddings, dtype=np.float32).reshape(len(add_ids), self.dim)
+        dropped = set(remove_ids) | set(add_ids)
+        keep = np.fromiter((chunk_id not in dropped for chunk_id in self.ids), dtype=bool, count=len(self.ids))
+        new_codes, new_scales = self._quantize(added, self.quantization)
+        codes = np.concatenate([self.codes[keep], new_codes]) if self.codes is not None else None
+        scales = np.concatenate([self.scales[keep], new_scales]) if self.scales is not None else None
+        vectors = np.concatenate([self.vectors[keep], added])
+        ids = [chunk_id for chunk_id, kept in zip(self.ids, keep) if kept] + list(add_ids)
+        return self._write_version(self.root_dir, ids, vectors, codes, scales, self.quantization, self.metric,
+                                   _is_normalized(vectors))
+
+    @classmethod
+    def _write_version(cls, index_dir: str, ids: List[str], vectors: np.ndarray, codes: Optional[np.ndarray],
+                       scales: Optional[np.ndarray], quantization: str, metric: str,
+                       normalized: bool) -> "QuantizedVectorIndex":
+        version = f"v{time.time_ns()}"
+        version_dir = os.path.join(index_dir, version)
+        os.makedirs(version_dir)
+
+        np.save(os.path.join(version_dir, "vectors.npy"), vectors)
+        if codes is not None:
+            np.save(os.path.join(version_dir, "codes.npy"), codes)
+        if scales is not None:
+            np.save(os.path.join(version_dir, "scales.npy"), scales)
+
+        with open(os.path.join(version_dir, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+
+        manifest = {
+            "version": INDEX_FORMAT_VERSION,
+            "quantization": quantization,
+            "dim": int(vectors.shape[1]),
+            "count": int(vectors.shape[0]),
+            "metric": metric,
+            "normalized": normalized
+        }
+        with open(os.path.join(version_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        current_path = os.path.join(index_dir, CURRENT_FILE)
+        tmp_path = f"{current_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, current_path)
+        _prune_versions(index_dir, keep=version)
+
+        return cls(version_dir, index_dir)
+
+    def _first_pass(self, query: np.ndarray, n_candidates: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return candidate row indices using the quantized codes, considering only rows when given"""
+        if rows is None:
+            rows = np.arange(self.count)
+        if self.quantization == "none":
+            return rows
+
+        order = np.empty(len(rows), dtype=np.float32)
+        query_bits = _quantize_binary(query[None, :])[0] if self.quantization == "binary" else None
+        for start in range(0, len(rows), SCORING_BLOCK_ROWS):
+            block = slice(start, start + SCORING_BLOCK_ROWS)
+            block_rows = rows[block]
+            if self.quantization == "int8":
+                # Approximate inner product; good enough to shortlist candidates
+                order[block] = -(self.codes[block_rows].astype(np.float32) @ query) * self.scales[block_rows]
+            else:
+                order[block] = _POPCOUNT_TABLE[np.bitwise_xor(self.codes[block_rows], query_bits)].sum(axis=1)
+
+        if n_candidates >= len(rows):
+            return rows[np.argsort(order, kind="stable")]
+        return rows[np.argpartition(order, n_candidates)[:n_candidates]]
+
+    def distances(self, query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """
+        Distances of vectors to the query in the index metric, as ChromaDB computes them
+
+        For unit-normalized vectors every metric follows from one dot product
+        per row instead of a full difference vector.
+        """
+        if self.normalized:
+            similarities = vectors @ query
+            query_norm_sq = float(query @ query)
+            if self.metric == "l2":
+                return query_norm_sq + 1.0 - 2.0 * similarities
+            if self.metric == "cosine":
+                return 1.0 - similarities / (np.sqrt(query_norm_sq) or 1.0)
+            return 1.0 - similarities
+        if self.metric == "l2":
+            return _squared_l2(query, vectors)
+        similarities = vectors @ query
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+            return 1.0 - similarities / np.where(norms == 0, 1.0, norms)
+        return 1.0 - similarities
+
+    def search(self, query_embedding: Any, n_results: int = 5,
+               oversample: int = DEFAULT_OVERSAMPLE, row_mask: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Search the index and rescore candidates at full precision
+
+        Args:
+            query_embedding: Query vector with the index dimensionality
+            n_results: Number of results to return
+            oversample: Candidates kept per result from the quantized pass
+            row_mask: Boolean mask over rows; only masked rows are scored (pre-filter)
+
+        Returns:
+            List of (chunk_id, distance in the index metric) sorted by distance
+        """
+        rows = np.flatnonzero(row_mask) if row_mask is not None else None
+        count = self.count if rows is None else len(rows)
+        if count == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        n_candidates = min(count, max(n_results, n_results * oversample))
+        candidates = np.sort(self._first_pass(query, n_candidates, rows))
+
+        distances = self.distances(query, np.asarray(self.vectors[candidates]))
+        best = np.argsort(distances, kind="stable")[:n_results]
+        return [(self.ids[candidates[i]], float(distances[i])) for i in best]
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Resident bytes of the quantized codes compared to float32 storage"""
+        float_bytes = self.count * self.dim * 4
+        code_bytes = 0
+        if self.codes is not None:
+            code_bytes += self.codes.nbytes
+        if self.scales is not None:
+            code_bytes += self.scales.nbytes
+        if self.quantization == "none":
+            code_bytes = float_bytes
+        return {
+            "quantization": self.quantization,
+            "metric": self.metric,
+            "normalized": self.normalized,
+            "vectors": self.count,
+            "dim": self.dim,
+            "float32_bytes": float_bytes,
+            "resident_bytes": code_bytes,
+            "compression_ratio": round(float_bytes / code_bytes, 2) if code_bytes else None
+        }
+
+
+def recall_memory_report(index: QuantizedVectorIndex, k: int = 10, n_queries: int = 100,
+                         oversample: int = DEFAULT_OVERSAMPLE, seed: int = 0) -> Dict[str, Any]:
+    """
+    Measure recall@k of the quantized search against exact search
+
+    Stored vectors are used as queries and the query's own row is excluded
+    from both the exact and the quantized result lists.
+
+    Args:
+        index: Index to evaluate
+        k: Cutoff for recall
+        n_queries: Number of sampled query vectors
+        oversample: Oversampling factor used for the quantized pass
+        seed: Random seed for query sampling
+
+    Returns:
+        Memory report extended with recall statistics
+    """
+    report = index.memory_report()
+    if index.count < 2:
+        report.update({"recall_at_k": None, "k": k, "queries": 0})
+        return report
+
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(index.count, size=min(n_queries, index.count), replace=False)
+    vectors = np.asarray(index.vectors)
+    k = min(k, index.count - 1)
+
+    recalls = []
+    for row in sample:
+        query = vectors[row]
+        exact = np.argsort(index.distances(query, vectors), kind="stable")
+        exact_top = [index.ids[i] for i in exact if i != row][:k]
+        approx = [chunk_id for chunk_id, _ in index.search(query, k + 1, oversample)
+                  if chunk_id != index.ids[row]][:k]
+        recalls.append(len(set(exact_top) & set(approx)) / k)
+
+    report.update({
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "k": k,
+        "queries": len(sample),
+        "oversample": oversample
+    })
+    return report
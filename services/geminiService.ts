@@ -62,6 +62,7 @@ export const generateContentStream = async (
         body: JSON.stringify({
           model: 'qwen3:4b',
           messages: [{ role: 'user', content: fullPrompt }],
+          agent: agentName, // Used by the backend /llm gateway for per-agent accounting
           temperature: 0.5,
           stream: true, // Enable streaming
         }),
@@ -156,6 +157,7 @@ export const generateContent = async (agentName: AgentName, fullPrompt: string,
         body: JSON.stringify({
           model: 'qwen3:4b',
           messages: [{ role: 'user', content: fullPrompt }],
+          agent: agentName, // Used by the backend /llm gateway for per-agent accounting
           temperature: 0.5,
           stream: false,
         }),
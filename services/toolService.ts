@@ -11,7 +11,7 @@
 // Tool request/response interfaces
 export interface ToolRequest {
   agent_name: string;    // "Researcher", "Generator", etc.
-  task: string;          // "web_search", "local_search", "save_results"
+  task: string;          // "web_search", "local_search", "artifact_search", "save_results"
   query: string;         // The actual search query or data to save
   metadata?: any;        // File paths, iteration number, etc.
   id?: string;          // Request tracking
@@ -109,6 +109,10 @@ export const localSearch = async (agentName: string, query: string, metadata?: a
   return callTool(agentName, 'local_search', query, metadata);
 };
 
+export const artifactSearch = async (agentName: string, missionId: string, query: string, metadata?: any): Promise<string> => {
+  return callTool(agentName, 'artifact_search', query, { ...metadata, missionId });
+};
+
 export const saveResults = async (agentName: string, data: string, metadata?: any): Promise<string> => {
   return callTool(agentName, 'save_results', data, metadata);
 };
@@ -171,6 +175,46 @@ export const executeResearcherTools = async (
   return { webResults, localResults, errors };
 };
 
+/**
+ * Cross-mission literature summary cache
+ * Summaries are keyed by paper (or chunk set), prompt template and model
+ */
+export interface SummaryKey {
+  paper_id?: string;
+  chunk_ids?: string[];
+  prompt_template: string;
+  model: string;
+}
+
+export const getCachedSummary = async (key: SummaryKey): Promise<string | null> => {
+  try {
+    const response = await fetch(`${FASTAPI_BASE_URL}/summaries/lookup`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(key)
+    });
+    if (!response.ok) {
+      return null;
+    }
+    const data = await response.json();
+    return data.hit ? data.summary : null;
+  } catch {
+    return null;
+  }
+};
+
+export const storeSummary = async (key: SummaryKey, summary: string, metadata?: any): Promise<void> => {
+  try {
+    await fetch(`${FASTAPI_BASE_URL}/summaries`, {
+      method: 'PUT',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ ...key, summary, metadata: metadata || {} })
+    });
+  } catch (error) {
+    console.warn('Failed to store summary in cache:', error);
+  }
+};
+
 /**
  * Tool health check
  */
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Partition a chunk collection into shard databases by paper_id hash
+Every chunk of a paper lands in the same shard; each shard database also gets
+its papers' rows of the paper table and a full copy of the arXiv metadata
+collection, so a shard worker can answer searches on its own
+Usage: python shard_collection.py --shards N [--collection NAME] [--db-path PATH] [--output DIR]
+"""
+
+import os
+import shutil
+import hashlib
+import argparse
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import chromadb
+from chromadb.config import Settings
+
+from collection_config import distance_metric_of
+from paper_store import PaperStore
+from document_groups import GROUP_STORE_FILE
+from quantized_index import QuantizedVectorIndex, quantized_index_dir
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CHROMA_DB_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "chromadb")
+METADATA_COLLECTION = "LLM_Reasoning_Agents_arxiv_metadata"
+BATCH_SIZE = 500
+
+
+def shard_for(paper_id: str, num_shards: int) -> int:
+    """Stable shard number of a paper"""
+    return int(hashlib.md5(paper_id.encode("utf-8")).hexdigest(), 16) % num_shards
+
+
+def shard_db_path(output_dir: str, shard: int) -> str:
+    return os.path.join(output_dir, f"shard_{shard}")
+
+
+def _copy_collection(source, targets: List[Any], route) -> List[int]:
+    """Copy records with their embeddings; route(metadata) returns target indices"""
+    counts = [0] * len(targets)
+    total = source.count()
+    for offset in range(0, total, BATCH_SIZE):
+        batch = source.get(limit=BATCH_SIZE, offset=offset, include=["embeddings", "documents", "metadatas"])
+        buckets: Dict[int, List[int]] = {}
+        for i, metadata in enumerate(batch["metadatas"]):
+            for target in route(metadata or {}):
+                buckets.setdefault(target, []).append(i)
+        for target, rows in buckets.items():
+            targets[target].add(
+                ids=[batch["ids"][i] for i in rows],
+                embeddings=[batch["embeddings"][i] for i in rows],
+                documents=[batch["documents"][i] for i in rows],
+                metadatas=[batch["metadatas"][i] for i in rows]
+            )
+            counts[target] += len(rows)
+    return counts
+
+
+def shard_collection(db_path: str, collection_name: str, num_shards: int, output_dir: str,
+                     metadata_collection_name: Optional[str] = METADATA_COLLECTION) -> List[Dict[str, Any]]:
+    """
+    Write one shard database per partition of a collection
+
+    Args:
+        db_path: Source ChromaDB persistence directory
+        collection_name: Chunk collection to partition
+        num_shards: Number of shards
+        output_dir: Directory receiving shard_0 ... shard_{N-1}
+        metadata_collection_name: arXiv metadata collection copied into every shard
+
+    Returns:
+        Per-shard chunk and paper counts
+    """
+    # PersistentClient writes its path into the settings, so every client gets its own
+    source_client = chromadb.PersistentClient(path=db_path, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+    source = source_client.get_collection(name=collection_name)
+    index = QuantizedVectorIndex.load_if_exists(quantized_index_dir(db_path, collection_name))
+
+    shard_clients, shard_collections = [], []
+    for shard in range(num_shards):
+        path = shard_db_path(output_dir, shard)
+        os.makedirs(path, exist_ok=True)
+        client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+        try:
+            client.delete_collection(collection_name)
+        except Exception:
+            pass
+        shard_clients.append(client)
+        shard_collections.append(client.create_collection(name=collection_name, metadata=source.metadata))
+
+    chunk_counts = _copy_collection(
+        source, shard_collections, lambda metadata: [shard_for(metadata.get("paper_id", "unknown"), num_shards)]
+    )
+
+    papers = PaperStore(db_path).get_papers(collection_name)
+    paper_counts = [0] * num_shards
+    groups_path = os.path.join(db_path, GROUP_STORE_FILE)
+    for shard in range(num_shards):
+        rows = [{"paper_id": paper_id, **row} for paper_id, row in papers.items()
+                if shard_for(paper_id, num_shards) == shard]
+        PaperStore(shard_db_path(output_dir, shard)).upsert_papers(collection_name, rows)
+        paper_counts[shard] = len(rows)
+        # Bitmaps are keyed by paper, so every shard can use the full group index
+        if os.path.exists(groups_path):
+            shutil.copyfile(groups_path, os.path.join(shard_db_path(output_dir, shard), GROUP_STORE_FILE))
+
+    if metadata_collection_name:
+        try:
+            metadata_source = source_client.get_collection(name=metadata_collection_name)
+        except Exception:
+            metadata_source = None
+            print(f"⚠️  Metadata collection not found, shards will have no paper metadata: {metadata_collection_name}")
+        if metadata_source is not None:
+            metadata_targets = []
+            for client in shard_clients:
+                try:
+                    client.delete_collection(metadata_collection_name)
+                except Exception:
+                    pass
+                metadata_targets.append(client.create_collection(name=metadata_collection_name, metadata=metadata_source.metadata))
+            _copy_collection(metadata_source, metadata_targets, lambda metadata: range(num_shards))
+
+    if index:
+        for shard, collection in enumerate(shard_collections):
+            if chunk_counts[shard]:
+                stored = collection.get(include=["embeddings"])
+                QuantizedVectorIndex.build(
+                    quantized_index_dir(shard_db_path(output_dir, shard), collection_name),
+                    stored["ids"], np.asarray(stored["embeddings"], dtype=np.float32), index.quantization,
+                    metric=distance_metric_of(collection)
+                )
+
+    return [
+        {"shard": shard, "db_path": shard_db_path(output_dir, shard), "chunks": chunk_counts[shard], "papers": paper_counts[shard]}
+        for shard in range(num_shards)
+    ]
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Partition a chunk collection into shard databases')
+    parser.add_argument('--shards', type=int, required=True, help='Number of shards')
+    parser.add_argument('--collection', default="llm_reasoning_agents_papers", help='Chunk collection')
+    parser.add_argument('--db-path', default=CHROMA_DB_PATH, help='Source ChromaDB persistence directory')
+    parser.add_argument('--output', default=os.path.join(PROJECT_ROOT, "backend", "data", "shards"),
+                        help='Directory receiving the shard databases')
+    args = parser.parse_args()
+
+    print(f"🔀 Sharding {args.collection} into {args.shards} shards...")
+    for shard in shard_collection(args.db_path, args.collection, args.shards, args.output):
+        print(f"   📦 shard {shard['shard']}: {shard['chunks']} chunks, {shard['papers']} papers -> {shard['db_path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,7 @@ fi
 echo "🔧 Starting FastAPI server..."
 echo "📍 Server will be available at: http://localhost:8000"
 echo "📖 API Documentation: http://localhost:8000/docs"
-echo "🏥 Health Check: http://localhost:8000/health"
+echo "🏥 Health Check: http://localhost:8000/health (readiness: /ready)"
 echo ""
 echo "Press Ctrl+C to stop the server"
 echo "=================================================="